@@ -0,0 +1,838 @@
+import json
+
+import uuid
+
+import asyncio
+
+import aiohttp
+
+from rate_limiter import vk_limiter, yandex_limiter, google_limiter
+
+from retry import default_policy, check_http_response, check_vk_response, parse_retry_after
+
+from error_log import vk_errors, yandex_errors
+
+from records import Photo, Album, User
+
+from vk_classes import VkApiError
+
+from metrics import registry, endpoint_from_url
+
+from http_session import DEFAULT_TIMEOUT
+
+
+class _Response:
+    '''
+    Прочитанный ответ сервера (статус, заголовки и тело), совместимый с функциями проверки из retry.
+    '''
+
+    __slots__ = ('status_code', 'headers', 'content')
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content) if self.content else {}
+
+
+def check_aiohttp_error(error):
+    '''
+    Функция для проверки исключения aiohttp: временными считаются ошибки соединения и таймауты.
+
+    В качестве возврата (return) функция использует пару (повторять ли запрос, Retry-After).
+
+    '''
+
+    return isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)), None
+
+
+class _AsyncClient:
+    '''
+    Базовый класс асинхронных клиентов: HTTP-сессия aiohttp, ограничение количества
+    одновременных запросов (семафор), общий ограничитель частоты и политика повторных попыток.
+    '''
+
+    # Название сервиса в метриках.
+    service = None
+
+    def __init__(self, rate_limiter, concurrency=100, session=None, retry_policy=None, headers=None):
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.retry_policy = retry_policy or default_policy
+        self.session = session
+        self._headers = headers
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def __aenter__(self):
+        self._session()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def _session(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency)
+            # Те же ограничения, что и у синхронных сессий: без общего лимита, чтобы не прерывать загрузку больших файлов.
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=DEFAULT_TIMEOUT[0], sock_read=DEFAULT_TIMEOUT[1])
+            self.session = aiohttp.ClientSession(connector=connector, headers=self._headers, timeout=timeout)
+
+        return self.session
+
+    async def close(self):
+        '''
+        Метод для закрытия HTTP-сессии и всех открытых соединений клиента.
+        '''
+
+        if self.session is not None:
+            await self.session.close()
+
+    def _labels(self, url, rate_limited):
+        # Запросы без ограничения частоты - скачивание фотографий с серверов Вконтакте.
+        if not rate_limited:
+            return 'vk_cdn', 'photo'
+
+        return self.service, endpoint_from_url(url, self.url)
+
+    async def _send(self, method, url, rate_limited=True, **kwargs):
+        async with self._semaphore:
+
+            if rate_limited:
+                delay = self.rate_limiter.reserve()
+                registry.wait(self.service, delay)
+                await asyncio.sleep(delay)
+
+            data = kwargs.get('data')
+
+            with registry.track(*self._labels(url, rate_limited)) as record:
+
+                async with self._session().request(method, url, **kwargs) as response:
+                    content = await response.read()
+                    record.response(response.status, len(content), len(data) if isinstance(data, bytes) else 0)
+
+                    return _Response(response.status, response.headers.copy(), content)
+
+    async def _request(self, method, url, check=check_http_response, rate_limited=True, **kwargs):
+        return await self.retry_policy.acall(lambda: self._send(method, url, rate_limited, **kwargs),
+                                             check, check_aiohttp_error,
+                                             registry.retry_callback(*self._labels(url, rate_limited)))
+
+
+async def _gather(coroutines):
+    '''
+    Функция, выполняющая корутины одновременно. При отмене или ошибке одной из задач
+    остальные задачи отменяются, поэтому после прерывания не остаётся незавершённых запросов.
+    '''
+
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+
+    try:
+        return await asyncio.gather(*tasks)
+
+    except BaseException:
+
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        raise
+
+
+class AsyncVkUser(_AsyncClient):
+    '''
+    Класс AsyncVkUser - асинхронный (asyncio, aiohttp) аналог VkUser.
+
+    Основное применение - одновременное выполнение большого количества запросов к API Вконтакте
+    в одном потоке. Количество одновременных запросов ограничивается параметром concurrency,
+    частота запросов - общим с VkUser ограничителем vk_limiter. Методы не выводят данные на экран,
+    ошибки API записываются в журнал ошибок. Задачи можно отменять (asyncio.Task.cancel, asyncio.wait_for).
+
+    Attributes
+    ----------
+    token: str
+        токен пользователя Вконтакте.
+
+    version: str
+        используемая версия API Вконтакте.
+
+    concurrency: int
+        максимальное количество одновременных запросов (по умолчанию 100).
+
+
+    Methods
+    -------
+    users_get(user_ids: str)
+        возвращает расширенную информацию о пользователях.
+
+    get_albums(owner_id: int, count: int)
+        возвращает список фотоальбомов пользователя.
+
+    get_photos(album_id: str, rev: int, owner_id: int, count: int, extended: int)
+        возвращает список фотографий в альбоме (страницы по 1000 фотографий запрашиваются одновременно).
+
+    iter_photos(album_id: str, rev: int, owner_id: int, extended: int, page_size: int, limit: int)
+        асинхронный генератор, постранично возвращающий фотографии альбома.
+
+    '''
+
+    url = 'https://api.vk.com/method/'
+
+    service = 'vk'
+
+    # Максимальное количество фотографий, которое photos.get возвращает за один запрос.
+    photos_page_size = 1000
+
+    def __init__(self, token, version, concurrency=100, rate_limiter=None, session=None, retry_policy=None,
+                 error_log=None):
+        super().__init__(rate_limiter or vk_limiter, concurrency, session, retry_policy)
+        self.params = {
+            'access_token': token,
+            'v': version
+        }
+        self.error_log = error_log or vk_errors
+
+    async def _call(self, method, params, raise_errors=False):
+        '''
+        Метод для выполнения запроса к API Вконтакте. Является приватным методом.
+
+        В качестве возврата (return) метод использует ответ сервера в формате .json()
+        либо None, если запрос завершился ошибкой (она записывается в журнал ошибок;
+        при raise_errors=True выбрасывается VkApiError).
+
+        '''
+
+        params = {key: str(value) for key, value in params.items()}
+
+        response = await self._request('GET', self.url + method, check_vk_response, params={**self.params, **params})
+
+        req = response.json() if response.status_code < 300 else {'error': {'error_code': response.status_code}}
+
+        if 'error' in req:
+            registry.error('vk', method, req['error'].get('error_code'))
+            self.error_log.record('vk', req, {'method': method, 'params': params})
+
+            if raise_errors:
+                raise VkApiError(req['error'].get('error_code'), req['error'].get('error_msg'))
+
+            return None
+
+        return req
+
+    async def users_get(self, user_ids):
+        '''
+        Метод, который возвращает расширенную информацию о пользователях.
+
+        Parameters
+        ----------
+        user_ids: str
+            перечисленные через запятую идентификаторы пользователей или их короткие имена (screen_name).
+
+        В качестве возврата (return) метод использует список записей User либо None при ошибке.
+
+        '''
+
+        req = await self._call('users.get', {'user_ids': user_ids})
+
+        if req is not None:
+            return [User.from_vk(info) for info in req['response']]
+
+    async def get_albums(self, owner_id, count):
+        '''
+        Метод, который возвращает список фотоальбомов пользователя или сообщества.
+
+        Parameters
+        ----------
+        owner_id: int
+            идентификатор пользователя или сообщества, которому принадлежат альбомы.
+
+        count: int
+            количество альбомов, которое нужно вернуть.
+
+        В качестве возврата (return) метод использует список записей Album либо None при ошибке.
+
+        '''
+
+        req = await self._call('photos.getAlbums', {'owner_id': owner_id, 'count': count})
+
+        if req is not None:
+            return [Album.from_vk(value) for value in req['response']['items']]
+
+    async def get_photos(self, album_id, rev, owner_id, count, extended=1):
+        '''
+        Метод для формирования списка с информацией о фотографиях.
+
+        Первая страница показывает общее количество фотографий в альбоме,
+        после чего остальные страницы запрашиваются одновременно.
+
+        Parameters
+        ----------
+        album_id: str
+            индентификатор альбома (wall, profile, saved либо идентификатор).
+
+        rev: int
+            порядок сортировки (1 — антихронологический, 0 — хронологический).
+
+        owner_id: int
+            идентификатор владельца альбома.
+
+        count: int
+            количество фотографий, которое нужно вернуть.
+
+        extended: int
+            возвращать ли расширенную информацию (по умолчанию 1).
+
+        В качестве возврата (return) метод использует список записей Photo либо None,
+        если запрос хотя бы одной страницы завершился ошибкой (неполный список не возвращается).
+
+        '''
+
+        params = {'owner_id': owner_id, 'rev': rev, 'album_id': album_id, 'extended': extended}
+
+        first = await self._call('photos.get', {**params, 'offset': 0, 'count': min(count, self.photos_page_size)})
+
+        if first is None:
+            return None
+
+        total = min(count, first['response']['count'])
+
+        pages = await _gather(
+            self._call('photos.get', {**params, 'offset': offset, 'count': min(self.photos_page_size, total - offset)})
+            for offset in range(self.photos_page_size, total, self.photos_page_size)
+        )
+
+        if any(page is None for page in pages):
+            return None
+
+        photos = [Photo.from_vk(value, owner_id) for value in first['response']['items']]
+
+        for page in pages:
+            photos.extend(Photo.from_vk(value, owner_id) for value in page['response']['items'])
+
+        return photos
+
+    async def iter_photos(self, album_id, rev, owner_id, extended=1, page_size=None, limit=None):
+        '''
+        Асинхронный генератор, постранично возвращающий информацию о фотографиях альбома (аналог VkUser.iter_photos).
+
+        Страницы запрашиваются последовательно, каждая фотография отдаётся сразу после получения
+        своей страницы, поэтому загрузку можно начинать с первой страницы, не храня в памяти весь альбом.
+
+        Parameters
+        ----------
+        album_id: str
+            индентификатор альбома (wall, profile, saved либо идентификатор).
+
+        rev: int
+            порядок сортировки (1 — антихронологический, 0 — хронологический).
+
+        owner_id: int
+            идентификатор владельца альбома.
+
+        extended: int
+            возвращать ли расширенную информацию (по умолчанию 1).
+
+        page_size: int
+            количество фотографий, запрашиваемых за один запрос (не более 1000).
+
+        limit: int
+            максимальное количество возвращаемых фотографий. По умолчанию - все фотографии альбома.
+
+
+        Exceptions
+        ----------
+        VkApiError - ошибка API Вконтакте (например, 30 - закрытый профиль), в том числе посреди обхода альбома.
+
+
+        В качестве результата (yield) генератор возвращает записи Photo.
+
+        '''
+
+        page_size = min(page_size or self.photos_page_size, self.photos_page_size)
+
+        params = {'owner_id': owner_id, 'rev': rev, 'album_id': album_id, 'extended': extended}
+
+        offset = 0
+
+        while limit is None or offset < limit:
+
+            count = page_size if limit is None else min(page_size, limit - offset)
+
+            req = await self._call('photos.get', {**params, 'offset': offset, 'count': count}, raise_errors=True)
+
+            items = req['response']['items']
+
+            for value in items:
+                yield Photo.from_vk(value, owner_id)
+
+            offset += len(items)
+
+            if not items or offset >= req['response']['count']:
+                return
+
+
+class AsyncYandexDisk(_AsyncClient):
+    '''
+    Класс AsyncYandexDisk - асинхронный (asyncio, aiohttp) аналог YandexDisk.
+
+    Количество одновременных запросов ограничивается параметром concurrency,
+    частота запросов - общим с YandexDisk ограничителем yandex_limiter. Методы не выводят данные на экран,
+    ошибки API записываются в журнал ошибок. Задачи можно отменять (asyncio.Task.cancel, asyncio.wait_for).
+
+    Attributes
+    ----------
+    token: str
+        OAuth - токен.
+
+    concurrency: int
+        максимальное количество одновременных запросов (по умолчанию 100).
+
+
+    Methods
+    -------
+    get_files_list(path: str, page_size: int, fields: tuple)
+        возвращает список файлов на Яндекс.Диске (или в определённой папке).
+
+    create_directory_yandex_disk(path: str)
+        создаёт папку на Яндекс.Диске.
+
+    upload_photo(path: str, info: Photo)
+        загружает одну фотографию на Яндекс.Диск по url.
+
+    download_files_yandex_disk(path: str, list_name: list)
+        загружает фотографии на Яндекс.Диск одновременно.
+
+    delete_files_yandex_disk(path: str, permanently: bool)
+        удаляет файл на Яндекс.Диске.
+
+    '''
+
+    url = 'https://cloud-api.yandex.net/v1/disk/'
+
+    service = 'yandex'
+
+    # Количество элементов, запрашиваемых за одну страницу списка файлов.
+    files_page_size = 1000
+
+    def __init__(self, token, concurrency=100, rate_limiter=None, session=None, retry_policy=None, error_log=None):
+        headers = {'Content-Type': 'application/json', 'Authorization': f"OAuth {token}"}
+        super().__init__(rate_limiter or yandex_limiter, concurrency, session, retry_policy, headers)
+        self.token = token
+        self.error_log = error_log or yandex_errors
+
+    async def _call(self, method, url, params):
+        '''
+        Метод для выполнения запроса к API Яндекс.Диска. Является приватным методом.
+
+        В качестве возврата (return) метод использует пару (статус ответа, ответ в формате .json()).
+        Ошибки записываются в журнал ошибок.
+
+        '''
+
+        response = await self._request(method, url, params=params)
+
+        req = response.json()
+
+        if 'error' in req:
+            registry.error('yandex', endpoint_from_url(url, self.url), req['error'])
+            self.error_log.record('yandex', req, {'method': method, 'url': url, 'params': params})
+
+        return response.status_code, req
+
+    async def get_files_list(self, path=None, page_size=None, fields=('name', 'path')):
+        '''
+        Метод для получения списка файлов, упорядоченных по имени.
+        Параметры такие же, как у YandexDisk.get_files_list.
+
+        В качестве возврата (return) метод использует список словарей с ключом file_name
+        и остальными запрошенными полями.
+
+        '''
+
+        page_size = page_size or self.files_page_size
+
+        fields = tuple(dict.fromkeys(('name', 'path') + tuple(fields)))
+
+        if path is None:
+            files_url = self.url + 'resources/files'
+            params = {'fields': ','.join(f"items.{field}" for field in fields)}
+
+        else:
+            files_url = self.url + 'resources'
+            params = {'path': path, 'fields': ','.join(f"_embedded.items.{field}" for field in fields + ('type',))}
+
+        files = []
+
+        offset = 0
+
+        while True:
+
+            status, req = await self._call('GET', files_url, {**params, 'limit': page_size, 'offset': offset})
+
+            if 'error' in req:
+                return files
+
+            items = req['items'] if path is None else req['_embedded']['items']
+
+            for item in items:
+
+                if item.get('type', 'file') != 'file':
+                    continue
+
+                file_dict = {'file_name': item['name']}
+
+                for field in fields[1:]:
+                    file_dict[field] = item.get(field)
+
+                files.append(file_dict)
+
+            if len(items) < page_size:
+                return files
+
+            offset += page_size
+
+    async def create_directory_yandex_disk(self, path):
+        '''
+        Метод для создания папки на Яндекс.Диске.
+
+        В качестве возврата (return) метод использует ответ сервера в формате .json() либо None при ошибке.
+
+        '''
+
+        status, req = await self._call('PUT', self.url + 'resources', {'path': path})
+
+        if 'error' not in req:
+            return req
+
+    async def upload_photo(self, path, info):
+        '''
+        Метод для загрузки одной фотографии на Яндекс.Диск (Яндекс.Диск скачивает её по url).
+
+        В качестве возврата (return) метод использует словарь с результатом загрузки:
+        file_name, path, status ('success' либо 'error') и response либо error.
+
+        '''
+
+        res_path = f"{path}/{info.file_name}"
+
+        result = {'file_name': info.file_name, 'path': res_path}
+
+        try:
+            status, req = await self._call('POST', self.url + 'resources/upload', {'path': res_path, 'url': info.url})
+
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as error:
+            result.update({'status': 'error', 'error': repr(error)})
+            return result
+
+        if 'error' in req:
+            result.update({'status': 'error', 'error': req.get('description', req['error'])})
+
+        else:
+            result.update({'status': 'success', 'response': req})
+
+        return result
+
+    async def download_files_yandex_disk(self, path, list_name):
+        '''
+        Метод для одновременной загрузки фотографий на Яндекс.Диск по определённому пути
+        (не больше concurrency запросов одновременно).
+
+        Parameters
+        ----------
+        path: str
+            путь к папке на Яндекс.Диске.
+
+        list_name: list
+            список записей Photo.
+
+        В качестве возврата (return) метод использует список результатов upload_photo
+        в порядке следования list_name.
+
+        '''
+
+        return await _gather(self.upload_photo(path, info) for info in list_name)
+
+    async def delete_files_yandex_disk(self, path, permanently=False):
+        '''
+        Метод для удаления файлов на Яндекс.Диске.
+
+        В качестве возврата (return) метод использует статус ответа сервера (202 либо 204 при успехе).
+
+        '''
+
+        status, req = await self._call('DELETE', self.url + 'resources',
+                                       {'path': path, 'permanently': str(permanently).lower()})
+
+        return status
+
+
+def check_google_response(response):
+    '''
+    Функция для проверки ответа Google.Drive: кроме статусов из RETRY_STATUSES
+    временной ошибкой считается 403 с причиной rateLimitExceeded (userRateLimitExceeded).
+
+    В качестве возврата (return) функция использует пару (повторять ли запрос, Retry-After).
+
+    '''
+
+    if response.status_code == 403 and b'ateLimitExceeded' in response.content:
+        return True, parse_retry_after(response.headers.get('Retry-After'))
+
+    return check_http_response(response)
+
+
+class AsyncGoogleDrive(_AsyncClient):
+    '''
+    Класс AsyncGoogleDrive - асинхронная (asyncio, aiohttp) загрузка и удаление файлов на Google.Drive
+    через REST API версии 3, без googleapiclient.
+
+    Фотографии загружаются одним запросом multipart. Количество одновременных запросов ограничивается
+    параметром concurrency, частота запросов - общим ограничителем google_limiter.
+    Задачи можно отменять (asyncio.Task.cancel, asyncio.wait_for).
+
+    Attributes
+    ----------
+    credentials
+        учетные данные пользователя (см. google_drive.get_credentials).
+        Просроченный токен обновляется автоматически.
+
+    concurrency: int
+        максимальное количество одновременных запросов (по умолчанию 100).
+
+
+    Methods
+    -------
+    iter_files_google_drive(q: str, page_size: int, fields: str)
+        асинхронный генератор, постранично возвращающий файлы на Google.Drive.
+
+    get_files_google_drive(q: str)
+        возвращает список файлов на Google.Drive.
+
+    create_directory_google_drive(name: str, parent_id: str)
+        создаёт папку на Google.Drive.
+
+    upload_photo_google_drive(info: Photo, folder_id: str, data: bytes)
+        загружает одну фотографию на Google.Drive.
+
+    download_files_google_drive(list_name: list, folder_id: str)
+        загружает фотографии на Google.Drive одновременно.
+
+    delete_files_google_drive(file_id: str)
+        удаляет файл на Google.Drive.
+
+    '''
+
+    url = 'https://www.googleapis.com/drive/v3/'
+
+    upload_url = 'https://www.googleapis.com/upload/drive/v3/'
+
+    service = 'google'
+
+    folder_mime_type = 'application/vnd.google-apps.folder'
+
+    # Максимальный размер страницы, допустимый для files.list.
+    page_size = 1000
+
+    file_fields = 'id, name, mimeType, parents, createdTime'
+
+    def __init__(self, credentials, concurrency=100, rate_limiter=None, session=None, retry_policy=None):
+        super().__init__(rate_limiter or google_limiter, concurrency, session, retry_policy)
+        self.credentials = credentials
+        self._refresh_lock = asyncio.Lock()
+
+    async def _authorization(self):
+        if not self.credentials.valid:
+
+            async with self._refresh_lock:
+
+                if not self.credentials.valid:
+                    from google.auth.transport.requests import Request
+
+                    # Обновление токена выполняется синхронно, поэтому выносится в отдельный поток.
+                    await asyncio.get_running_loop().run_in_executor(None, self.credentials.refresh, Request())
+
+        return {'Authorization': f"Bearer {self.credentials.token}"}
+
+    async def _google_request(self, method, url, **kwargs):
+        headers = {**await self._authorization(), **kwargs.pop('headers', {})}
+
+        return await self._request(method, url, check_google_response, headers=headers, **kwargs)
+
+    def _check(self, response):
+        # Ответ с ошибкой превращается в исключение aiohttp.ClientError.
+        if response.status_code >= 300:
+            raise aiohttp.ClientError(f"HTTP {response.status_code}: {response.content[:200]!r}")
+
+        return response.json()
+
+    async def iter_files_google_drive(self, q=None, page_size=None, fields=None):
+        '''
+        Асинхронный генератор, постранично возвращающий файлы на Google.Drive (аналог google_drive.iter_files_google_drive).
+
+        Parameters
+        ----------
+        q: str
+            условие поиска файлов (см. google_drive.build_query_google_drive). По умолчанию - все файлы.
+
+        page_size: int
+            количество результатов на одной странице (не более 1000).
+
+        fields: str
+            поля файлов (по умолчанию file_fields: id, name, mimeType, parents, createdTime).
+
+
+        Exceptions
+        ----------
+        aiohttp.ClientError - ответ сервера с ошибкой.
+
+
+        В качестве результата (yield) генератор возвращает словари с информацией о файлах.
+
+        '''
+
+        params = {'pageSize': str(page_size or self.page_size), 'fields': f"nextPageToken, files({fields or self.file_fields})"}
+
+        if q is not None:
+            params['q'] = q
+
+        while True:
+
+            results = self._check(await self._google_request('GET', self.url + 'files', params=params))
+
+            for file in results.get('files', []):
+                yield file
+
+            page_token = results.get('nextPageToken')
+
+            if not page_token:
+                return
+
+            params['pageToken'] = page_token
+
+    async def get_files_google_drive(self, q=None):
+        '''
+        Метод для получения списка файлов на Google.Drive.
+
+        В качестве возврата (return) метод использует список словарей с информацией о файлах (см. iter_files_google_drive).
+
+        '''
+
+        return [file async for file in self.iter_files_google_drive(q)]
+
+    async def create_directory_google_drive(self, name, parent_id=None):
+        '''
+        Метод для создания папки на Google.Drive.
+
+        Parameters
+        ----------
+        name: str
+            имя создаваемой папки.
+
+        parent_id: str
+            идентификатор родительской папки. По умолчанию папка создаётся в корне.
+
+
+        Exceptions
+        ----------
+        aiohttp.ClientError - ответ сервера с ошибкой.
+
+
+        В качестве возврата (return) метод использует идентификатор созданной папки.
+
+        '''
+
+        metadata = {'name': name, 'mimeType': self.folder_mime_type}
+
+        if parent_id is not None:
+            metadata['parents'] = [parent_id]
+
+        response = await self._google_request('POST', self.url + 'files', params={'fields': 'id'}, json=metadata)
+
+        return self._check(response).get('id')
+
+    async def upload_photo_google_drive(self, info, folder_id, data=None):
+        '''
+        Метод для загрузки одной фотографии на Google.Drive.
+
+        Parameters
+        ----------
+        info: Photo
+            запись Photo с информацией о фотографии.
+
+        folder_id: str
+            идентификатор папки, в которую будет загружен файл.
+
+        data: bytes
+            содержимое фотографии. Если не задано, фотография скачивается по info.url.
+
+        В качестве возврата (return) метод использует словарь с результатом загрузки:
+        file_name, status ('success' либо 'error'), id (идентификатор файла) либо error (описание ошибки).
+
+        '''
+
+        result = {'file_name': info.file_name, 'path': f"{folder_id}/{info.file_name}"}
+
+        try:
+            if data is None:
+                # Источник (сервер Вконтакте) не учитывается ограничителем частоты запросов к Google.Drive.
+                source = await self._request('GET', info.url, rate_limited=False)
+
+                if source.status_code >= 300:
+                    result.update({'status': 'error', 'error': f"HTTP {source.status_code}: {info.url}"})
+                    return result
+
+                data = source.content
+
+            boundary = uuid.uuid4().hex
+
+            metadata = json.dumps({'name': info.file_name, 'parents': [folder_id]})
+
+            body = b''.join([
+                f"--{boundary}\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n{metadata}\r\n".encode(),
+                f"--{boundary}\r\nContent-Type: image/jpeg\r\n\r\n".encode(),
+                bytes(data),
+                f"\r\n--{boundary}--\r\n".encode()
+            ])
+
+            response = await self._google_request(
+                'POST', self.upload_url + 'files', params={'uploadType': 'multipart', 'fields': 'id'}, data=body,
+                headers={'Content-Type': f"multipart/related; boundary={boundary}"}
+            )
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            result.update({'status': 'error', 'error': repr(error)})
+            return result
+
+        if response.status_code >= 300:
+            result.update({'status': 'error', 'error': f"HTTP {response.status_code}: {response.content[:200]!r}"})
+
+        else:
+            result.update({'status': 'success', 'id': response.json().get('id')})
+
+        return result
+
+    async def download_files_google_drive(self, list_name, folder_id):
+        '''
+        Метод для одновременной загрузки фотографий на Google.Drive
+        (не больше concurrency запросов одновременно).
+
+        В качестве возврата (return) метод использует список результатов upload_photo_google_drive
+        в порядке следования list_name.
+
+        '''
+
+        return await _gather(self.upload_photo_google_drive(info, folder_id) for info in list_name)
+
+    async def delete_files_google_drive(self, file_id):
+        '''
+        Метод для удаления файла на Google.Drive.
+
+        В качестве возврата (return) метод использует статус ответа сервера (204 при успехе).
+
+        '''
+
+        response = await self._google_request('DELETE', self.url + f"files/{file_id}")
+
+        return response.status_code
@@ -0,0 +1,473 @@
+'''
+Неинтерактивный запуск переноса фотографий (например, из cron).
+
+Файл заданий (JSON):
+
+{
+    "workers": 4,
+    "upload_workers": 8,
+    "incremental": true,
+    "jobs": [
+        {
+            "user": "durov",
+            "album_id": "wall",
+            "rev": 1,
+            "count": null,
+            "destinations": [
+                {"type": "yandex", "path": "photos/durov"},
+                {"type": "google", "folder": "photos"}
+            ]
+        }
+    ]
+}
+
+Параметры верхнего уровня задают значения по умолчанию, count = null означает весь альбом.
+Для каждого задания выполняется цепочка: users.get -> photos.get -> сравнение с местом назначения -> загрузка.
+Сводка (JSON) с производительностью и ошибками выводится в stdout или записывается в файл --summary.
+Сообщения клиентов выводятся в stderr (с --quiet - не выводятся), поэтому stdout содержит только сводку.
+Метрики запросов (см. metrics) по окончании запуска сохраняются в файл --metrics.
+'''
+
+import os
+
+import sys
+
+import json
+
+import time
+
+import argparse
+
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+import sync
+
+from clients import read_token
+
+from vk_classes import VkUser
+
+from ya_disk import YandexDisk, OperationTracker
+
+from manifest import SyncManifest
+
+from metrics import registry
+
+
+class BatchRunner:
+    '''
+    Класс BatchRunner - выполняет задания на перенос фотографий для многих пользователей параллельно.
+
+    Attributes
+    ----------
+    vk_client: VkUser
+        клиент Вконтакте.
+
+    yandex_disk: YandexDisk
+        клиент Яндекс.Диска (None, если заданий для Яндекс.Диска нет).
+
+    service
+        сервис Google.Drive (None, если заданий для Google.Drive нет).
+
+    workers: int
+        количество заданий, выполняемых одновременно.
+
+    upload_workers: int
+        количество одновременных загрузок внутри одного задания (для Яндекс.Диска).
+
+    incremental: bool
+        использовать ли манифесты синхронизации (переносить только новые фотографии).
+
+    operations_timeout: float
+        максимальное время ожидания завершения операций загрузки на Яндекс.Диске (в секундах).
+        Операции, не завершившиеся за это время, считаются неудачными.
+
+
+    Methods
+    -------
+    run(jobs: list)
+        выполняет задания и возвращает сводку.
+
+    run_job(job: dict)
+        выполняет одно задание и возвращает его результат.
+
+    '''
+
+    def __init__(self, vk_client, yandex_disk=None, service=None, workers=4, upload_workers=8, incremental=True,
+                 operations_timeout=600):
+        self.vk_client = vk_client
+        self.yandex_disk = yandex_disk
+        self.service = service
+        self.workers = workers
+        self.upload_workers = upload_workers
+        self.incremental = incremental
+        self.operations_timeout = operations_timeout
+        self._folder_lock = threading.Lock()
+
+    def _fetch_photos(self, job, owner_id, manifest=None):
+        '''
+        Метод для получения фотографий задания. Является приватным методом.
+
+        Если задан манифест, уже перенесённые фотографии пропускаются, а при антихронологическом порядке
+        запрос страниц прекращается на первой перенесённой фотографии (см. VkUser.iter_photos).
+
+        В качестве возврата (return) метод использует список фотографий и описание ошибки,
+        прервавшей получение списка (None, если список получен полностью).
+        Ошибка до получения первой фотографии (например, закрытый профиль) выбрасывается.
+
+        '''
+
+        photos = []
+
+        try:
+            for photo in self.vk_client.iter_photos(job.get('album_id', 'wall'), job.get('rev', 1), owner_id,
+                                                    limit=job.get('count'), manifest=manifest, raise_errors=True):
+                photos.append(photo)
+
+        except Exception as error:
+
+            if not photos:
+                raise
+
+            return photos, repr(error)
+
+        return photos, None
+
+    def _target(self, destination):
+        '''
+        Метод, возвращающий место назначения задания: (тип, путь на Яндекс.Диске либо идентификатор папки
+        на Google.Drive) и ключ манифеста. Является приватным методом.
+        '''
+
+        if destination['type'] == 'yandex':
+            path = destination['path']
+            return 'yandex', path, 'yandex_' + path.strip('/').replace('/', '_')
+
+        if destination['type'] == 'google':
+            folder_id = self._google_folder(destination)
+            return 'google', folder_id, 'google_' + folder_id
+
+        raise ValueError(f"Неизвестный тип места назначения: {destination['type']}.")
+
+    def _google_folder(self, destination):
+        '''
+        Метод, возвращающий идентификатор папки Google.Drive для места назначения. Является приватным методом.
+        '''
+
+        import google_drive as google
+
+        folder_id = destination.get('folder_id')
+
+        if folder_id is None and destination.get('folder'):
+
+            with self._folder_lock:
+                folder_id = google.get_folder_id_google_drive(self.service, destination['folder'])
+
+            if folder_id is None:
+                raise ValueError(f"Папка {destination['folder']} не найдена на Google.Drive.")
+
+        return folder_id or google.FOLDER_ID
+
+    def _manifest(self, owner_id, job, destination_key):
+        if not self.incremental:
+            return None
+
+        return SyncManifest(owner_id, job.get('album_id', 'wall'), destination_key)
+
+    def _select(self, photos, manifest):
+        '''
+        Метод, оставляющий фотографии, которые ещё не перенесены по манифесту. Является приватным методом.
+        '''
+
+        if manifest is None:
+            return photos
+
+        selected = manifest.select(photos)
+        selected_ids = {photo.id for photo in selected}
+
+        return selected + [photo for photo in manifest.pending() if photo.id not in selected_ids]
+
+    def _upload_yandex(self, path, photos, manifest=None):
+        '''
+        Метод для загрузки фотографий на Яндекс.Диск. Является приватным методом.
+
+        Папка назначения создаётся, если её ещё нет. Яндекс.Диск скачивает файлы по url асинхронно,
+        поэтому результат учитывается после завершения операций загрузки: операции, завершившиеся ошибкой
+        или не завершившиеся за operations_timeout секунд, считаются неудачными.
+
+        '''
+
+        self.yandex_disk.ensure_directory_yandex_disk(path)
+
+        photos = self._select(photos, manifest)
+
+        remote_files = {item['file_name']: item for item in self.yandex_disk.iter_files(path, fields=('md5', 'size'))}
+
+        plan = sync.plan_sync(photos, remote_files, workers=self.upload_workers)
+
+        for photo, remote in plan['replace']:
+            self.yandex_disk.delete_files_yandex_disk(f"{path}/{photo.file_name}")
+
+        if manifest is not None:
+            for photo in plan['skip']:
+                manifest.mark(photo.id, 'done', f"{path}/{photo.file_name}", photo.owner_id)
+
+        load = plan['upload'] + [photo for photo, remote in plan['replace']]
+
+        tracker = OperationTracker(self.yandex_disk)
+
+        results = self.yandex_disk.download_files_yandex_disk(path, load, workers=self.upload_workers,
+                                                              tracker=tracker, manifest=manifest)
+
+        operations = tracker.wait(timeout=self.operations_timeout)
+
+        tracker.stop()
+
+        # Статусы в манифесте изменяются по итогу операций, поэтому он сохраняется после ожидания.
+        if manifest is not None:
+            manifest.save()
+
+        unfinished = {file_path: 'Операция загрузки завершилась ошибкой.' for file_path in operations['failed']}
+
+        unfinished.update({file_path: 'Операция загрузки не завершилась за отведённое время.'
+                           for file_path in operations['in-progress']})
+
+        errors = [{'file_name': result['file_name'], 'error': result['error']}
+                  for result in results if result['status'] == 'error']
+
+        errors += [{'file_name': file_path.rsplit('/', 1)[-1], 'error': message}
+                   for file_path, message in unfinished.items()]
+
+        return {
+            'type': 'yandex',
+            'target': path,
+            'uploaded': sum(1 for result in results if result['status'] == 'success' and result['path'] not in unfinished),
+            'skipped': len(plan['skip']),
+            'failed': len(errors),
+            'errors': errors
+        }
+
+    def _upload_google(self, folder_id, photos, manifest=None):
+        '''
+        Метод для загрузки фотографий на Google.Drive. Является приватным методом.
+        '''
+
+        import google_drive as google
+
+        photos = self._select(photos, manifest)
+
+        remote_files = {
+            item['name']: {'id': item['id'], 'md5': item.get('md5Checksum'), 'size': item.get('size')}
+            for item in google.find_files_google_drive(self.service, [photo.file_name for photo in photos],
+                                                       parent_id=folder_id, fields='id, name, md5Checksum, size')
+        }
+
+        plan = sync.plan_sync(photos, remote_files, workers=self.upload_workers)
+
+        google.delete_files_google_drive_batch(self.service, [remote['id'] for photo, remote in plan['replace']])
+
+        if manifest is not None:
+            for photo in plan['skip']:
+                manifest.mark(photo.id, 'done', f"{folder_id}/{photo.file_name}", photo.owner_id)
+
+        load = plan['upload'] + [photo for photo, remote in plan['replace']]
+
+        results = google.download_files_google_drive(self.service, load, folder_id=folder_id, manifest=manifest)
+
+        return {
+            'type': 'google',
+            'target': folder_id,
+            'uploaded': sum(1 for result in results if result['status'] == 'success'),
+            'skipped': len(plan['skip']),
+            'failed': sum(1 for result in results if result['status'] == 'error'),
+            'errors': [{'file_name': result['file_name'], 'error': result['error']}
+                       for result in results if result['status'] == 'error']
+        }
+
+    def run_job(self, job):
+        '''
+        Метод для выполнения одного задания.
+
+        Parameters
+        ----------
+        job: dict
+            задание (user, album_id, rev, count, destinations).
+
+        В качестве возврата (return) метод использует словарь с результатом задания.
+        Исключения не выбрасываются: ошибка записывается в поле error результата.
+
+        '''
+
+        started = time.monotonic()
+
+        result = {'user': job['user'], 'status': 'success', 'photos': 0, 'destinations': []}
+
+        try:
+            users = self.vk_client.users_get(job['user'])
+
+            if not users:
+                raise ValueError(f"Пользователь {job['user']} не найден.")
+
+            owner_id = users[0].id
+
+            result['owner_id'] = owner_id
+
+            targets = [self._target(destination) for destination in job['destinations']]
+
+            manifests = [self._manifest(owner_id, job, key) for kind, target, key in targets]
+
+            # Досрочная остановка по манифесту возможна, только если место назначения одно:
+            # иначе фотография, перенесённая в одно место, может быть не перенесена в другое.
+            photos, fetch_error = self._fetch_photos(job, owner_id, manifests[0] if len(manifests) == 1 else None)
+
+            result['photos'] = len(photos)
+
+            for (kind, target, key), manifest in zip(targets, manifests):
+
+                if kind == 'yandex':
+                    result['destinations'].append(self._upload_yandex(target, photos, manifest))
+
+                else:
+                    result['destinations'].append(self._upload_google(target, photos, manifest))
+
+            if fetch_error is not None:
+                result['status'] = 'partial'
+                result['error'] = f"Список фотографий получен не полностью: {fetch_error}"
+
+            elif any(info['failed'] for info in result['destinations']):
+                result['status'] = 'partial'
+
+        except Exception as error:
+            result['status'] = 'error'
+            result['error'] = repr(error)
+
+        result['elapsed'] = round(time.monotonic() - started, 3)
+
+        return result
+
+    def run(self, jobs):
+        '''
+        Метод для параллельного выполнения заданий.
+
+        Parameters
+        ----------
+        jobs: list
+            список заданий.
+
+        В качестве возврата (return) метод использует сводку (словарь) с результатами заданий,
+        итоговыми показателями и производительностью (фотографий в секунду).
+
+        '''
+
+        started = time.time()
+
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            results = list(executor.map(self.run_job, jobs))
+
+        elapsed = time.time() - started
+
+        uploaded = sum(info['uploaded'] for result in results for info in result['destinations'])
+
+        return {
+            'started': started,
+            'elapsed': round(elapsed, 3),
+            'workers': self.workers,
+            'totals': {
+                'jobs': len(results),
+                'failed_jobs': sum(1 for result in results if result['status'] == 'error'),
+                'partial_jobs': sum(1 for result in results if result['status'] == 'partial'),
+                'photos': sum(result['photos'] for result in results),
+                'uploaded': uploaded,
+                'skipped': sum(info['skipped'] for result in results for info in result['destinations']),
+                'failed': sum(info['failed'] for result in results for info in result['destinations']),
+                'photos_per_second': round(uploaded / elapsed, 3) if elapsed else None
+            },
+            'jobs': results
+        }
+
+
+def main(argv=None):
+    '''
+    Функция, реализующая запуск заданий из командной строки.
+
+    В качестве возврата (return) функция использует код завершения:
+    0 - все задания выполнены, 1 - часть заданий завершилась ошибкой,
+    2 - ошибок нет, но часть заданий выполнена частично (не все фотографии перенесены).
+
+    '''
+
+    parser = argparse.ArgumentParser(description='Неинтерактивный перенос фотографий Вконтакте по файлу заданий.')
+    parser.add_argument('job_file', help='путь к файлу заданий (JSON)')
+    parser.add_argument('--workers', type=int, help='количество заданий, выполняемых одновременно')
+    parser.add_argument('--upload-workers', type=int, help='количество одновременных загрузок внутри задания')
+    parser.add_argument('--full', action='store_true', help='не использовать манифесты (переносить весь альбом)')
+    parser.add_argument('--summary', help='путь к файлу сводки (по умолчанию - stdout)')
+    parser.add_argument('--vk-token', default='vk_token.txt', help='файл с токеном Вконтакте')
+    parser.add_argument('--yandex-token', default='ya_token.txt', help='файл с токеном Яндекс.Диска')
+    parser.add_argument('--vk-version', default='5.131', help='версия API Вконтакте')
+    parser.add_argument('--quiet', action='store_true', help='не выводить сообщения клиентов (по умолчанию - в stderr)')
+    parser.add_argument('--metrics', help='путь к файлу метрик запросов (.json - JSON, иначе - формат Prometheus)')
+    args = parser.parse_args(argv)
+
+    with open(args.job_file, 'r', encoding='utf-8') as file_obj:
+        config = json.load(file_obj)
+
+    jobs = config['jobs']
+
+    types = {destination['type'] for job in jobs for destination in job['destinations']}
+
+    # Клиенты печатают ход работы через print: он перенаправляется, чтобы stdout оставался корректным JSON.
+
+    stdout = sys.stdout
+
+    sys.stdout = open(os.devnull, 'w', encoding='utf-8') if args.quiet else sys.stderr
+
+    try:
+        vk_client = VkUser(read_token(args.vk_token), args.vk_version)
+
+        yandex_disk = YandexDisk(read_token(args.yandex_token)) if 'yandex' in types else None
+
+        service = None
+
+        if 'google' in types:
+            import google_drive as google
+            service = google.authorization()
+
+        runner = BatchRunner(
+            vk_client,
+            yandex_disk,
+            service,
+            workers=args.workers or config.get('workers', 4),
+            upload_workers=args.upload_workers or config.get('upload_workers', 8),
+            incremental=not args.full and config.get('incremental', True)
+        )
+
+        summary = runner.run(jobs)
+
+    finally:
+        if args.quiet:
+            sys.stdout.close()
+
+        sys.stdout = stdout
+
+        if args.metrics:
+            registry.export(args.metrics)
+
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as file_obj:
+            json.dump(summary, file_obj, ensure_ascii=False, indent=4)
+
+    else:
+        json.dump(summary, sys.stdout, ensure_ascii=False, indent=4)
+        print()
+
+    if summary['totals']['failed_jobs']:
+        return 1
+
+    return 2 if summary['totals']['partial_jobs'] else 0
+
+
+if __name__ == '__main__':
+
+    sys.exit(main())
@@ -0,0 +1,333 @@
+'''
+Локальные серверы-заменители API Вконтакте, Яндекс.Диска и Google.Drive для замеров производительности.
+
+Каждый сервер запускается в отдельном потоке на 127.0.0.1 (порт выбирается автоматически),
+отвечает в формате соответствующего API и позволяет задать задержку ответа (latency, в секундах)
+и долю ответов с временной ошибкой (error_rate, от 0 до 1). Сервер считает количество запросов
+по каждому адресу (requests).
+
+Поддерживаемые адреса:
+FakeVk - /method/users.get, /method/photos.get, /method/photos.getAlbums и /photo/{id}.jpg (файлы фотографий);
+FakeYandexDisk - /v1/disk/resources* (список, создание, удаление, загрузка по url и по ссылке),
+/v1/disk/operations/{id} и /upload-target/{id} (ссылка для загрузки);
+FakeGoogleDrive - /drive/v3/files (список, удаление) и /upload/drive/v3/files (multipart и resumable).
+'''
+
+import re
+
+import json
+
+import time
+
+import random
+
+import threading
+
+from collections import Counter
+
+from urllib.parse import urlsplit, parse_qs
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _dispatch(self):
+        server = self.server.fake
+
+        parts = urlsplit(self.path)
+
+        self.route = parts.path
+        self.query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+
+        length = int(self.headers.get('Content-Length') or 0)
+        self.body = self.rfile.read(length) if length else b''
+
+        server.count(self.command, self.route)
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        if server.fail():
+            server.send_error_response(self)
+            return
+
+        server.handle(self)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+    def send(self, status, body=b'', content_type='application/json', headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeServer:
+    '''
+    Класс FakeServer - базовый класс локального сервера-заменителя.
+
+    Attributes
+    ----------
+    latency: float
+        задержка каждого ответа в секундах (по умолчанию 0).
+
+    error_rate: float
+        доля ответов с временной ошибкой (по умолчанию 0).
+
+    seed: int
+        начальное значение генератора случайных ошибок (для воспроизводимости).
+
+    '''
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def count(self, method, route):
+        # Идентификаторы в пути заменяются на {id}, чтобы запросы группировались по адресу.
+        route = re.sub(r'/[0-9a-f]{6,}(\.jpg)?$|/\d+(\.jpg)?$', r'/{id}\1\2', route)
+
+        with self._lock:
+            self.requests[f"{method} {route}"] += 1
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+
+    def fail(self):
+        if not self.error_rate:
+            return False
+
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def send_error_response(self, request):
+        request.send(503, {'error': 'ServiceUnavailable', 'message': 'Fake error', 'description': 'Fake error'},
+                     headers={'Retry-After': '0'})
+
+    def handle(self, request):
+        request.send(404, {'error': 'NotFound', 'message': request.route, 'description': request.route})
+
+
+class FakeVk(FakeServer):
+    '''
+    Класс FakeVk - заменитель API Вконтакте и сервера фотографий.
+
+    Attributes
+    ----------
+    photos: int
+        количество фотографий в альбоме каждого пользователя.
+
+    photo_size: int
+        размер файла каждой фотографии в байтах.
+
+    '''
+
+    def __init__(self, photos=1000, photo_size=100 * 1024, **kwargs):
+        super().__init__(**kwargs)
+        self.photos = photos
+        self.photo_size = photo_size
+
+    def send_error_response(self, request):
+        if request.route.startswith('/photo/'):
+            return super().send_error_response(request)
+
+        # API Вконтакте сообщает о превышении частоты запросов ошибкой 6 со статусом 200.
+        request.send(200, {'error': {'error_code': 6, 'error_msg': 'Too many requests per second'}})
+
+    def photo(self, photo_id, owner_id=1):
+        return {
+            'id': photo_id,
+            'owner_id': owner_id,
+            'date': 1600000000 + photo_id,
+            'likes': {'count': photo_id % 100},
+            'sizes': [{'type': 'z', 'url': f"{self.url}/photo/{photo_id}.jpg"}]
+        }
+
+    def handle(self, request):
+        route, query = request.route, request.query
+
+        if route == '/method/users.get':
+            users = [{'id': index + 1, 'first_name': name, 'last_name': name, 'is_closed': False,
+                      'can_access_closed': True} for index, name in enumerate(query.get('user_ids', '1').split(','))]
+            request.send(200, {'response': users})
+
+        elif route == '/method/photos.get':
+            offset = int(query.get('offset', 0))
+            count = min(int(query.get('count', 50)), 1000)
+            owner_id = int(query.get('owner_id', 1))
+            items = [self.photo(photo_id, owner_id) for photo_id in range(offset + 1, min(offset + count, self.photos) + 1)]
+            request.send(200, {'response': {'count': self.photos, 'items': items}})
+
+        elif route == '/method/photos.getAlbums':
+            items = [{'id': 1, 'owner_id': int(query.get('owner_id', 1)), 'title': 'album', 'size': self.photos,
+                      'description': ''}]
+            request.send(200, {'response': {'count': 1, 'items': items}})
+
+        elif route.startswith('/photo/'):
+            request.send(200, b'\xff' * self.photo_size, content_type='image/jpeg')
+
+        else:
+            super().handle(request)
+
+
+class FakeYandexDisk(FakeServer):
+    '''
+    Класс FakeYandexDisk - заменитель REST API Яндекс.Диска.
+    Загрузка по url завершается сразу: операция имеет статус success.
+    '''
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.files = {}
+        self._operations = 0
+
+    def handle(self, request):
+        route, query, method = request.route, request.query, request.command
+
+        if route == '/v1/disk/resources' and method == 'GET':
+            folder = query.get('path', '').rstrip('/')
+            items = [{'name': path.rsplit('/', 1)[-1], 'path': 'disk:/' + path.lstrip('/'), 'type': 'file'}
+                     for path in sorted(self.files) if path.rsplit('/', 1)[0] == folder]
+            offset, limit = int(query.get('offset', 0)), int(query.get('limit', 20))
+            request.send(200, {'_embedded': {'items': items[offset:offset + limit]}})
+
+        elif route in ('/v1/disk/resources/files', '/v1/disk/resources/last-uploaded'):
+            items = [{'name': path.rsplit('/', 1)[-1], 'path': 'disk:/' + path.lstrip('/')} for path in sorted(self.files)]
+            offset, limit = int(query.get('offset', 0)), int(query.get('limit', 20))
+            request.send(200, {'items': items[offset:offset + limit]})
+
+        elif route == '/v1/disk/resources' and method == 'PUT':
+            request.send(201, {'href': f"{self.url}/v1/disk/resources?path={query.get('path')}", 'method': 'GET'})
+
+        elif route == '/v1/disk/resources' and method == 'DELETE':
+            self.files.pop(query.get('path'), None)
+            request.send(204)
+
+        elif route == '/v1/disk/resources/upload' and method == 'POST':
+            with self._lock:
+                self._operations += 1
+                operation = self._operations
+            self.files[query.get('path')] = 0
+            request.send(202, {'href': f"{self.url}/v1/disk/operations/{operation}", 'method': 'GET'})
+
+        elif route == '/v1/disk/resources/upload' and method == 'GET':
+            with self._lock:
+                self._operations += 1
+                operation = self._operations
+            request.send(200, {'href': f"{self.url}/upload-target/{operation}?path={query.get('path')}", 'method': 'PUT'})
+
+        elif route.startswith('/upload-target/'):
+            self.files[query.get('path')] = len(request.body)
+            request.send(201)
+
+        elif route.startswith('/v1/disk/operations/'):
+            request.send(200, {'status': 'success'})
+
+        else:
+            super().handle(request)
+
+
+class FakeGoogleDrive(FakeServer):
+    '''
+    Класс FakeGoogleDrive - заменитель REST API Google.Drive версии 3
+    (список и удаление файлов, загрузка multipart и resumable).
+    '''
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.files = {}
+        self._uploads = {}
+        self._ids = 0
+
+    def _new_id(self):
+        with self._lock:
+            self._ids += 1
+            return f"{self._ids:012x}"
+
+    def _create(self, request, size):
+        file_id = self._new_id()
+        self.files[file_id] = size
+        request.send(200, {'id': file_id})
+
+    def handle(self, request):
+        route, query, method = request.route, request.query, request.command
+
+        if route == '/drive/v3/files' and method == 'GET':
+            request.send(200, {'files': []})
+
+        elif route.startswith('/drive/v3/files/') and method == 'DELETE':
+            self.files.pop(route.rsplit('/', 1)[-1], None)
+            request.send(204)
+
+        elif route == '/upload/drive/v3/files' and 'upload_id' in query:
+            self._resumable_chunk(request, query['upload_id'])
+
+        elif route == '/upload/drive/v3/files' and query.get('uploadType') == 'resumable':
+            upload_id = self._new_id()
+            self._uploads[upload_id] = 0
+            request.send(200, headers={'Location': f"{self.url}/upload/drive/v3/files?uploadType=resumable&upload_id={upload_id}"})
+
+        elif route == '/upload/drive/v3/files' and method == 'POST':
+            self._create(request, len(request.body))
+
+        else:
+            super().handle(request)
+
+    def _resumable_chunk(self, request, upload_id):
+        received = self._uploads.get(upload_id, 0) + len(request.body)
+
+        self._uploads[upload_id] = received
+
+        # Content-Range: bytes 0-1048575/* либо bytes 1048576-1100000/1100001
+        match = re.match(r'bytes (?:\d+-\d+|\*)/(\d+|\*)', request.headers.get('Content-Range', ''))
+
+        total = match.group(1) if match else '*'
+
+        if total != '*' and received >= int(total):
+            del self._uploads[upload_id]
+            self._create(request, received)
+
+        else:
+            request.send(308, headers={'Range': f"bytes=0-{received - 1}"})
@@ -0,0 +1,91 @@
+'''
+Замер времени запуска программы.
+
+Для каждого сценария запускается отдельный процесс Python, который импортирует interface
+и создаёт нужные клиенты; измеряется время выполнения и проверяется, был ли загружен googleapiclient.
+
+Запуск: python benchmarks/startup.py [--runs 10]
+'''
+
+import os
+
+import sys
+
+import json
+
+import argparse
+
+import subprocess
+
+from statistics import median
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    'import': '',
+    'vk': 'clients.vk_client',
+    'yandex': 'clients.yandex_disk',
+}
+
+CODE = '''
+import sys, time, json
+started = time.perf_counter()
+import interface
+clients = interface.Clients()
+{access}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"elapsed": elapsed, "googleapiclient": "googleapiclient" in sys.modules}}))
+'''
+
+
+def measure(access, runs):
+    '''
+    Функция для замера времени запуска одного сценария.
+
+    Parameters
+    ----------
+    access: str
+        код обращения к клиенту (например, clients.vk_client).
+
+    runs: int
+        количество запусков.
+
+    В качестве возврата (return) функция использует словарь с медианой и минимумом времени (в мс)
+    и признаком загрузки googleapiclient.
+
+    '''
+
+    timings = []
+
+    loaded = False
+
+    for _ in range(runs):
+
+        output = subprocess.run([sys.executable, '-c', CODE.format(access=access)], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout
+
+        result = json.loads(output.strip().splitlines()[-1])
+
+        timings.append(result['elapsed'] * 1000)
+
+        loaded = loaded or result['googleapiclient']
+
+    return {'median_ms': round(median(timings), 2), 'min_ms': round(min(timings), 2), 'googleapiclient': loaded}
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='Замер времени запуска программы.')
+    parser.add_argument('--runs', type=int, default=10, help='количество запусков каждого сценария')
+    args = parser.parse_args(argv)
+
+    report = {name: measure(access, args.runs) for name, access in SCENARIOS.items()}
+
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=4)
+    print()
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,284 @@
+'''
+Замер производительности переноса фотографий на локальных серверах-заменителях (см. fake_servers).
+
+Серверы Вконтакте, Яндекс.Диска и Google.Drive запускаются в основном процессе,
+каждый сценарий выполняется в отдельном процессе Python, клиенты которого направлены
+на локальные серверы (через атрибуты url и адреса в документе обнаружения Drive API).
+Для каждого сценария выводятся: количество фото в секунду, количество запросов к каждому серверу
+(по адресам), задержка запросов на стороне клиента (p50, p99) и пиковый объём памяти процесса (RSS).
+
+Сценарии:
+vk - получение списка фотографий (VkUser.get_photos),
+yandex - загрузка на Яндекс.Диск по url (YandexDisk.download_files_yandex_disk и OperationTracker),
+google - потоковая загрузка на Google.Drive (google_drive.download_files_google_drive),
+pipeline - конвейер получения списка и загрузки на Яндекс.Диск (TransferPipeline),
+fan_out - однократное скачивание и загрузка в оба места назначения (FanOutTransfer).
+
+Запуск: python benchmarks/transfer.py [--photos 1000] [--latency 0.01] [--error-rate 0.01] [--scenarios vk yandex]
+'''
+
+import os
+
+import sys
+
+import json
+
+import time
+
+import argparse
+
+import tempfile
+
+import subprocess
+
+from collections import defaultdict
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+
+SCENARIOS = ('vk', 'yandex', 'google', 'pipeline', 'fan_out')
+
+
+class LatencyRecorder:
+    '''
+    Класс LatencyRecorder - замер задержки HTTP-запросов на стороне клиента.
+
+    На время замера оборачивает requests.Session.send (VkUser, YandexDisk, скачивание фото)
+    и httplib2.Http.request (googleapiclient) и группирует задержки по серверу назначения.
+    '''
+
+    def __init__(self, urls):
+        self.urls = urls
+        self.latencies = defaultdict(list)
+
+    def _label(self, url):
+        for name, prefix in self.urls.items():
+            if str(url).startswith(prefix):
+                return name
+
+        return 'other'
+
+    def _wrap(self, owner, attribute, url_argument):
+        original = getattr(owner, attribute)
+
+        recorder = self
+
+        def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+
+            try:
+                return original(self, *args, **kwargs)
+
+            finally:
+                url = url_argument(args, kwargs)
+                recorder.latencies[recorder._label(url)].append(time.perf_counter() - started)
+
+        setattr(owner, attribute, wrapper)
+
+    def install(self):
+        import requests
+
+        self._wrap(requests.Session, 'send', lambda args, kwargs: args[0].url)
+
+        try:
+            import httplib2
+
+        except ImportError:
+            return
+
+        self._wrap(httplib2.Http, 'request', lambda args, kwargs: args[0] if args else kwargs.get('uri'))
+
+    def report(self):
+        report = {}
+
+        for name, values in self.latencies.items():
+            values = sorted(values)
+            report[name] = {
+                'count': len(values),
+                'p50_ms': round(values[int(0.50 * (len(values) - 1))] * 1000, 2),
+                'p99_ms': round(values[int(0.99 * (len(values) - 1))] * 1000, 2)
+            }
+
+        return report
+
+
+def drive_service(url):
+    '''
+    Функция, создающая сервис Google.Drive, направленный на локальный сервер.
+    Используется статический документ обнаружения Drive API с заменёнными адресами.
+    '''
+
+    from googleapiclient.discovery import build_from_document
+    from googleapiclient.discovery_cache import get_static_doc
+    from google.auth.credentials import AnonymousCredentials
+
+    document = json.loads(get_static_doc('drive', 'v3'))
+
+    document['rootUrl'] = url + '/'
+    document['baseUrl'] = url + '/drive/v3/'
+
+    return build_from_document(document, credentials=AnonymousCredentials())
+
+
+def run_scenario(name, urls, args):
+    '''
+    Функция, выполняющая один сценарий в текущем процессе.
+
+    В качестве возврата (return) функция использует словарь с результатами замера.
+
+    '''
+
+    import resource
+
+    from rate_limiter import vk_limiter, yandex_limiter, google_limiter
+    from vk_classes import VkUser
+    from ya_disk import YandexDisk, OperationTracker
+
+    vk_limiter.configure(args.vk_rate)
+    yandex_limiter.configure(args.yandex_rate)
+    google_limiter.configure(args.google_rate)
+
+    recorder = LatencyRecorder(urls)
+    recorder.install()
+
+    vk_client = VkUser('token', '5.131')
+    vk_client.url = urls['vk'] + '/method/'
+
+    yandex_disk = YandexDisk('token', pool_size=args.workers)
+    yandex_disk.url = urls['yandex'] + '/v1/disk/'
+
+    started = time.perf_counter()
+
+    if name == 'pipeline':
+        from pipeline import TransferPipeline, yandex_uploader
+
+        tracker = OperationTracker(yandex_disk)
+        upload = yandex_uploader(yandex_disk, 'benchmark', tracker)
+        results = TransferPipeline(upload, workers=args.workers).run(
+            vk_client.iter_photos('profile', 0, 1, limit=args.photos))
+        tracker.wait(timeout=600)
+        tracker.stop()
+
+        photos = results
+
+    else:
+        photos = vk_client.get_photos('profile', 0, 1, args.photos) or []
+
+    fetched = time.perf_counter()
+
+    if name == 'yandex':
+        tracker = OperationTracker(yandex_disk)
+        yandex_disk.download_files_yandex_disk('benchmark', photos, workers=args.workers, tracker=tracker)
+        tracker.wait(timeout=600)
+        tracker.stop()
+
+    elif name == 'google':
+        import google_drive
+
+        google_drive.download_files_google_drive(drive_service(urls['google']), photos, folder_id='benchmark')
+
+    elif name == 'fan_out':
+        from pipeline import TransferPipeline
+        from fan_out import FanOutTransfer, yandex_destination, google_destination
+
+        destinations = {
+            'yandex': yandex_destination(yandex_disk, 'benchmark'),
+            'google': google_destination(drive_service(urls['google']), 'benchmark')
+        }
+
+        with FanOutTransfer(destinations, workers=args.workers) as fan_out:
+            TransferPipeline(fan_out.upload, workers=args.workers).run(photos)
+
+    finished = time.perf_counter()
+
+    return {
+        'photos': len(photos),
+        'seconds': round(finished - started, 3),
+        'fetch_seconds': round(fetched - started, 3),
+        'photos_per_second': round(len(photos) / (finished - started), 1) if photos else 0.0,
+        'latency': recorder.report(),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+
+def parse_args(argv=None):
+
+    parser = argparse.ArgumentParser(description='Замер производительности переноса фотографий на локальных серверах.')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS), help='сценарии замера')
+    parser.add_argument('--photos', type=int, default=1000, help='количество фотографий')
+    parser.add_argument('--photo-size', type=int, default=100 * 1024, help='размер фотографии в байтах')
+    parser.add_argument('--workers', type=int, default=8, help='количество потоков загрузки')
+    parser.add_argument('--latency', type=float, default=0.01, help='задержка ответа серверов в секундах')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='доля ответов с временной ошибкой')
+    parser.add_argument('--vk-rate', type=float, default=0, help='ограничение частоты запросов к VK (0 - без ограничения)')
+    parser.add_argument('--yandex-rate', type=float, default=0, help='ограничение частоты запросов к Яндекс.Диску')
+    parser.add_argument('--google-rate', type=float, default=0, help='ограничение частоты запросов к Google.Drive')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--urls', help=argparse.SUPPRESS)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+
+    args = parse_args(argv)
+
+    if args.child:
+        sys.path.insert(0, ROOT)
+        print(json.dumps(run_scenario(args.child, json.loads(args.urls), args)))
+        return
+
+    from fake_servers import FakeVk, FakeYandexDisk, FakeGoogleDrive
+
+    options = {'latency': args.latency, 'error_rate': args.error_rate}
+
+    servers = {
+        'vk': FakeVk(photos=args.photos, photo_size=args.photo_size, **options).start(),
+        'yandex': FakeYandexDisk(**options).start(),
+        'google': FakeGoogleDrive(**options).start()
+    }
+
+    urls = {name: server.url for name, server in servers.items()}
+
+    child_args = ['--photos', str(args.photos), '--workers', str(args.workers), '--vk-rate', str(args.vk_rate),
+                  '--yandex-rate', str(args.yandex_rate), '--google-rate', str(args.google_rate)]
+
+    report = {}
+
+    try:
+        # Журналы ошибок и другие файлы сценариев создаются во временной папке.
+        with tempfile.TemporaryDirectory() as directory:
+
+            for name in args.scenarios:
+
+                for server in servers.values():
+                    server.reset()
+
+                completed = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--child', name, '--urls', json.dumps(urls)] + child_args,
+                    cwd=directory, capture_output=True, text=True
+                )
+
+                if completed.returncode != 0:
+                    report[name] = {'error': completed.stderr.strip().splitlines()[-1:]}
+                    continue
+
+                result = json.loads(completed.stdout.strip().splitlines()[-1])
+                result['requests'] = {server_name: dict(server.requests) for server_name, server in servers.items()
+                                      if server.requests}
+
+                report[name] = result
+
+    finally:
+        for server in servers.values():
+            server.stop()
+
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=4)
+    print()
+
+
+if __name__ == '__main__':
+
+    main()
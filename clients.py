@@ -0,0 +1,119 @@
+import os
+
+import importlib
+
+from functools import cached_property
+
+
+def read_token(path):
+    '''
+    Функция для чтения токена из файла.
+
+    Parameters
+    ----------
+    path: str
+        путь к файлу с токеном.
+
+    В качестве возврата (return) функция использует токен либо None, если файл не существует.
+
+    '''
+
+    if not os.path.exists(path):
+        return None
+
+    with open(path, 'r', encoding='utf-8') as file_obj:
+        return file_obj.read().strip()
+
+
+class LazyModule:
+    '''
+    Класс LazyModule - модуль, импортируемый при первом обращении к его атрибутам.
+
+    Основное применение - отложенный импорт google_drive (и вместе с ним всего googleapiclient),
+    чтобы сессии, не работающие с Google.Drive, запускались быстро.
+
+    Attributes
+    ----------
+    name: str
+        имя модуля.
+
+    '''
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+
+        return getattr(self._module, attribute)
+
+
+class Clients:
+    '''
+    Класс Clients - создаёт клиенты VkUser, YandexDisk и сервис Google.Drive при первом обращении.
+
+    Токены читаются, а авторизация в Google.Drive выполняется только тогда,
+    когда соответствующий клиент действительно нужен.
+
+    Attributes
+    ----------
+    vk_token_path: str
+        путь к файлу с токеном Вконтакте.
+
+    yandex_token_path: str
+        путь к файлу с токеном Яндекс.Диска.
+
+    vk_version: str
+        используемая версия API Вконтакте.
+
+
+    Properties
+    ----------
+    vk_client
+        клиент VkUser.
+
+    yandex_disk
+        клиент YandexDisk.
+
+    disk_index
+        локальный индекс файлов Яндекс.Диска (DiskIndex).
+
+    service
+        сервис Google.Drive.
+
+    photo_cache
+        кэш содержимого фотографий на локальном диске (PhotoCache).
+
+    '''
+
+    def __init__(self, vk_token_path='vk_token.txt', yandex_token_path='ya_token.txt', vk_version='5.131'):
+        self.vk_token_path = vk_token_path
+        self.yandex_token_path = yandex_token_path
+        self.vk_version = vk_version
+
+    @cached_property
+    def vk_client(self):
+        from vk_classes import VkUser
+        return VkUser(read_token(self.vk_token_path), self.vk_version)
+
+    @cached_property
+    def yandex_disk(self):
+        from ya_disk import YandexDisk
+        return YandexDisk(read_token(self.yandex_token_path))
+
+    @cached_property
+    def disk_index(self):
+        from disk_index import DiskIndex
+        return DiskIndex(self.yandex_disk)
+
+    @cached_property
+    def service(self):
+        import google_drive
+        return google_drive.authorization()
+
+    @cached_property
+    def photo_cache(self):
+        from photo_cache import PhotoCache
+        return PhotoCache()
@@ -0,0 +1,298 @@
+import posixpath
+
+import sqlite3
+
+import threading
+
+
+def normalize_path(path):
+    '''
+    Функция для приведения пути на Яндекс.Диске к единому виду (без префикса disk: и ведущего /).
+
+    Parameters
+    ----------
+    path: str
+        путь к ресурсу (например, disk:/photos/1.jpg или photos/1.jpg).
+
+    В качестве возврата (return) функция использует нормализованный путь (photos/1.jpg).
+
+    '''
+
+    if path.startswith('disk:'):
+        path = path[len('disk:'):]
+
+    return path.strip('/')
+
+
+class DiskIndex:
+    '''
+    Класс DiskIndex - локальный индекс файлов Яндекс.Диска на основе SQLite.
+
+    Основное применение - проверка наличия файлов на Яндекс.Диске без полного обхода диска
+    при каждой загрузке. Индекс хранит путь, имя, md5, размер и дату изменения файлов
+    и обновляется инкрементально через список последних загруженных файлов
+    (/resources/last-uploaded). Если с момента прошлого обновления загружено больше файлов,
+    чем возвращает один запрос, индекс полностью перестраивается.
+
+    Файлы, удалённые с Яндекс.Диска не через программу, обнаруживаются только
+    при обновлении папки (refresh_folder) или полной перестройке (rebuild).
+
+    Attributes
+    ----------
+    disk: YandexDisk
+        клиент Яндекс.Диска.
+
+    db_path: str
+        путь к файлу базы данных (по умолчанию yandex_index.sqlite3).
+
+
+    Methods
+    -------
+    refresh(limit: int)
+        инкрементально обновляет индекс.
+
+    refresh_folder(path: str)
+        полностью обновляет содержимое одной папки.
+
+    rebuild()
+        перестраивает индекс по полному списку файлов Яндекс.Диска.
+
+    names(folder: str)
+        возвращает множество имён файлов в папке.
+
+    files(folder: str)
+        возвращает информацию о файлах в папке.
+
+    get(path: str)
+        возвращает информацию о файле.
+
+    add(path: str, md5: str, size: int, modified: str)
+        добавляет (обновляет) файл в индексе.
+
+    remove(path: str)
+        удаляет файл из индекса.
+
+    close()
+        закрывает базу данных.
+
+    '''
+
+    fields = ('name', 'path', 'md5', 'size', 'modified')
+
+    def __init__(self, disk, db_path='yandex_index.sqlite3'):
+        self.disk = disk
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.executescript(
+            '''
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                folder TEXT NOT NULL,
+                name TEXT NOT NULL,
+                md5 TEXT,
+                size INTEGER,
+                modified TEXT
+            );
+            CREATE INDEX IF NOT EXISTS files_folder ON files (folder, name);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            '''
+        )
+
+    def _get_meta(self, key):
+        row = self._connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self._connection.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    @staticmethod
+    def _row(file_dict):
+        path = normalize_path(file_dict['path'])
+        return (path, posixpath.dirname(path), posixpath.basename(path),
+                file_dict.get('md5'), file_dict.get('size'), file_dict.get('modified'))
+
+    def _upsert(self, files):
+        self._connection.executemany(
+            'INSERT OR REPLACE INTO files (path, folder, name, md5, size, modified) VALUES (?, ?, ?, ?, ?, ?)',
+            (self._row(file_dict) for file_dict in files)
+        )
+
+    def _update_watermark(self, files):
+        '''
+        Сохраняет наибольшую дату изменения среди files как отметку последнего обновления.
+        Является приватным методом.
+        '''
+
+        dates = [file_dict['modified'] for file_dict in files if file_dict.get('modified')]
+
+        watermark = self._get_meta('last_modified')
+
+        if dates and (watermark is None or max(dates) > watermark):
+            self._set_meta('last_modified', max(dates))
+
+    def rebuild(self):
+        '''
+        Метод для полной перестройки индекса по списку всех файлов Яндекс.Диска.
+        '''
+
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM files')
+            self._connection.execute("DELETE FROM meta WHERE key = 'last_modified'")
+
+            batch = []
+
+            for file_dict in self.disk.iter_files(fields=self.fields):
+
+                batch.append(file_dict)
+
+                if len(batch) >= 1000:
+                    self._upsert(batch)
+                    self._update_watermark(batch)
+                    batch.clear()
+
+            self._upsert(batch)
+            self._update_watermark(batch)
+
+    def refresh(self, limit=1000):
+        '''
+        Метод для инкрементального обновления индекса.
+
+        Parameters
+        ----------
+        limit: int
+            количество последних загруженных файлов, запрашиваемых за одно обновление.
+
+        Если индекс ещё не построен или среди последних limit файлов нет ни одного,
+        загруженного до прошлого обновления (то есть часть новых файлов могла быть пропущена),
+        индекс перестраивается полностью.
+
+        '''
+
+        with self._lock:
+            watermark = self._get_meta('last_modified')
+
+        if watermark is None:
+            self.rebuild()
+            return
+
+        files = self.disk.get_last_uploaded(limit, fields=self.fields)
+
+        if files is None:
+            return
+
+        new_files = [file_dict for file_dict in files if (file_dict.get('modified') or '') > watermark]
+
+        if len(files) >= limit and len(new_files) == len(files):
+            self.rebuild()
+            return
+
+        with self._lock, self._connection:
+            self._upsert(new_files)
+            self._update_watermark(new_files)
+
+    def refresh_folder(self, path):
+        '''
+        Метод для полного обновления содержимого одной папки в индексе.
+
+        Parameters
+        ----------
+        path: str
+            путь к папке на Яндекс.Диске.
+
+        '''
+
+        folder = normalize_path(path)
+
+        files = list(self.disk.iter_files(path, fields=self.fields))
+
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM files WHERE folder = ?', (folder,))
+            self._upsert(files)
+
+    def names(self, folder):
+        '''
+        Метод для получения имён файлов в папке.
+
+        Parameters
+        ----------
+        folder: str
+            путь к папке на Яндекс.Диске.
+
+        В качестве возврата (return) метод использует множество имён файлов.
+
+        '''
+
+        with self._lock:
+            rows = self._connection.execute('SELECT name FROM files WHERE folder = ?', (normalize_path(folder),))
+            return {row[0] for row in rows}
+
+    def files(self, folder):
+        '''
+        Метод для получения информации о файлах в папке.
+
+        Parameters
+        ----------
+        folder: str
+            путь к папке на Яндекс.Диске.
+
+        В качестве возврата (return) метод использует словарь, где ключом является имя файла,
+        а значением - словарь (file_name, path, md5, size, modified).
+
+        '''
+
+        with self._lock:
+            rows = self._connection.execute('SELECT path, name, md5, size, modified FROM files WHERE folder = ?',
+                                            (normalize_path(folder),)).fetchall()
+
+        return {row[1]: {'file_name': row[1], 'path': row[0], 'md5': row[2], 'size': row[3], 'modified': row[4]}
+                for row in rows}
+
+    def get(self, path):
+        '''
+        Метод для получения информации о файле.
+
+        Parameters
+        ----------
+        path: str
+            путь к файлу на Яндекс.Диске.
+
+        В качестве возврата (return) метод использует словарь (file_name, path, md5, size, modified)
+        либо None, если файла нет в индексе.
+
+        '''
+
+        with self._lock:
+            row = self._connection.execute('SELECT path, name, md5, size, modified FROM files WHERE path = ?',
+                                           (normalize_path(path),)).fetchone()
+
+        if row is None:
+            return None
+
+        return {'file_name': row[1], 'path': row[0], 'md5': row[2], 'size': row[3], 'modified': row[4]}
+
+    def add(self, path, md5=None, size=None, modified=None):
+        '''
+        Метод для добавления (обновления) файла в индексе, например, после загрузки через программу.
+        '''
+
+        with self._lock, self._connection:
+            self._upsert([{'path': path, 'md5': md5, 'size': size, 'modified': modified}])
+
+    def remove(self, path):
+        '''
+        Метод для удаления файла из индекса, например, после удаления через программу.
+        '''
+
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM files WHERE path = ?', (normalize_path(path),))
+
+    def close(self):
+        '''
+        Метод для закрытия базы данных.
+        '''
+
+        self._connection.close()
@@ -0,0 +1,91 @@
+import os
+
+import time
+
+from transfer_log import JsonLinesLog
+
+
+class ErrorLog(JsonLinesLog):
+    '''
+    Класс ErrorLog - общий буферизованный журнал ошибок API в формате JSON Lines.
+
+    Основное применение - запись ошибок VkUser и YandexDisk. Каждая ошибка записывается
+    одной строкой вместе со временем, источником и контекстом запроса (метод, адрес, параметры),
+    поэтому журнал остаётся корректным JSON Lines и читается функцией read_log.
+    Файл не открывается на каждую ошибку: записи копятся в буфере и сбрасываются пачкой.
+    Когда размер файла превышает max_bytes, он переименовывается в {path}.1
+    (старые копии сдвигаются до {path}.{backups}), и запись продолжается в новый файл.
+
+    Attributes
+    ----------
+    path: str
+        путь к файлу журнала.
+
+    max_bytes: int
+        размер файла (в байтах), после которого выполняется ротация.
+
+    backups: int
+        количество хранимых старых копий журнала.
+
+
+    Methods
+    -------
+    record(source: str, error: dict, context: dict)
+        добавляет запись об ошибке в журнал.
+
+    '''
+
+    def __init__(self, path, max_bytes=5 * 1024 * 1024, backups=3, flush_every=50, flush_interval=1.0):
+        super().__init__(path, flush_every, flush_interval)
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    def record(self, source, error, context=None):
+        '''
+        Метод для добавления записи об ошибке в журнал.
+
+        Parameters
+        ----------
+        source: str
+            источник ошибки (например, vk или yandex).
+
+        error: dict
+            ответ сервера с описанием ошибки.
+
+        context: dict
+            контекст запроса (метод, адрес, параметры). Токены в контекст не передаются.
+
+        '''
+
+        self.write({
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'source': source,
+            'context': context,
+            'error': error
+        })
+
+    def _rotate(self):
+        for index in range(self.backups - 1, 0, -1):
+
+            old_path = f"{self.path}.{index}"
+
+            if os.path.exists(old_path):
+                os.replace(old_path, f"{self.path}.{index + 1}")
+
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+
+        else:
+            os.remove(self.path)
+
+    def _write_lines(self, lines):
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            self._rotate()
+
+        super()._write_lines(lines)
+
+
+# Общие журналы ошибок: все клиенты одного сервиса пишут в один файл.
+vk_errors = ErrorLog('log_vk.jsonl')
+
+yandex_errors = ErrorLog('log_yandex.jsonl')
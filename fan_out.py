@@ -0,0 +1,310 @@
+import hashlib
+
+from concurrent.futures import ThreadPoolExecutor
+
+from http_session import create_session
+
+from retry import default_policy, check_http_response, check_requests_error
+
+from metrics import registry
+
+
+def fetch_photo(url, session=None, retry_policy=default_policy):
+    '''
+    Функция для скачивания фотографии-источника (например, с сервера Вконтакте).
+
+    Parameters
+    ----------
+    url: str
+        адрес фотографии.
+
+    session: requests.Session
+        HTTP-сессия, через которую выполняется запрос. По умолчанию создаётся новая.
+
+    retry_policy: RetryPolicy
+        политика повторных попыток (по умолчанию общая default_policy).
+
+    В качестве возврата (return) функция использует содержимое файла (bytes).
+
+    '''
+
+    session = session or create_session()
+
+    def send():
+        with registry.track('vk_cdn', 'photo') as record:
+            response = session.get(url)
+            record.response(response.status_code, len(response.content))
+
+        return response
+
+    response = retry_policy.call(send, check_http_response, check_requests_error,
+                                 registry.retry_callback('vk_cdn', 'photo'))
+
+    response.raise_for_status()
+
+    return response.content
+
+
+def stream_photo(url, session=None, chunk_size=1024 * 1024):
+    '''
+    Генератор для потокового скачивания фотографии-источника частями (без загрузки файла в память целиком).
+
+    Parameters
+    ----------
+    url: str
+        адрес фотографии.
+
+    session: requests.Session
+        HTTP-сессия, через которую выполняется запрос. По умолчанию создаётся новая.
+
+    chunk_size: int
+        размер части в байтах (по умолчанию 1 МБ).
+
+    В качестве результата (yield) генератор возвращает части содержимого файла (bytes).
+
+    '''
+
+    session = session or create_session()
+
+    with registry.track('vk_cdn', 'photo') as record, session.get(url, stream=True) as response:
+
+        record.response(response.status_code)
+
+        response.raise_for_status()
+
+        for chunk in response.iter_content(chunk_size):
+            record.bytes_in += len(chunk)
+            yield chunk
+
+
+def _unchanged(data, remote):
+    if remote is None or not remote.get('md5') or remote.get('size') is None:
+        return False
+
+    return len(data) == int(remote['size']) and hashlib.md5(data).hexdigest() == remote['md5']
+
+
+def yandex_destination(disk, path, remote_files=None, disk_index=None):
+    '''
+    Функция, создающая место назначения Яндекс.Диск для FanOutTransfer.
+
+    Parameters
+    ----------
+    disk: YandexDisk
+        клиент Яндекс.Диска.
+
+    path: str
+        путь к папке на Яндекс.Диске.
+
+    remote_files: dict
+        файлы папки назначения (имя -> md5 и size, например DiskIndex.files(path)).
+        Совпадающие файлы пропускаются, изменившиеся - перезаписываются.
+
+    disk_index: DiskIndex
+        индекс файлов Яндекс.Диска. Если задан, загруженные файлы добавляются в индекс.
+
+    В качестве возврата (return) функция использует функцию загрузки (photo, data) -> результат.
+
+    '''
+
+    remote_files = remote_files or {}
+
+    def upload(photo, data):
+
+        res_path = f"{path}/{photo.file_name}"
+
+        remote = remote_files.get(photo.file_name)
+
+        if _unchanged(data, remote):
+            return {'file_name': photo.file_name, 'path': res_path, 'status': 'skipped'}
+
+        result = disk.upload_bytes(res_path, data, overwrite=remote is not None)
+
+        result['file_name'] = photo.file_name
+
+        if disk_index is not None and result['status'] == 'success':
+            disk_index.add(res_path, hashlib.md5(data).hexdigest(), len(data))
+
+        return result
+
+    return upload
+
+
+def google_destination(service, folder_id, remote_files=None):
+    '''
+    Функция, создающая место назначения Google.Drive для FanOutTransfer.
+
+    Parameters
+    ----------
+    service
+        сервис, который будет использовать 3ю версию REST API Google.Drive,
+        отправляя запросы из-под учетных данных credentials.
+
+    folder_id: str
+        идентификатор папки на Google.Drive.
+
+    remote_files: dict
+        файлы папки назначения (имя -> id, md5 и size).
+        Совпадающие файлы пропускаются, изменившиеся - удаляются и загружаются заново.
+
+    В качестве возврата (return) функция использует функцию загрузки (photo, data) -> результат.
+
+    '''
+
+    import google_drive
+
+    remote_files = remote_files or {}
+
+    def upload(photo, data):
+
+        result = {'file_name': photo.file_name, 'path': f"{folder_id}/{photo.file_name}"}
+
+        remote = remote_files.get(photo.file_name)
+
+        if _unchanged(data, remote):
+            result.update({'status': 'skipped', 'id': remote['id']})
+            return result
+
+        try:
+            if remote is not None:
+                google_drive.delete_files_google_drive(service, remote['id'])
+
+            file = google_drive.upload_bytes_google_drive(service, photo.file_name, data, folder_id)
+
+        except Exception as error:
+            result.update({'status': 'error', 'error': repr(error)})
+            return result
+
+        result.update({'status': 'success', 'id': file.get('id')})
+
+        return result
+
+    return upload
+
+
+class FanOutTransfer:
+    '''
+    Класс FanOutTransfer - перенос фотографий сразу в несколько мест назначения.
+
+    Основное применение - зеркалирование фотографий на Яндекс.Диск и Google.Drive:
+    каждая фотография скачивается с сервера Вконтакте один раз, после чего загружается
+    во все места назначения параллельно. Объём скачиваемых данных и время переноса
+    не растут с количеством мест назначения.
+
+    Метод upload обрабатывает одну фотографию, поэтому объект можно передать в TransferPipeline
+    (TransferPipeline(fan_out.upload, workers).run(photos)) - тогда одновременно в памяти
+    находится не больше workers + queue_size фотографий.
+
+    Attributes
+    ----------
+    destinations: dict
+        места назначения: название -> функция загрузки (см. yandex_destination, google_destination).
+
+    workers: int
+        количество фотографий, загружаемых одновременно (по умолчанию 8).
+
+    manifests: dict
+        манифесты синхронизации для мест назначения (название -> SyncManifest). Необязательный параметр.
+
+    fetch: callable
+        функция получения содержимого фотографии по записи Photo. По умолчанию фотография
+        скачивается по url через общую HTTP-сессию (fetch_photo).
+
+    cache: PhotoCache
+        кэш содержимого фотографий. Если задан, фотографии читаются из кэша
+        и скачиваются только при отсутствии в нём.
+
+
+    Methods
+    -------
+    upload(photo: Photo)
+        скачивает фотографию и загружает её во все места назначения.
+
+    close()
+        завершает потоки загрузки.
+
+    '''
+
+    def __init__(self, destinations, workers=8, manifests=None, fetch=None, cache=None):
+        self.destinations = destinations
+        self.workers = max(1, workers)
+        self.manifests = manifests or {}
+        self.session = create_session(self.workers)
+        self.fetch = fetch or (lambda photo: fetch_photo(photo.url, self.session))
+
+        if cache is not None:
+            fetch_source = self.fetch
+            self.fetch = lambda photo: cache.get_or_fetch(photo, lambda url: fetch_source(photo))
+
+        self._executor = ThreadPoolExecutor(max_workers=self.workers * max(1, len(destinations)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+        for manifest in self.manifests.values():
+            manifest.save()
+
+    def upload(self, photo):
+        '''
+        Метод для переноса одной фотографии во все места назначения.
+
+        Parameters
+        ----------
+        photo: Photo
+            запись Photo с информацией о фотографии.
+
+        В качестве возврата (return) метод использует словарь с результатом:
+        file_name, path, status ('success', 'skipped' либо 'error'), error (описание ошибок)
+        и destinations (результаты загрузки для каждого места назначения).
+        Статус 'success' означает, что во всех местах назначения файл загружен или не изменился.
+
+        '''
+
+        result = {'file_name': photo.file_name, 'path': None}
+
+        try:
+            data = self.fetch(photo)
+
+        except Exception as error:
+            results = {name: {'file_name': photo.file_name, 'path': None, 'status': 'error', 'error': repr(error)}
+                       for name in self.destinations}
+
+        else:
+            futures = {name: self._executor.submit(upload, photo, data) for name, upload in self.destinations.items()}
+
+            results = {}
+
+            for name, future in futures.items():
+
+                try:
+                    results[name] = future.result()
+
+                except Exception as error:
+                    results[name] = {'file_name': photo.file_name, 'path': None, 'status': 'error', 'error': repr(error)}
+
+        for name, manifest in self.manifests.items():
+            manifest.mark(photo.id, 'failed' if results[name]['status'] == 'error' else 'done', results[name]['path'], photo.owner_id)
+
+        statuses = {value['status'] for value in results.values()}
+
+        errors = [f"{name}: {value['error']}" for name, value in results.items() if value['status'] == 'error']
+
+        if errors:
+            result.update({'status': 'error', 'error': '; '.join(errors)})
+
+        elif statuses == {'skipped'}:
+            result['status'] = 'skipped'
+
+        else:
+            result['status'] = 'success'
+
+        result['destinations'] = results
+
+        return result
@@ -1,23 +1,193 @@
 from __future__ import print_function
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
-from googleapiclient.http import MediaIoBaseUpload
+from googleapiclient.http import MediaUpload, MediaIoBaseUpload, MediaFileUpload
+from googleapiclient.errors import HttpError
+from google_auth_httplib2 import AuthorizedHttp
+from rate_limiter import google_limiter
+from retry import default_policy, check_requests_error, parse_retry_after, RETRY_STATUSES
+from metrics import registry
+from fan_out import stream_photo
+from http_session import DEFAULT_TIMEOUT
 from  tqdm  import  tqdm
 import requests
+import threading
+import httplib2
 import os.path
-import time
 import io
+import json
+import time
 
 
 # Если вы изменяете область доступа, удалите файл token.json.
 SCOPES = ['https://www.googleapis.com/auth/drive']
 
+# Локальная копия документа обнаружения (discovery document) Drive API v3.
+# Если файла нет, используется документ, поставляемый вместе с googleapiclient,
+# поэтому сервис создаётся без сетевого запроса.
+DISCOVERY_PATH = './drive_v3_discovery.json'
 
-def authorization():
+# Папка, в которую по умолчанию загружаются файлы.
+FOLDER_ID = '1Y0u2CF44I3Ewx5C63UAsXBXeKEk4wPjZ'
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+# Максимальный размер страницы, допустимый для files.list.
+PAGE_SIZE = 1000
+
+# Количество имён файлов в одном условии запроса (ограничивает длину параметра q).
+NAMES_PER_QUERY = 40
+
+FILE_FIELDS = 'id, name, mimeType, parents, createdTime'
+
+# HTTP-клиенты потоков: httplib2.Http не является потокобезопасным,
+# поэтому каждый дополнительный поток использует собственный клиент с теми же учётными данными.
+_thread_local = threading.local()
+
+# Кэш идентификаторов папок: (имя папки, идентификатор родительской папки) -> идентификатор папки.
+_folder_ids = {}
+_folder_ids_lock = threading.Lock()
+
+# Максимальное количество запросов в одном пакетном запросе (batch) к Google.Drive.
+BATCH_SIZE = 100
+
+# Размер части файла при возобновляемой загрузке (должен быть кратен 256 КБ).
+CHUNK_SIZE = 1024 * 1024
+
+# Файлы не больше этого размера загружаются одним запросом (multipart), а не возобновляемой загрузкой.
+MULTIPART_LIMIT = 5 * 1024 * 1024
+
+
+class MediaStreamUpload(MediaUpload):
     '''
-    Функция, обеспечивающая авторизацию пользователя и вход в систему.
+    Класс MediaStreamUpload - возобновляемая загрузка на Google.Drive из потока без перемотки.
+
+    В отличие от MediaIoBaseUpload не требует, чтобы весь файл находился в памяти
+    или поддерживал seek: данные читаются из потока частями по chunksize байт,
+    а в памяти хранится только текущая часть (она нужна для повторной отправки при сбое).
+
+    Attributes
+    ----------
+    stream
+        объект с методом read(size), например, response.raw потокового ответа requests.
+
+    mimetype: str
+        MIME-тип загружаемого файла.
+
+    chunksize: int
+        размер части файла в байтах (должен быть кратен 256 КБ).
+
+    size: int
+        размер файла в байтах, если он известен заранее (иначе None).
+
+    read_seconds: float
+        суммарное время чтения из потока (в секундах).
+
+    bytes_read: int
+        количество байт, прочитанных из потока.
+
+    '''
+
+    def __init__(self, stream, mimetype, chunksize=CHUNK_SIZE, size=None):
+        super().__init__()
+        self._stream = stream
+        self._mimetype = mimetype
+        self._chunksize = chunksize
+        self._size = size
+        self._buffer = b''
+        self._buffer_start = 0
+        self.read_seconds = 0.0
+        self.bytes_read = 0
+
+    def chunksize(self):
+        return self._chunksize
+
+    def mimetype(self):
+        return self._mimetype
+
+    def size(self):
+        return self._size
+
+    def resumable(self):
+        return True
+
+    def has_stream(self):
+        return False
+
+    def getbytes(self, begin, length):
+        '''
+        Метод, возвращающий часть файла, начиная с позиции begin.
+
+        Повторно можно запросить только текущую часть (после сбоя её отправки),
+        данные до неё уже отброшены.
+
+        '''
+
+        if begin < self._buffer_start:
+            raise ValueError('Поток не поддерживает возврат к уже отправленным данным.')
+
+        self._buffer = self._buffer[begin - self._buffer_start:]
+        self._buffer_start = begin
+
+        parts = [self._buffer]
+        buffered = len(self._buffer)
+
+        while buffered < length:
+
+            started = time.perf_counter()
+
+            data = self._stream.read(length - buffered)
+
+            self.read_seconds += time.perf_counter() - started
+            self.bytes_read += len(data)
+
+            if not data:
+                break
+
+            parts.append(data)
+            buffered += len(data)
+
+        self._buffer = b''.join(parts)
+
+        return self._buffer[:length]
+
+
+class _BufferReader(io.RawIOBase):
+    '''
+    Чтение из объекта с буферным протоколом (bytes, mmap) без копирования его целиком:
+    MediaIoBaseUpload копирует в память только запрошенную часть.
+    '''
+
+    def __init__(self, data):
+        self._view = memoryview(data)
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def read(self, size=-1):
+        end = len(self._view) if size is None or size < 0 else self._position + size
+        data = bytes(self._view[self._position:end])
+        self._position += len(data)
+        return data
+
+
+def get_credentials():
+    '''
+    Функция, возвращающая учетные данные пользователя (при необходимости - с авторизацией и входом в систему).
     '''
 
     creds = None
@@ -43,14 +213,191 @@ def authorization():
         with open('./token.json', 'w', encoding='utf-8') as token:
             token.write(creds.to_json())
 
-    service = build('drive', 'v3', credentials=creds)
+    return creds
+
+
+def authorization():
+    '''
+    Функция, обеспечивающая авторизацию пользователя и вход в систему.
+
+    Сервис создаётся по локальному документу обнаружения Drive API (DISCOVERY_PATH)
+    либо по статическому документу googleapiclient, без загрузки его по сети.
+    '''
+
+    creds = get_credentials()
+
+    if os.path.exists(DISCOVERY_PATH):
+
+        with open(DISCOVERY_PATH, 'r', encoding='utf-8') as discovery:
+            service = build_from_document(json.load(discovery), credentials=creds)
+
+    else:
+        service = build('drive', 'v3', credentials=creds, static_discovery=True, cache_discovery=False)
 
     return service
 
 
-def get_files_google_drive(service):
+def _thread_http(http):
     '''
-    Функция для получения списка файлов на Google.Drive.
+    Функция, возвращающая HTTP-клиент для текущего потока.
+
+    В основном потоке используется клиент сервиса, в остальных - собственный
+    авторизованный клиент потока, создаваемый один раз.
+
+    '''
+
+    if http is None or threading.current_thread() is threading.main_thread() or not hasattr(http, 'credentials'):
+        return http
+
+    clients = _thread_local.__dict__.setdefault('clients', {})
+
+    if id(http) not in clients:
+        clients[id(http)] = AuthorizedHttp(http.credentials, http=httplib2.Http())
+
+    return clients[id(http)]
+
+
+def _check_error(error):
+    '''
+    Функция для проверки исключения при запросе к Google.Drive: временными считаются
+    HttpError со статусами из RETRY_STATUSES, 403 с причиной rateLimitExceeded (userRateLimitExceeded),
+    ошибки соединения и таймауты.
+
+    В качестве возврата (return) функция использует пару (повторять ли запрос, Retry-After).
+
+    '''
+
+    if isinstance(error, HttpError):
+
+        if error.resp.status == 403 and b'ateLimitExceeded' in (error.content or b''):
+            return True, parse_retry_after(error.resp.get('retry-after'))
+
+        return error.resp.status in RETRY_STATUSES, parse_retry_after(error.resp.get('retry-after'))
+
+    if isinstance(error, (ConnectionError, TimeoutError, httplib2.ServerNotFoundError)):
+        return True, None
+
+    return check_requests_error(error)
+
+
+def _execute(request, http=None, retry_policy=default_policy):
+    '''
+    Функция для выполнения запроса к API Google.Drive.
+    Перед каждой попыткой ожидает разрешения общего ограничителя частоты запросов (google_limiter).
+    Временные ошибки повторяются согласно политике retry_policy.
+    Время запросов, ожидания и повторы учитываются в общем реестре метрик (metrics.registry)
+    по названию метода API (например, drive.files.list; пакетные запросы - batch).
+    Запрос выполняется через HTTP-клиент текущего потока, поэтому функцию можно вызывать
+    из нескольких потоков одновременно.
+
+    Parameters
+    ----------
+    request
+        подготовленный запрос googleapiclient (HttpRequest или BatchHttpRequest).
+
+    http
+        HTTP-клиент сервиса. По умолчанию - клиент запроса (для BatchHttpRequest его следует передать явно).
+
+    retry_policy: RetryPolicy
+        политика повторных попыток (по умолчанию общая default_policy). Значение None отключает повторы.
+
+    В качестве возврата (return) функция использует ответ сервера.
+
+    '''
+
+    http = _thread_http(http or getattr(request, 'http', None))
+
+    endpoint = getattr(request, 'methodId', None) or 'batch'
+
+    media = getattr(request, 'resumable', None)
+
+    def send():
+        registry.wait('google', google_limiter.acquire())
+
+        with registry.track('google', endpoint) as record:
+
+            # Чтение потока источника (MediaStreamUpload) учитывается отдельно и не входит во время запроса.
+            read_seconds = getattr(media, 'read_seconds', 0.0)
+
+            try:
+                result = request.execute(http=http)
+
+            except HttpError as error:
+                record.response(error.resp.status)
+                raise
+
+            finally:
+                record.excluded = getattr(media, 'read_seconds', 0.0) - read_seconds
+
+            record.response(200, len(json.dumps(result)) if result else 0, _request_size(request))
+
+        return result
+
+    if retry_policy is None:
+        return send()
+
+    return retry_policy.call(send, check_error=_check_error, on_retry=registry.retry_callback('google', endpoint))
+
+
+def _request_size(request):
+    '''
+    Функция, возвращающая размер отправляемых данных запроса (тело и загружаемый файл, если размер известен).
+    '''
+
+    body = getattr(request, 'body', None)
+
+    size = len(body) if body else 0
+
+    media = getattr(request, 'resumable', None)
+
+    if media is not None and media.size():
+        size += media.size()
+
+    return size
+
+
+def build_query_google_drive(parent_id=None, names=None, mime_type=None, trashed=False):
+    '''
+    Функция для формирования условия поиска файлов (параметр q метода files.list).
+
+    Parameters
+    ----------
+    parent_id: str
+        идентификатор папки, в которой находятся файлы.
+
+    names: iterable
+        имена файлов (файл должен иметь одно из этих имён).
+
+    mime_type: str
+        MIME-тип файлов (например, FOLDER_MIME_TYPE для папок).
+
+    trashed: bool
+        искать ли файлы в Корзине (по умолчанию False).
+
+    В качестве возврата (return) функция использует строку условия поиска.
+
+    '''
+
+    def quote(value):
+        return "'" + value.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+    conditions = [f"trashed = {str(trashed).lower()}"]
+
+    if parent_id is not None:
+        conditions.append(f"{quote(parent_id)} in parents")
+
+    if mime_type is not None:
+        conditions.append(f"mimeType = {quote(mime_type)}")
+
+    if names is not None:
+        conditions.append('(' + ' or '.join(f"name = {quote(name)}" for name in names) + ')')
+
+    return ' and '.join(conditions)
+
+
+def iter_files_google_drive(service, q=None, page_size=PAGE_SIZE, fields=FILE_FIELDS):
+    '''
+    Генератор, постранично возвращающий файлы на Google.Drive.
 
     Parameters
     ----------
@@ -58,49 +405,146 @@ def get_files_google_drive(service):
         сервис, который будет использовать 3ю версию REST API Google.Drive,
         отправляя запросы из-под учетных данных credentials.
 
-    pageSize: int
-        количество результатов выдачи
+    q: str
+        условие поиска файлов (см. build_query_google_drive). По умолчанию - все файлы.
+
+    page_size: int
+        количество результатов на одной странице (не более 1000).
+
+    fields: str
+        поля файлов, которые нужно показывать в результатах выдачи.
+
+        По умолчанию указаны поля:
+        id - идентификатор файла,
+        name - имя файла,
+        mimeType - тип файла,
+        parents — ID папки, в которой расположен файл/подпапка,
+        createdTime — дата создания файла/папки.
+
+        Со всеми возможными полями можно ознакомиться в документации
+        (https://developers.google.com/drive/api/v3/reference/files) в разделе «Valid fields for files.list».
+
+    В качестве результата (yield) генератор возвращает словари с информацией о файлах.
+
+    '''
+
+    page_token = None
 
-    fields: дополнительные поля
+    while True:
 
-        nextPageToken: str
-            токен следующей страницы, если все результаты не помещаются в один ответ.
+        params = {'pageSize': page_size, 'fields': f"nextPageToken, files({fields})"}
 
-        files()
-            параметр, указывающий, что нужно возвращать список файлов,
-            где в скобках указан список полей для файлов, которые нужно показывать в результатах выдачи.
+        if q is not None:
+            params['q'] = q
 
-            В данном случае указаны поля для файлов:
-            id - идентификатор файла,
-            name - имя файла,
-            mimeType - тип файла,
-            parents — ID папки, в которой расположен файл/подпапка,
-            createdTime — дата создания файла/папки.
+        if page_token is not None:
+            params['pageToken'] = page_token
+
+        # Вызов API Drive v3
+
+        results = _execute(service.files().list(**params))
+
+        yield from results.get('files', [])
+
+        page_token = results.get('nextPageToken')
+
+        if not page_token:
+            return
+
+
+def get_files_google_drive(service, q=None):
+    '''
+    Функция для получения списка файлов на Google.Drive.
+
+    Parameters
+    ----------
+    service
+        сервис, который будет использовать 3ю версию REST API Google.Drive,
+        отправляя запросы из-под учетных данных credentials.
 
-            Со всеми возможными полями можно ознакомиться в документации
-            (https://developers.google.com/drive/api/v3/reference/files) в разделе «Valid fields for files.list».
+    q: str
+        условие поиска файлов (см. build_query_google_drive). По умолчанию - все файлы.
 
-    pageToken: str
-        токен страницы с результатом запроса.
+    Файлы запрашиваются страницами максимального размера (см. iter_files_google_drive).
 
     В качестве возврата (return) функция использует список с информацией о файлах на Google.Drive.
 
     '''
 
-    # Вызов API Drive v3
+    return list(iter_files_google_drive(service, q))
+
+
+def find_files_google_drive(service, names, parent_id=None, fields=FILE_FIELDS):
+    '''
+    Генератор, возвращающий файлы с заданными именами (не из Корзины).
 
-    results = service.files().list(pageSize=10,
-                                   fields="nextPageToken, files(id, name, mimeType, parents, createdTime)").execute()
-    nextPageToken = results.get('nextPageToken')
+    Имена разбиваются на группы по NAMES_PER_QUERY, чтобы условие поиска не превышало
+    допустимую длину, поэтому обход всего Google.Drive не требуется.
 
-    while nextPageToken:
-        nextPage = service.files().list(pageSize=10,
-                                        fields="nextPageToken, files(id, name, mimeType, parents, createdTime)",
-                                        pageToken=nextPageToken).execute()
-        nextPageToken = nextPage.get('nextPageToken')
-        results['files'] = results['files'] + nextPage['files']
+    Parameters
+    ----------
+    service
+        сервис, который будет использовать 3ю версию REST API Google.Drive,
+        отправляя запросы из-под учетных данных credentials.
 
-    return results.get('files')
+    names: iterable
+        имена искомых файлов.
+
+    parent_id: str
+        идентификатор папки, в которой следует искать файлы. По умолчанию - весь Google.Drive.
+
+    fields: str
+        поля файлов, которые нужно показывать в результатах выдачи.
+
+    В качестве результата (yield) генератор возвращает словари с информацией о файлах.
+
+    '''
+
+    names = list(names)
+
+    for start in range(0, len(names), NAMES_PER_QUERY):
+
+        q = build_query_google_drive(parent_id=parent_id, names=names[start:start + NAMES_PER_QUERY])
+
+        yield from iter_files_google_drive(service, q, fields=fields)
+
+
+def get_folder_id_google_drive(service, name, parent_id=None):
+    '''
+    Функция для получения идентификатора папки по имени.
+    Найденные идентификаторы кэшируются, поэтому повторный поиск не требует запросов к API.
+
+    Parameters
+    ----------
+    service
+        сервис, который будет использовать 3ю версию REST API Google.Drive,
+        отправляя запросы из-под учетных данных credentials.
+
+    name: str
+        имя папки.
+
+    parent_id: str
+        идентификатор родительской папки. По умолчанию поиск выполняется по всему Google.Drive.
+
+    В качестве возврата (return) функция использует идентификатор папки либо None, если папка не найдена.
+
+    '''
+
+    key = (name, parent_id)
+
+    with _folder_ids_lock:
+        if key in _folder_ids:
+            return _folder_ids[key]
+
+    q = build_query_google_drive(parent_id=parent_id, names=[name], mime_type=FOLDER_MIME_TYPE)
+
+    folder_id = next((folder['id'] for folder in iter_files_google_drive(service, q, page_size=1, fields='id')), None)
+
+    if folder_id is not None:
+        with _folder_ids_lock:
+            _folder_ids[key] = folder_id
+
+    return folder_id
 
 
 def create_directory_google_drive(service, name):
@@ -122,10 +566,13 @@ def create_directory_google_drive(service, name):
 
     file_metadata = {
         'name': name,
-        'mimeType': 'application/vnd.google-apps.folder'
+        'mimeType': FOLDER_MIME_TYPE
     }
-    file = service.files().create(body=file_metadata,
-                                  fields='id').execute()
+    file = _execute(service.files().create(body=file_metadata,
+                                           fields='id'))
+
+    with _folder_ids_lock:
+        _folder_ids[(name, None)] = file.get('id')
 
     print()
     print('Создание папки прошло успешно')
@@ -133,7 +580,179 @@ def create_directory_google_drive(service, name):
     print('Folder ID: %s' % file.get('id'))
 
 
-def download_files_google_drive(service, list_name):
+def upload_photo_google_drive(service, info, folder_id, chunk_size=CHUNK_SIZE, retry_policy=default_policy):
+    '''
+    Функция для потоковой загрузки одной фотографии на Google.Drive.
+
+    Фотография скачивается по частям и сразу передаётся в возобновляемую загрузку Google.Drive,
+    поэтому объём используемой памяти ограничен размером части, а не размером файла.
+    Поток источника нельзя прочитать повторно, поэтому после временной ошибки
+    загрузка повторяется целиком: фотография заново скачивается с начала.
+
+    Скачивание учитывается в метриках отдельно (vk_cdn/photo): время до получения заголовков
+    и время чтения частей из потока. Из времени запроса drive.files.create чтение частей вычитается.
+
+    Parameters
+    ----------
+    service
+        сервис, который будет использовать 3ю версию REST API Google.Drive,
+        отправляя запросы из-под учетных данных credentials.
+
+    info: dict
+        запись Photo с информацией о фотографии.
+
+    folder_id: str
+        идентификатор папки, в которую будет загружен файл.
+
+    chunk_size: int
+        размер части файла в байтах (должен быть кратен 256 КБ).
+
+    retry_policy: RetryPolicy
+        политика повторных попыток (по умолчанию общая default_policy).
+
+    В качестве возврата (return) функция использует ответ сервера (идентификатор созданного файла).
+
+    '''
+
+    def upload():
+
+        media = None
+
+        started = time.perf_counter()
+
+        try:
+            response = requests.get(info.url, stream=True, timeout=DEFAULT_TIMEOUT)
+
+        except Exception as error:
+            registry.observe('vk_cdn', 'photo', time.perf_counter() - started, type(error).__name__)
+            registry.error('vk_cdn', 'photo', type(error).__name__)
+            raise
+
+        headers_seconds = time.perf_counter() - started
+
+        try:
+            response.raise_for_status()
+
+            response.raw.decode_content = True
+
+            size = None
+
+            if 'Content-Length' in response.headers and 'Content-Encoding' not in response.headers:
+                size = int(response.headers['Content-Length'])
+
+            file_metadata = {'name': info.file_name, 'parents': [folder_id]}
+            media = MediaStreamUpload(response.raw, mimetype='image/jpeg', chunksize=chunk_size, size=size)
+
+            return _execute(service.files().create(body=file_metadata, media_body=media, fields='id'),
+                            retry_policy=None)
+
+        finally:
+            response.close()
+
+            # Части читаются внутри запросов к Google.Drive, поэтому время скачивания складывается
+            # из времени до получения заголовков и времени чтения частей.
+            registry.observe('vk_cdn', 'photo', headers_seconds + (media.read_seconds if media else 0.0),
+                             response.status_code, media.bytes_read if media else 0)
+
+    return retry_policy.call(upload, check_error=_check_error,
+                             on_retry=registry.retry_callback('google', 'drive.files.create'))
+
+
+def upload_bytes_google_drive(service, name, data, folder_id, chunk_size=CHUNK_SIZE, retry_policy=default_policy):
+    '''
+    Функция для загрузки уже скачанного файла на Google.Drive (без повторного скачивания по url).
+
+    Файлы не больше MULTIPART_LIMIT загружаются одним запросом, более крупные -
+    возобновляемой загрузкой частями по chunk_size байт.
+
+    Parameters
+    ----------
+    service
+        сервис, который будет использовать 3ю версию REST API Google.Drive,
+        отправляя запросы из-под учетных данных credentials.
+
+    name: str
+        имя файла.
+
+    data: bytes
+        содержимое файла (bytes либо объект с буферным протоколом, например mmap).
+
+    folder_id: str
+        идентификатор папки, в которую будет загружен файл.
+
+    chunk_size: int
+        размер части файла в байтах (должен быть кратен 256 КБ).
+
+    retry_policy: RetryPolicy
+        политика повторных попыток (по умолчанию общая default_policy).
+
+    В качестве возврата (return) функция использует ответ сервера (идентификатор созданного файла).
+
+    '''
+
+    file_metadata = {'name': name, 'parents': [folder_id]}
+
+    def upload():
+        media = MediaIoBaseUpload(_BufferReader(data), mimetype='image/jpeg', chunksize=chunk_size,
+                                  resumable=len(data) > MULTIPART_LIMIT)
+
+        return _execute(service.files().create(body=file_metadata, media_body=media, fields='id'),
+                        retry_policy=None)
+
+    return retry_policy.call(upload, check_error=_check_error,
+                             on_retry=registry.retry_callback('google', 'drive.files.create'))
+
+
+def upload_file_google_drive(service, name, path, folder_id, chunk_size=CHUNK_SIZE, retry_policy=default_policy):
+    '''
+    Функция для загрузки локального файла (например, из PhotoCache) на Google.Drive.
+
+    Файл загружается возобновляемой загрузкой и читается с диска частями по chunk_size байт,
+    поэтому в памяти находится только текущая часть.
+
+    Parameters
+    ----------
+    service
+        сервис, который будет использовать 3ю версию REST API Google.Drive,
+        отправляя запросы из-под учетных данных credentials.
+
+    name: str
+        имя файла на Google.Drive.
+
+    path: str
+        путь к локальному файлу.
+
+    folder_id: str
+        идентификатор папки, в которую будет загружен файл.
+
+    chunk_size: int
+        размер части файла в байтах (должен быть кратен 256 КБ).
+
+    retry_policy: RetryPolicy
+        политика повторных попыток (по умолчанию общая default_policy).
+
+    В качестве возврата (return) функция использует ответ сервера (идентификатор созданного файла).
+
+    '''
+
+    file_metadata = {'name': name, 'parents': [folder_id]}
+
+    def upload():
+        media = MediaFileUpload(path, mimetype='image/jpeg', chunksize=chunk_size, resumable=True)
+
+        try:
+            return _execute(service.files().create(body=file_metadata, media_body=media, fields='id'),
+                            retry_policy=None)
+
+        finally:
+            media.stream().close()
+
+    return retry_policy.call(upload, check_error=_check_error,
+                             on_retry=registry.retry_callback('google', 'drive.files.create'))
+
+
+def download_files_google_drive(service, list_name, chunk_size=CHUNK_SIZE, folder_id=FOLDER_ID, manifest=None,
+                                cache=None):
     '''
     Функция для загрузки файлов на Google.Drive.
 
@@ -146,24 +765,87 @@ def download_files_google_drive(service, list_name):
     list_name: list
         список с информацией о загружаемых файлах.
 
+    chunk_size: int
+        размер части файла в байтах при потоковой загрузке (по умолчанию CHUNK_SIZE).
+
+    folder_id: str
+        идентификатор папки, в которую будут загружены файлы (по умолчанию FOLDER_ID).
+        Идентификатор папки по имени можно получить с помощью get_folder_id_google_drive.
+
+    manifest: SyncManifest
+        манифест синхронизации. Если задан, статус каждой фотографии (done либо failed)
+        записывается в манифест, который сохраняется после загрузки.
+
+    cache: PhotoCache
+        кэш содержимого фотографий. Если задан, фотографии скачиваются в кэш частями
+        (если их там ещё нет) и загружаются из файла кэша, поэтому повторные запуски
+        и повторные попытки не скачивают их заново. Без кэша используется потоковая загрузка
+        с сервера Вконтакте (upload_photo_google_drive).
+
     Результатом работы функции является загрузка файлов на Google.Drive.
 
-    '''
+    В качестве возврата (return) функция использует список результатов загрузки каждого файла:
+    file_name, status ('success' либо 'error'), id (идентификатор файла) либо error (описание ошибки).
+    Ошибка загрузки одного файла не прерывает загрузку остальных.
 
-    folder_id = '1Y0u2CF44I3Ewx5C63UAsXBXeKEk4wPjZ'
+    '''
 
     print()
 
+    results = []
+
     for info in tqdm(list_name, desc='Идёт загрузка файлов на Google.Drive, пожалуйста, подождите ...', unit='S'):
-        time.sleep(1)
-        response = requests.get(info['url'])
-        file_content = io.BytesIO(response.content)
-        file_metadata = {'name': f"{info['file_name']}", 'parents': [folder_id]}
-        media = MediaIoBaseUpload(file_content, mimetype='image/jpeg')
-        service.files().create(body=file_metadata, media_body=media, fields='id').execute()
+
+        try:
+            path = None if cache is None else _cached_path(cache, info)
+
+            if path is not None:
+
+                try:
+                    file = upload_file_google_drive(service, info.file_name, path, folder_id, chunk_size)
+
+                except FileNotFoundError:
+                    # Файл вытеснен из кэша другим потоком - фотография загружается потоком.
+                    path = None
+
+            if path is None:
+                file = upload_photo_google_drive(service, info, folder_id, chunk_size)
+
+            result = {'file_name': info.file_name, 'status': 'success', 'id': file.get('id')}
+
+        except Exception as error:
+            result = {'file_name': info.file_name, 'status': 'error', 'error': repr(error)}
+
+        results.append(result)
+
+        if manifest is not None:
+            manifest.mark(info.id, 'done' if result['status'] == 'success' else 'failed',
+                          f"{folder_id}/{info.file_name}", info.owner_id)
+
+    if manifest is not None:
+        manifest.save()
+
+    errors = [result for result in results if result['status'] == 'error']
 
     print()
-    print('Данные успешно загружены.')
+
+    if errors:
+
+        print(f"Загружено файлов: {len(results) - len(errors)}, с ошибкой: {len(errors)}.")
+
+        for result in errors:
+            print(f"{result['file_name']}: {result['error']}")
+
+    else:
+        print('Данные успешно загружены.')
+
+    return results
+
+
+def _cached_path(cache, info, retry_policy=default_policy):
+    # Путь к файлу фотографии в кэше; None - фотография больше объёма кэша (загружается потоком).
+    return retry_policy.call(lambda: cache.get_or_fetch_path(info, stream_photo), check_error=_check_error,
+                             on_retry=registry.retry_callback('vk_cdn', 'photo'))
 
 
 def delete_files_google_drive(service, fileId):
@@ -183,4 +865,121 @@ def delete_files_google_drive(service, fileId):
 
     '''
 
-    service.files().delete(fileId=fileId).execute()
+    _execute(service.files().delete(fileId=fileId))
+
+
+def _execute_batch(service, requests_list):
+    '''
+    Функция для выполнения запросов пакетами (BatchHttpRequest) по BATCH_SIZE штук.
+
+    Parameters
+    ----------
+    service
+        сервис, который будет использовать 3ю версию REST API Google.Drive,
+        отправляя запросы из-под учетных данных credentials.
+
+    requests_list: list
+        список подготовленных запросов googleapiclient.
+
+    В качестве возврата (return) функция использует список словарей response и error
+    для каждого запроса в порядке следования requests_list.
+
+    '''
+
+    results = [None] * len(requests_list)
+
+    def callback(request_id, response, exception):
+        results[int(request_id)] = {'response': response, 'error': exception}
+
+    for start in range(0, len(requests_list), BATCH_SIZE):
+
+        batch = service.new_batch_http_request(callback=callback)
+
+        for index, request in enumerate(requests_list[start:start + BATCH_SIZE], start):
+            batch.add(request, request_id=str(index))
+
+        _execute(batch, http=requests_list[start].http)
+
+    return results
+
+
+def delete_files_google_drive_batch(service, file_ids):
+    '''
+    Функция для пакетного удаления файлов на Google.Drive (до 100 файлов за один HTTP-запрос).
+
+    Parameters
+    ----------
+    service
+        сервис, который будет использовать 3ю версию REST API Google.Drive,
+        отправляя запросы из-под учетных данных credentials.
+
+    file_ids: list
+        индентификаторы удаляемых файлов.
+
+    В качестве возврата (return) функция использует список словарей с результатом удаления каждого файла:
+    id, status ('success' либо 'error') и error (описание ошибки).
+
+    '''
+
+    file_ids = list(file_ids)
+
+    results = _execute_batch(service, [service.files().delete(fileId=fileId) for fileId in file_ids])
+
+    return [
+        {
+            'id': fileId,
+            'status': 'success' if result['error'] is None else 'error',
+            'error': None if result['error'] is None else str(result['error'])
+        }
+        for fileId, result in zip(file_ids, results)
+    ]
+
+
+def create_directories_google_drive_batch(service, names, parent_id=None):
+    '''
+    Функция для пакетного создания папок на Google.Drive (до 100 папок за один HTTP-запрос).
+
+    Parameters
+    ----------
+    service
+        сервис, который будет использовать 3ю версию REST API Google.Drive,
+        отправляя запросы из-под учетных данных credentials.
+
+    names: list
+        имена создаваемых папок.
+
+    parent_id: str
+        идентификатор родительской папки. По умолчанию папки создаются в корне Google.Drive.
+
+    В качестве возврата (return) функция использует список словарей с результатом создания каждой папки:
+    name, id, status ('success' либо 'error') и error (описание ошибки).
+
+    '''
+
+    names = list(names)
+
+    requests_list = []
+
+    for name in names:
+
+        file_metadata = {
+            'name': name,
+            'mimeType': FOLDER_MIME_TYPE
+        }
+
+        if parent_id is not None:
+            file_metadata['parents'] = [parent_id]
+
+        requests_list.append(service.files().create(body=file_metadata, fields='id'))
+
+    results = _execute_batch(service, requests_list)
+
+    return [
+        {
+            'name': name,
+            'id': None if result['error'] is not None else result['response'].get('id'),
+            'status': 'success' if result['error'] is None else 'error',
+            'error': None if result['error'] is None else str(result['error'])
+        }
+        for name, result in zip(names, results)
+    ]
@@ -0,0 +1,72 @@
+import requests
+
+from requests.adapters import HTTPAdapter
+
+
+# Ограничение времени HTTP-запроса по умолчанию в секундах: (установка соединения, ожидание данных).
+# Ожидание данных ограничивает паузу между частями ответа, а не время загрузки всего файла.
+DEFAULT_TIMEOUT = (10, 60)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    '''
+    Класс TimeoutHTTPAdapter - HTTPAdapter, задающий ограничение времени запросам, для которых оно не указано явно.
+
+    Attributes
+    ----------
+    timeout: tuple
+        ограничение времени (установка соединения, ожидание данных) в секундах.
+        По умолчанию - DEFAULT_TIMEOUT на момент запроса.
+
+    '''
+
+    def __init__(self, *args, timeout=None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.timeout or DEFAULT_TIMEOUT
+
+        return super().send(request, timeout=timeout, **kwargs)
+
+
+def create_session(pool_size=10, headers=None, keep_alive=True, timeout=None):
+    '''
+    Функция для создания HTTP-сессии с пулом соединений.
+
+    Сессия переиспользует TCP/TLS-соединения с одним и тем же хостом,
+    поэтому установка соединения выполняется один раз, а не при каждом запросе.
+
+    Parameters
+    ----------
+    pool_size: int
+        максимальное количество одновременно открытых соединений с одним хостом.
+
+    headers: dict
+        заголовки, добавляемые ко всем запросам сессии (например, заголовок авторизации).
+
+    keep_alive: bool
+        сохранять ли соединение открытым между запросами (по умолчанию True).
+
+    timeout: tuple
+        ограничение времени запросов сессии (установка соединения, ожидание данных) в секундах
+        (по умолчанию DEFAULT_TIMEOUT). Явно переданный в запрос timeout имеет приоритет.
+
+    В качестве возврата (return) функция использует объект requests.Session.
+
+    '''
+
+    session = requests.Session()
+
+    adapter = TimeoutHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, timeout=timeout)
+
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    session.headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+
+    if headers:
+        session.headers.update(headers)
+
+    return session
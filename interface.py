@@ -1,19 +1,59 @@
-import json
+from clients import Clients, LazyModule
 
-import google_drive as google
+from ya_disk import YandexDisk, OperationTracker
 
-from ya_disk import YandexDisk
+from disk_index import DiskIndex
+
+from manifest import SyncManifest, ManifestGroup
+
+import sync
 
 from vk_classes import VkUser
 
+import transfer_log
+
+from transfer_log import JsonLinesLog
+
+from error_log import ErrorLog
+
+from retry import RetryPolicy
+
+from pipeline import TransferPipeline, yandex_uploader, google_uploader
+
+from fan_out import FanOutTransfer, yandex_destination, google_destination
+
+from photo_cache import PhotoCache
+
+from metrics import Metrics, registry
+
 from pprint import pprint
 
 
-with open('ya_token.txt', 'r', encoding='utf-8') as yandex_file:
-    yandex_token = yandex_file.read().strip()
+# Количество одновременно выполняемых запросов на загрузку файлов.
+upload_workers = 8
+
+# Максимальное время ожидания завершения операций загрузки на Яндекс.Диске (в секундах).
+operations_timeout = 600
+
+
+# Журналы фото и альбомов (JSON Lines): записи дописываются по мере получения данных.
+photos_log_path = 'log_photos.jsonl'
+
+albums_log_path = 'log_albums.jsonl'
+
+# Кэшировать фото на диске при загрузке на Google.Drive (/download_photos_google_drive).
+# По умолчанию фото передаются потоком с сервера Вконтакте без сохранения на диск.
+use_photo_cache = False
+
+# Файл метрик запросов (формат Prometheus; путь с расширением .json - снимок в формате JSON).
+metrics_path = 'metrics.prom'
+
 
-with open('vk_token.txt', 'r', encoding='utf-8') as vk_file:
-    vk_token = vk_file.read().strip()
+# Модуль google_drive (и googleapiclient) импортируется только при первом обращении.
+google = LazyModule('google_drive')
+
+# Асинхронные клиенты (и aiohttp) импортируются только при первом обращении.
+async_clients = LazyModule('async_clients')
 
 
 main_menu = """
@@ -40,12 +80,24 @@ main_menu = """
 
 /create_directory_google_drive - создать папку на Google.Drive с определённым именем,
 
-/download_photos_google_drive - загрузить фото на Google.Drive по определённому пути (задан по умолчанию).
+/download_photos_google_drive - загрузить фото на Google.Drive в папку с определённым именем (или в папку по умолчанию).
+
+
+Конвейер переноса:
+
+/transfer_pipeline - получить фото пользователя (пользователей) Вконтакте и одновременно загружать их
+на Яндекс.Диск или Google.Drive (без отдельных команд получения и загрузки),
 
+/download_photos_fan_out - загрузить фото одновременно на Яндекс.Диск и Google.Drive
+(каждое фото скачивается один раз).
 
-/exit_save_all - выйти из программы, предварительно сохранив данные в лог программы.
 
-/exit_not_save - выйти из программы без сохранения данных.
+/metrics - вывести метрики запросов к Вконтакте, Яндекс.Диску и Google.Drive (количество, задержка, повторы, ошибки).
+
+
+/exit_save_all - выйти из программы, предварительно записав в лог программы оставшиеся данные.
+
+/exit_not_save - выйти из программы без сохранения данных, ещё не записанных в лог.
 """
 
 documentation = """
@@ -64,7 +116,19 @@ documentation = """
 
 /get_albums_doc - документация метода get_albums,
 
-/get_photos_doc – документация метода get_photos.
+/get_photos_doc – документация метода get_photos,
+
+/iter_photos_doc – документация метода iter_photos,
+
+/execute_doc – документация метода execute,
+
+/get_albums_batch_doc – документация метода get_albums_batch,
+
+/get_photos_batch_doc – документация метода get_photos_batch,
+
+/SyncManifest_doc – документация класса SyncManifest,
+
+/ManifestGroup_doc – документация класса ManifestGroup.
 
 
 Класс YandexDisk (документация):
@@ -75,13 +139,23 @@ documentation = """
 
 /get_files_list_doc – документация метода get_files_list,
 
+/iter_files_doc – документация метода iter_files,
+
 /create_directory_yandex_disk_doc – документация метода create_directory_yandex_disk,
 
+/ensure_directory_yandex_disk_doc – документация метода ensure_directory_yandex_disk,
+
 /_download_files_doc – документация метода _download_files (является приватным),
 
+/upload_photo_doc – документация метода upload_photo,
+
 /download_files_yandex_disk_doc - документация метода download_files_yandex_disk,
 
-/delete_files_yandex_disk_doc - документация метода delete_files_yandex_disk.
+/delete_files_yandex_disk_doc - документация метода delete_files_yandex_disk,
+
+/OperationTracker_doc - документация класса OperationTracker,
+
+/DiskIndex_doc - документация класса DiskIndex.
 
 
 Функционал для работы с Google.Drive (документация):
@@ -90,17 +164,104 @@ documentation = """
 
 /get_files_google_drive_doc - документация функции get_files_google_drive,
 
+/iter_files_google_drive_doc - документация функции iter_files_google_drive,
+
+/find_files_google_drive_doc - документация функции find_files_google_drive,
+
+/get_folder_id_google_drive_doc - документация функции get_folder_id_google_drive,
+
 /create_directory_google_drive_doc - документация функции create_directory_google_drive,
 
+/upload_photo_google_drive_doc - документация функции upload_photo_google_drive,
+
 /download_files_google_drive_doc - документация функции download_files_google_drive,
 
-/delete_files_google_drive_doc - документация функции delete_files_google_drive.
+/delete_files_google_drive_doc - документация функции delete_files_google_drive,
+
+/delete_files_google_drive_batch_doc - документация функции delete_files_google_drive_batch,
+
+/create_directories_google_drive_batch_doc - документация функции create_directories_google_drive_batch.
+
+
+Журнал программы (документация):
+
+/JsonLinesLog_doc - документация класса JsonLinesLog,
+
+/read_log_doc - документация функции read_log,
+
+/tail_doc - документация функции tail,
+
+/aggregate_doc - документация функции aggregate,
+
+/ErrorLog_doc - документация класса ErrorLog,
+
+/RetryPolicy_doc - документация класса RetryPolicy,
+
+/TransferPipeline_doc - документация класса TransferPipeline,
+
+/yandex_uploader_doc - документация функции yandex_uploader,
+
+/google_uploader_doc - документация функции google_uploader,
+
+/FanOutTransfer_doc - документация класса FanOutTransfer,
+
+/yandex_destination_doc - документация функции yandex_destination,
+
+/google_destination_doc - документация функции google_destination,
+
+/upload_bytes_doc - документация метода YandexDisk.upload_bytes,
+
+/upload_bytes_google_drive_doc - документация функции upload_bytes_google_drive,
+
+/upload_file_google_drive_doc - документация функции upload_file_google_drive,
+
+/PhotoCache_doc - документация класса PhotoCache,
+
+/AsyncVkUser_doc - документация класса AsyncVkUser,
+
+/AsyncYandexDisk_doc - документация класса AsyncYandexDisk,
+
+/AsyncGoogleDrive_doc - документация класса AsyncGoogleDrive,
+
+/Metrics_doc - документация класса Metrics.
 
 
 /back - вернуться в главное меню.
 """
 
 
+def _manifests(sources, photo_lists, destination):
+    '''
+    Функция, создающая манифесты синхронизации для фото, полученных командой /get_photos.
+
+    Parameters
+    ----------
+    sources: list
+        пары (идентификатор пользователя, идентификатор альбома) для каждого списка фото.
+
+    photo_lists: list
+        списки записей Photo (None - данные пользователя не получены).
+
+    destination: str
+        место назначения (ключ манифеста, например yandex_photos).
+
+    В качестве возврата (return) функция использует группу манифестов (ManifestGroup)
+    и список фото, которые ещё не перенесены.
+
+    '''
+
+    group = ManifestGroup()
+
+    photos = []
+
+    for (owner_id, album_id), photo_info in zip(sources, photo_lists):
+
+        if photo_info:
+            photos += group.add(SyncManifest(owner_id, album_id, destination), photo_info)
+
+    return group, photos
+
+
 def program_interface():
     '''
     Функция, реализующая интерфейс программы.
@@ -122,13 +283,16 @@ def program_interface():
 
     '''
 
-    log_photos_list = []
+    photos_log = JsonLinesLog(photos_log_path)
 
-    log_albums_list = []
+    albums_log = JsonLinesLog(albums_log_path)
 
 
     temp_photos_list = []
 
+    # Пользователь и альбом каждого списка фото из temp_photos_list (для манифестов синхронизации).
+    temp_photos_sources = []
+
     temp_albums_list = []
 
     google_drive_files_list = []
@@ -136,16 +300,12 @@ def program_interface():
 
     temp_photos_set = set()
 
-    disk_files_set = set()
-
     delete_files_set = set()
 
 
-    vk_client = VkUser(vk_token, '5.131')
+    # Клиенты создаются при первом обращении, авторизация в Google.Drive - только при работе с ним.
 
-    yandex_disk = YandexDisk(yandex_token)
-
-    service = google.authorization()
+    clients = Clients()
 
 
     print('Вас приветствует программа по работе с файлами компании Python Software.\n'
@@ -183,6 +343,24 @@ def program_interface():
         elif user_input == '/get_photos_doc':
             print(VkUser.get_photos.__doc__)
 
+        elif user_input == '/iter_photos_doc':
+            print(VkUser.iter_photos.__doc__)
+
+        elif user_input == '/execute_doc':
+            print(VkUser.execute.__doc__)
+
+        elif user_input == '/get_albums_batch_doc':
+            print(VkUser.get_albums_batch.__doc__)
+
+        elif user_input == '/get_photos_batch_doc':
+            print(VkUser.get_photos_batch.__doc__)
+
+        elif user_input == '/SyncManifest_doc':
+            print(SyncManifest.__doc__)
+
+        elif user_input == '/ManifestGroup_doc':
+            print(ManifestGroup.__doc__)
+
         elif user_input == '/YandexDisk_doc':
             print(YandexDisk.__doc__)
 
@@ -192,38 +370,140 @@ def program_interface():
         elif user_input == '/get_files_list_doc':
             print(YandexDisk.get_files_list.__doc__)
 
+        elif user_input == '/iter_files_doc':
+            print(YandexDisk.iter_files.__doc__)
+
         elif user_input == '/create_directory_yandex_disk_doc':
             print(YandexDisk.create_directory_yandex_disk.__doc__)
 
+        elif user_input == '/ensure_directory_yandex_disk_doc':
+            print(YandexDisk.ensure_directory_yandex_disk.__doc__)
+
         elif user_input == '/_download_files_doc':
             print(YandexDisk._download_files.__doc__)
 
+        elif user_input == '/upload_photo_doc':
+            print(YandexDisk.upload_photo.__doc__)
+
         elif user_input == '/download_files_yandex_disk_doc':
             print(YandexDisk.download_files_yandex_disk.__doc__)
 
         elif user_input =='/delete_files_yandex_disk_doc':
             print(YandexDisk.delete_files_yandex_disk.__doc__)
 
+        elif user_input == '/OperationTracker_doc':
+            print(OperationTracker.__doc__)
+
+        elif user_input == '/DiskIndex_doc':
+            print(DiskIndex.__doc__)
+
         elif user_input == '/authorization_doc':
             print(google.authorization.__doc__)
 
         elif user_input == '/get_files_google_drive_doc':
             print(google.get_files_google_drive.__doc__)
 
+        elif user_input == '/iter_files_google_drive_doc':
+            print(google.iter_files_google_drive.__doc__)
+
+        elif user_input == '/find_files_google_drive_doc':
+            print(google.find_files_google_drive.__doc__)
+
+        elif user_input == '/get_folder_id_google_drive_doc':
+            print(google.get_folder_id_google_drive.__doc__)
+
         elif user_input == '/create_directory_google_drive_doc':
             print(google.create_directory_google_drive.__doc__)
 
+        elif user_input == '/upload_photo_google_drive_doc':
+            print(google.upload_photo_google_drive.__doc__)
+
         elif user_input == '/download_files_google_drive_doc':
             print(google.download_files_google_drive.__doc__)
 
         elif user_input == '/delete_files_google_drive_doc':
             print(google.delete_files_google_drive.__doc__)
 
+        elif user_input == '/delete_files_google_drive_batch_doc':
+            print(google.delete_files_google_drive_batch.__doc__)
+
+        elif user_input == '/create_directories_google_drive_batch_doc':
+            print(google.create_directories_google_drive_batch.__doc__)
+
+        elif user_input == '/JsonLinesLog_doc':
+            print(JsonLinesLog.__doc__)
+
+        elif user_input == '/read_log_doc':
+            print(transfer_log.read_log.__doc__)
+
+        elif user_input == '/tail_doc':
+            print(transfer_log.tail.__doc__)
+
+        elif user_input == '/aggregate_doc':
+            print(transfer_log.aggregate.__doc__)
+
+        elif user_input == '/ErrorLog_doc':
+            print(ErrorLog.__doc__)
+
+        elif user_input == '/RetryPolicy_doc':
+            print(RetryPolicy.__doc__)
+
+        elif user_input == '/TransferPipeline_doc':
+            print(TransferPipeline.__doc__)
+
+        elif user_input == '/yandex_uploader_doc':
+            print(yandex_uploader.__doc__)
+
+        elif user_input == '/google_uploader_doc':
+            print(google_uploader.__doc__)
+
+        elif user_input == '/FanOutTransfer_doc':
+            print(FanOutTransfer.__doc__)
+
+        elif user_input == '/yandex_destination_doc':
+            print(yandex_destination.__doc__)
+
+        elif user_input == '/google_destination_doc':
+            print(google_destination.__doc__)
+
+        elif user_input == '/upload_bytes_doc':
+            print(YandexDisk.upload_bytes.__doc__)
+
+        elif user_input == '/upload_bytes_google_drive_doc':
+            print(google.upload_bytes_google_drive.__doc__)
+
+        elif user_input == '/upload_file_google_drive_doc':
+            print(google.upload_file_google_drive.__doc__)
+
+        elif user_input == '/PhotoCache_doc':
+            print(PhotoCache.__doc__)
+
+        elif user_input == '/AsyncVkUser_doc':
+            print(async_clients.AsyncVkUser.__doc__)
+
+        elif user_input == '/AsyncYandexDisk_doc':
+            print(async_clients.AsyncYandexDisk.__doc__)
+
+        elif user_input == '/AsyncGoogleDrive_doc':
+            print(async_clients.AsyncGoogleDrive.__doc__)
+
+        elif user_input == '/Metrics_doc':
+            print(Metrics.__doc__)
+
+        elif user_input == '/metrics':
+            pprint(registry.snapshot())
+
         elif user_input == '/back':
             print(main_menu)
 
         elif user_input == '/exit_not_save':
 
+            photos_log.discard()
+
+            albums_log.discard()
+
+            registry.export(metrics_path)
+
             print()
             print('Python Software, 2021. Все права защищены.')
 
@@ -250,14 +530,32 @@ def program_interface():
 
                 print()
 
-                owner_id = vk_client.users_get(user_ids)
+                owner_id = clients.vk_client.users_get(user_ids)
+
+                # Для нескольких пользователей запросы объединяются в execute (до 25 в одном запросе).
+
+                if len(owner_id) > 1 and count <= VkUser.photos_page_size:
+
+                    photos_batch = clients.vk_client.get_photos_batch(album_id, rev, [id.id for id in owner_id], count)
+
+                else:
+
+                    photos_batch = None
 
                 for id in owner_id:
 
-                    photo_info = vk_client.get_photos(album_id, rev, id['id'], count)
+                    if photos_batch is None:
+
+                        photo_info = clients.vk_client.get_photos(album_id, rev, id.id, count)
+
+                    else:
+
+                        photo_info = photos_batch[id.id]
 
                     temp_photos_list.append(photo_info)
 
+                    temp_photos_sources.append((id.id, album_id))
+
                     if photo_info is None:
 
                         print('Нет данных для сохранения.')
@@ -266,7 +564,7 @@ def program_interface():
 
                         for log_photos in photo_info:
 
-                            log_photos_list.append({'file_name': log_photos['file_name'], 'size': log_photos['size']})
+                            photos_log.write({'file_name': log_photos.file_name, 'size': log_photos.size})
 
                     print('\nСписок файлов пользователя (пользователей):\n')
 
@@ -285,11 +583,25 @@ def program_interface():
 
                 print()
 
-                owner_id = vk_client.users_get(user_ids)
+                owner_id = clients.vk_client.users_get(user_ids)
+
+                if len(owner_id) > 1:
+
+                    albums_batch = clients.vk_client.get_albums_batch([id.id for id in owner_id], count)
+
+                else:
+
+                    albums_batch = None
 
                 for id in owner_id:
 
-                    albums_info = vk_client.get_albums(id['id'], count)
+                    if albums_batch is None:
+
+                        albums_info = clients.vk_client.get_albums(id.id, count)
+
+                    else:
+
+                        albums_info = albums_batch[id.id]
 
                     if albums_info is None:
 
@@ -299,7 +611,9 @@ def program_interface():
 
                         temp_albums_list.append(albums_info)
 
-                        log_albums_list.append(albums_info)
+                        for album in albums_info:
+
+                            albums_log.write(album.to_dict())
 
                         print()
 
@@ -314,115 +628,333 @@ def program_interface():
 
                 path = str(input('Введите имя создаваемой папки: '))
 
-                create = yandex_disk.create_directory_yandex_disk(path)
+                create = clients.yandex_disk.create_directory_yandex_disk(path)
 
 
             elif user_input == '/download_photos_yandex_disk':
 
-                get_files_list = yandex_disk.get_files_list()
+                path = str(input('\nВведите имя папки, куда следует загрузить файл: '))
 
 
-                for get in get_files_list:
+                # Содержимое папки назначения перечитывается целиком: инкрементальное обновление индекса
+                # не замечает удалённых и перезаписанных файлов.
 
-                    disk_files_set.add(get['file_name'])
+                clients.disk_index.refresh_folder(path)
 
+                # Фото, уже перенесённые в эту папку по манифестам, не проверяются и не загружаются повторно.
 
-                path = str(input('\nВведите имя папки, куда следует загрузить файл: '))
+                manifests, photos = _manifests(temp_photos_sources, temp_photos_list,
+                                               'yandex_' + path.strip('/').replace('/', '_'))
 
+                # Файлы с совпадающими размером и md5 пропускаются, изменившиеся - заменяются.
 
-                for info in temp_photos_list:
+                plan = sync.plan_sync(photos, clients.disk_index.files(path), workers=upload_workers)
 
-                    for value in info:
+                print(f"\nНовых файлов: {len(plan['upload'])}, "
+                      f"изменившихся: {len(plan['replace'])}, "
+                      f"без изменений: {len(plan['skip'])}.")
+
+                for photo in plan['skip']:
+
+                    manifests.mark(photo.id, 'done', f"{path}/{photo.file_name}", photo.owner_id)
 
-                        if value['file_name'] in disk_files_set:
 
-                            delete_files_set.add(value['file_name'])
+                for photo, remote in plan['replace']:
+
+                    delete_files_set.add(photo.file_name)
 
 
                 for file_name in delete_files_set:
 
-                    delete = yandex_disk.delete_files_yandex_disk(f"{path}/{file_name}")
+                    delete = clients.yandex_disk.delete_files_yandex_disk(f"{path}/{file_name}")
+
+                    clients.disk_index.remove(f"{path}/{file_name}")
+
+
+                tracker = OperationTracker(clients.yandex_disk)
+
+                load = plan['upload'] + [photo for photo, remote in plan['replace']]
+
+                download = clients.yandex_disk.download_files_yandex_disk(path, load, workers=upload_workers, tracker=tracker,
+                                                                          manifest=manifests)
+
+                print('\nОжидание завершения загрузки файлов на стороне Яндекс.Диска, пожалуйста, подождите...')
+
+                operations = tracker.wait(timeout=operations_timeout)
 
+                # Статусы фото изменяются по итогу операций загрузки, поэтому манифесты сохраняются после ожидания.
 
-                for load in temp_photos_list:
+                manifests.save()
 
-                    download = yandex_disk.download_files_yandex_disk(path, load)
+                for file_path in operations['success']:
+                    clients.disk_index.add(file_path)
 
+                tracker.stop()
+
+                print(f"\nЗагружено: {len(operations['success'])}, "
+                      f"с ошибкой: {len(operations['failed'])}, "
+                      f"не завершено: {len(operations['in-progress'])}.")
+
+                for file_path in operations['failed']:
+                    print(f"Не удалось загрузить файл {file_path}.")
 
-                disk_files_set.clear()
 
                 delete_files_set.clear()
 
                 temp_photos_list.clear()
 
+                temp_photos_sources.clear()
+
 
             elif user_input == '/create_directory_google_drive':
 
                 name = str(input('Введите имя создаваемой папки: '))
 
-                create = google.create_directory_google_drive(service, name)
+                create = google.create_directory_google_drive(clients.service, name)
 
 
             elif user_input == '/download_photos_google_drive':
 
-                get_files_list_on_google_disk = google.get_files_google_drive(service)
+                folder_name = str(input('\nВведите имя папки, куда следует загрузить файл (Enter - папка по умолчанию): '))
+
+                if folder_name:
+
+                    folder_id = google.get_folder_id_google_drive(clients.service, folder_name)
+
+                    if folder_id is None:
+
+                        print(f"\nПапка {folder_name} не найдена на Google.Drive.")
+
+                        continue
 
-                for get in get_files_list_on_google_disk:
+                else:
+
+                    folder_id = google.FOLDER_ID
+
+
+                for info in temp_photos_list:
+
+                    for value in info:
+
+                        temp_photos_set.add(value.file_name)
+
+
+                # Запрашиваются только файлы папки назначения с именами загружаемых фото.
+
+                for get in google.find_files_google_drive(clients.service, temp_photos_set, parent_id=folder_id,
+                                                          fields='id, name, md5Checksum, size'):
 
                     google_drive_files_list.append(
 
                         {
                             'id': get['id'],
-                            'file_name': get['name']
+                            'file_name': get['name'],
+                            'md5': get.get('md5Checksum'),
+                            'size': get.get('size')
                         }
 
                     )
 
 
-                for info in temp_photos_list:
+                manifests, photos = _manifests(temp_photos_sources, temp_photos_list, 'google_' + folder_id)
 
-                    for value in info:
+                # Файлы с совпадающими размером и md5 пропускаются, изменившиеся - заменяются.
 
-                        temp_photos_set.add(value['file_name'])
+                plan = sync.plan_sync(photos, {value['file_name']: value for value in google_drive_files_list},
+                                      workers=upload_workers)
 
+                print(f"\nНовых файлов: {len(plan['upload'])}, "
+                      f"изменившихся: {len(plan['replace'])}, "
+                      f"без изменений: {len(plan['skip'])}.")
 
-                for value in google_drive_files_list:
+                for photo in plan['skip']:
 
-                    if value['file_name'] in temp_photos_set:
+                    manifests.mark(photo.id, 'done', f"{folder_id}/{photo.file_name}", photo.owner_id)
 
-                        delete_files_set.add(value['id'])
 
+                for photo, remote in plan['replace']:
 
-                for fileId in delete_files_set:
+                    delete_files_set.add(remote['id'])
 
-                    delete = google.delete_files_google_drive(service, fileId)
 
+                for result in google.delete_files_google_drive_batch(clients.service, delete_files_set):
 
-                for load in temp_photos_list:
+                    if result['status'] == 'error':
 
-                    download = google.download_files_google_drive(service, load)
+                        print(f"Не удалось удалить файл {result['id']}: {result['error']}")
+
+
+                load = plan['upload'] + [photo for photo, remote in plan['replace']]
+
+                download = google.download_files_google_drive(clients.service, load, folder_id=folder_id,
+                                                              manifest=manifests,
+                                                              cache=clients.photo_cache if use_photo_cache else None)
 
 
                 google_drive_files_list.clear()
 
                 temp_photos_list.clear()
 
+                temp_photos_sources.clear()
+
                 temp_photos_set.clear()
 
                 delete_files_set.clear()
 
 
+            elif user_input == '/transfer_pipeline':
+
+                album_id = str(input('Введите индентификатор альбома (wall, profile, saved): '))
+
+                print()
+
+                rev = int(input('Введите порядок сортировки (1 — антихронологический, 0 — хронологический): '))
+
+                print()
+
+                user_ids = str(input('Введите имя пользователя (или пользователей через запятую) (screen_name): '))
+
+                print()
+
+                count = int(input('Введите количество запрашиваемых фотографий: '))
+
+                print()
+
+                destination = str(input('Введите место назначения (yandex, google): '))
+
+                print()
+
+                folder_name = str(input('Введите имя папки, куда следует загрузить файлы: '))
+
+                owner_id = clients.vk_client.users_get(user_ids)
+
+                # Фотографии запрашиваются постранично по мере освобождения места в очереди загрузки.
+
+                def produce():
+
+                    for id in owner_id:
+
+                        for photo in clients.vk_client.iter_photos(album_id, rev, id.id, limit=count):
+
+                            photos_log.write({'file_name': photo.file_name, 'size': photo.size})
+
+                            yield photo
+
+                if destination == 'yandex':
+
+                    clients.disk_index.refresh_folder(folder_name)
+
+                    tracker = OperationTracker(clients.yandex_disk)
+
+                    upload = yandex_uploader(clients.yandex_disk, folder_name, tracker,
+                                             clients.disk_index.files(folder_name))
+
+                    TransferPipeline(upload, workers=upload_workers).run(produce())
+
+                    print('\nОжидание завершения загрузки файлов на стороне Яндекс.Диска, пожалуйста, подождите...')
+
+                    operations = tracker.wait(timeout=operations_timeout)
+
+                    for file_path in operations['success']:
+                        clients.disk_index.add(file_path)
+
+                    tracker.stop()
+
+                    print(f"\nЗагружено: {len(operations['success'])}, "
+                          f"с ошибкой: {len(operations['failed'])}, "
+                          f"не завершено: {len(operations['in-progress'])}.")
+
+                elif destination == 'google':
+
+                    folder_id = google.get_folder_id_google_drive(clients.service, folder_name)
+
+                    if folder_id is None:
+
+                        print(f"\nПапка {folder_name} не найдена на Google.Drive.")
+
+                        continue
+
+                    remote_files = {}
+
+                    for get in google.iter_files_google_drive(clients.service, google.build_query_google_drive(folder_id),
+                                                              fields='id, name, md5Checksum, size'):
+
+                        remote_files[get['name']] = {'id': get['id'], 'md5': get.get('md5Checksum'), 'size': get.get('size')}
+
+                    upload = google_uploader(clients.service, folder_id, remote_files)
+
+                    TransferPipeline(upload, workers=upload_workers).run(produce())
+
+                else:
+
+                    print(f"\nНеизвестное место назначения: {destination}.")
+
+
+            elif user_input == '/download_photos_fan_out':
+
+                path = str(input('\nВведите имя папки на Яндекс.Диске, куда следует загрузить файлы: '))
+
+                folder_name = str(input('\nВведите имя папки на Google.Drive, куда следует загрузить файлы: '))
+
+                folder_id = google.get_folder_id_google_drive(clients.service, folder_name)
+
+                if folder_id is None:
+
+                    print(f"\nПапка {folder_name} не найдена на Google.Drive.")
+
+                    continue
+
+                clients.disk_index.refresh_folder(path)
+
+                remote_files = {}
+
+                for get in google.iter_files_google_drive(clients.service, google.build_query_google_drive(folder_id),
+                                                          fields='id, name, md5Checksum, size'):
+
+                    remote_files[get['name']] = {'id': get['id'], 'md5': get.get('md5Checksum'), 'size': get.get('size')}
+
+                destinations = {
+                    'yandex': yandex_destination(clients.yandex_disk, path, clients.disk_index.files(path),
+                                                 clients.disk_index),
+                    'google': google_destination(clients.service, folder_id, remote_files)
+                }
+
+                # Пользователи, фото которых не удалось получить, пропускаются.
+
+                missing = [str(owner) for (owner, album), info in zip(temp_photos_sources, temp_photos_list) if info is None]
+
+                if missing:
+                    print(f"\nФото пользователей {', '.join(missing)} не получены и не будут загружены.")
+
+                photos = [value for info in temp_photos_list if info is not None for value in info]
+
+                # Каждое фото скачивается один раз и параллельно загружается в оба места назначения.
+
+                with FanOutTransfer(destinations, workers=upload_workers, cache=clients.photo_cache) as fan_out:
+
+                    TransferPipeline(fan_out.upload, workers=upload_workers).run(photos)
+
+                temp_photos_list.clear()
+
+                temp_photos_sources.clear()
+
+
             elif user_input == '/exit_save_all':
 
-                with open('log_photos.json', 'w', encoding='utf-8') as file_obj:
-                    print()
-                    print('Происходит сохранение данных о фото в лог log_photos.json, пожалуйста, подождите...')
-                    json.dump(log_photos_list, file_obj, ensure_ascii=False, indent=4)
+                print()
+                print(f'Происходит сохранение данных о фото в лог {photos_log_path}, пожалуйста, подождите...')
+
+                photos_log.close()
+
+                print()
+                print(f'Происходит сохранение данных об альбомах в лог {albums_log_path}, пожалуйста, подождите...')
+
+                albums_log.close()
 
-                with open('log_albums.json', 'w', encoding='utf-8') as file_obj:
-                    print()
-                    print('Происходит сохранение данных об альбомах в лог log_albums.json, пожалуйста, подождите...')
-                    json.dump(log_albums_list, file_obj, ensure_ascii=False, indent=4)
+                registry.export(metrics_path)
+
+                print()
+                print(f'Метрики запросов сохранены в файл {metrics_path}.')
 
                 print()
                 print('Данные успешно сохранены.')
@@ -0,0 +1,290 @@
+import os
+
+import json
+
+import threading
+
+from records import Photo
+
+
+class SyncManifest:
+    '''
+    Класс SyncManifest - манифест синхронизации альбома пользователя Вконтакте с местом назначения.
+
+    Основное применение - повторные (например, ночные) запуски переноса фотографий:
+    манифест хранит состояние каждой фотографии альбома, поэтому при следующем запуске
+    переносятся только новые фотографии и фотографии, загрузка которых не удалась.
+
+    Манифест хранится в файле {directory}/{owner_id}_{album_id}_{destination}.json.
+    Для каждой фотографии сохраняются: id, owner_id, date, size (тип размера), url, file_name,
+    path (путь в месте назначения) и status (pending, done, failed).
+
+    Attributes
+    ----------
+    owner_id: int
+        идентификатор владельца альбома.
+
+    album_id: str
+        идентификатор альбома.
+
+    destination: str
+        место назначения (например, yandex или google). Для каждого места назначения ведётся свой манифест.
+
+    directory: str
+        папка для хранения манифестов (по умолчанию manifests).
+
+
+    Methods
+    -------
+    select(photos: list)
+        регистрирует новые фотографии и возвращает те, которые ещё не перенесены.
+
+    is_done(photo_id: int)
+        проверяет, перенесена ли фотография.
+
+    pending()
+        возвращает фотографии, которые ещё не перенесены.
+
+    mark(photo_id: int, status: str, path: str)
+        изменяет статус фотографии.
+
+    save()
+        сохраняет манифест в файл.
+
+    '''
+
+    def __init__(self, owner_id, album_id, destination, directory='manifests'):
+        self.owner_id = owner_id
+        self.album_id = album_id
+        self.destination = destination
+        self.path = os.path.join(directory, f"{owner_id}_{album_id}_{destination}.json")
+        self._lock = threading.RLock()
+
+        self.photos = {}
+        self.complete = False
+        self.last_success = None
+
+        if os.path.exists(self.path):
+
+            with open(self.path, 'r', encoding='utf-8') as file_obj:
+                data = json.load(file_obj)
+
+            self.photos = {int(photo_id): info for photo_id, info in data['photos'].items()}
+            self.complete = data.get('complete', False)
+            self.last_success = data.get('last_success')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.save()
+
+    def is_done(self, photo_id):
+        with self._lock:
+            return self.photos.get(photo_id, {}).get('status') == 'done'
+
+    def has_pending(self):
+        with self._lock:
+            return any(info['status'] != 'done' for info in self.photos.values())
+
+    def select(self, photos):
+        '''
+        Метод, регистрирующий фотографии в манифесте.
+
+        Parameters
+        ----------
+        photos: list
+            список записей Photo.
+
+        Новые фотографии добавляются со статусом pending; у уже известных обновляется url,
+        так как ссылки Вконтакте со временем меняются.
+
+        В качестве возврата (return) метод использует список фотографий, которые ещё не перенесены.
+
+        '''
+
+        selected = []
+
+        with self._lock:
+
+            for photo in photos:
+
+                info = self.photos.setdefault(photo.id, {
+                    'id': photo.id,
+                    'owner_id': photo.owner_id if photo.owner_id is not None else self.owner_id,
+                    'date': photo.date,
+                    'size': photo.size,
+                    'file_name': photo.file_name,
+                    'path': None,
+                    'status': 'pending'
+                })
+
+                info['url'] = photo.url
+
+                if info['status'] != 'done':
+                    selected.append(photo)
+
+        return selected
+
+    def pending(self):
+        '''
+        Метод для получения фотографий, которые ещё не перенесены (pending и failed).
+
+        В качестве возврата (return) метод использует список записей Photo.
+
+        '''
+
+        with self._lock:
+            # Манифесты прежних версий не хранят owner_id: владелец всех фотографий манифеста - owner_id.
+            return [Photo.from_dict({'owner_id': self.owner_id, **info})
+                    for info in self.photos.values() if info['status'] != 'done']
+
+    def mark(self, photo_id, status, path=None, owner_id=None):
+        '''
+        Метод для изменения статуса фотографии.
+
+        Parameters
+        ----------
+        photo_id: int
+            идентификатор фотографии.
+
+        status: str
+            новый статус (pending, done, failed).
+
+        path: str
+            путь к файлу в месте назначения.
+
+        owner_id: int
+            владелец фотографии. Если задан и не совпадает с владельцем, записанным в манифесте,
+            статус не изменяется (идентификаторы фотографий уникальны только в пределах владельца).
+
+        '''
+
+        with self._lock:
+
+            info = self.photos.get(photo_id)
+
+            if info is None or owner_id is not None and str(info.get('owner_id', self.owner_id)) != str(owner_id):
+                return
+
+            info['status'] = status
+
+            if path is not None:
+                info['path'] = path
+
+            if status == 'done' and (self.last_success is None or info['date'] > self.last_success):
+                self.last_success = info['date']
+
+    def save(self):
+        '''
+        Метод для сохранения манифеста в файл.
+        Запись выполняется через временный файл, поэтому прерванное сохранение не портит манифест.
+        '''
+
+        with self._lock:
+            data = {
+                'owner_id': self.owner_id,
+                'album_id': self.album_id,
+                'destination': self.destination,
+                'complete': self.complete,
+                'last_success': self.last_success,
+                'photos': {str(photo_id): info for photo_id, info in self.photos.items()}
+            }
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+        temp_path = self.path + '.tmp'
+
+        with open(temp_path, 'w', encoding='utf-8') as file_obj:
+            json.dump(data, file_obj, ensure_ascii=False)
+
+        os.replace(temp_path, self.path)
+
+
+class ManifestGroup:
+    '''
+    Класс ManifestGroup - несколько манифестов синхронизации, используемых как один.
+
+    Основное применение - загрузка фотографий нескольких пользователей (альбомов) одним вызовом
+    download_files_yandex_disk или download_files_google_drive: статус фотографии записывается
+    в манифест того альбома, из которого она получена. Идентификаторы фотографий уникальны
+    только в пределах владельца, поэтому манифест фотографии определяется парой (owner_id, id).
+    Манифесты одного и того же файла (например, один пользователь получен дважды) объединяются.
+
+    Methods
+    -------
+    add(manifest: SyncManifest, photos: list)
+        добавляет манифест и регистрирует в нём фотографии.
+
+    mark(photo_id: int, status: str, path: str, owner_id: int)
+        изменяет статус фотографии в её манифесте.
+
+    save()
+        сохраняет все манифесты.
+
+    '''
+
+    def __init__(self):
+        self.manifests = []
+        self._owners = {}
+        self._paths = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.save()
+
+    def add(self, manifest, photos):
+        '''
+        Метод для добавления манифеста.
+
+        Parameters
+        ----------
+        manifest: SyncManifest
+            манифест синхронизации альбома.
+
+        photos: list
+            список записей Photo этого альбома.
+
+        В качестве возврата (return) метод использует список фотографий, которые ещё не перенесены
+        (см. SyncManifest.select) и ещё не были добавлены в группу.
+
+        '''
+
+        # Повторно открытый манифест заменяется уже добавленным, чтобы сохранения не перезаписывали друг друга.
+        if manifest.path in self._paths:
+            manifest = self._paths[manifest.path]
+
+        else:
+            self._paths[manifest.path] = manifest
+            self.manifests.append(manifest)
+
+        new_photos = []
+
+        for photo in photos:
+
+            key = (str(photo.owner_id if photo.owner_id is not None else manifest.owner_id), photo.id)
+
+            if key not in self._owners:
+                self._owners[key] = manifest
+                new_photos.append(photo)
+
+        return manifest.select(new_photos)
+
+    def mark(self, photo_id, status, path=None, owner_id=None):
+        if owner_id is None:
+            manifests = {manifest for (owner, key), manifest in self._owners.items() if key == photo_id}
+
+            # Без владельца фотографию можно определить, только если идентификатор не повторяется.
+            manifest = manifests.pop() if len(manifests) == 1 else None
+
+        else:
+            manifest = self._owners.get((str(owner_id), photo_id))
+
+        if manifest is not None:
+            manifest.mark(photo_id, status, path, owner_id)
+
+    def save(self):
+        for manifest in self.manifests:
+            manifest.save()
@@ -0,0 +1,325 @@
+import os
+
+import re
+
+import json
+
+import time
+
+import bisect
+
+import threading
+
+from collections import defaultdict
+
+from contextlib import contextmanager
+
+from urllib.parse import urlsplit
+
+
+# Границы интервалов гистограммы задержек запросов (в секундах).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Endpoint:
+
+    __slots__ = ('count', 'seconds', 'max_seconds', 'buckets', 'bytes_in', 'bytes_out', 'statuses')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.statuses = defaultdict(int)
+
+    def quantile(self, q):
+        '''
+        Оценка квантиля задержки по гистограмме (верхняя граница интервала, но не больше максимума, в секундах).
+        '''
+
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        total = 0
+
+        for index, count in enumerate(self.buckets):
+            total += count
+
+            if total >= rank:
+                return min(LATENCY_BUCKETS[index], self.max_seconds) if index < len(LATENCY_BUCKETS) else self.max_seconds
+
+        return self.max_seconds
+
+
+class _Record:
+    '''
+    Запись об одном запросе, заполняемая внутри Metrics.track.
+    excluded - время (в секундах), которое не относится к запросу и вычитается из его задержки
+    (например, чтение источника при потоковой загрузке, учтённое отдельно).
+    '''
+
+    __slots__ = ('status', 'bytes_in', 'bytes_out', 'excluded')
+
+    def __init__(self):
+        self.status = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.excluded = 0.0
+
+    def response(self, status, bytes_in=0, bytes_out=0):
+        self.status = status
+        self.bytes_in = bytes_in
+        self.bytes_out = bytes_out
+
+
+class Metrics:
+    '''
+    Класс Metrics - реестр метрик запросов к VK, CDN Вконтакте, Яндекс.Диску и Google.Drive.
+
+    Основное применение - поиск того, на что уходит время переноса: для каждого сервиса
+    и метода API (endpoint) учитываются количество запросов, их задержка (гистограмма),
+    полученные и отправленные байты, HTTP-статусы, коды ошибок и повторные попытки.
+    Отдельно учитывается время ожидания ограничителя частоты запросов и пауз между повторными
+    попытками. Метрики сохраняются в текстовом формате Prometheus либо в JSON.
+
+    Общий реестр - registry; клиенты VkUser, YandexDisk, функции google_drive,
+    асинхронные клиенты и RetryPolicy записывают метрики в него.
+
+    Methods
+    -------
+    track(service: str, endpoint: str)
+        контекстный менеджер, измеряющий один запрос.
+
+    wait(service: str, seconds: float)
+        учитывает время ожидания ограничителя частоты запросов.
+
+    retry(service: str, endpoint: str, reason: str, delay: float)
+        учитывает повторную попытку и паузу перед ней.
+
+    error(service: str, endpoint: str, code)
+        учитывает код ошибки (например, код ошибки VK или Яндекс.Диска).
+
+    snapshot()
+        возвращает метрики в виде словаря.
+
+    to_prometheus()
+        возвращает метрики в текстовом формате Prometheus.
+
+    export(path: str)
+        сохраняет метрики в файл (.json - JSON, иначе - формат Prometheus).
+
+    reset()
+        обнуляет метрики.
+
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = defaultdict(_Endpoint)
+            self._retries = defaultdict(int)
+            self._errors = defaultdict(int)
+            self._waits = defaultdict(float)
+            self._sleeps = defaultdict(float)
+
+    @contextmanager
+    def track(self, service, endpoint):
+        '''
+        Контекстный менеджер, измеряющий один запрос.
+
+        Внутри блока можно указать статус и размер ответа через record.response(status, bytes_in, bytes_out).
+        Если блок завершается исключением, вместо статуса учитывается имя класса исключения.
+        '''
+
+        record = _Record()
+
+        started = time.perf_counter()
+
+        try:
+            yield record
+
+        except Exception as error:
+            if record.status is None:
+                record.status = type(error).__name__
+
+            self.error(service, endpoint, record.status)
+            raise
+
+        finally:
+            self.observe(service, endpoint, max(0.0, time.perf_counter() - started - record.excluded), record.status,
+                         record.bytes_in, record.bytes_out)
+
+    def observe(self, service, endpoint, seconds, status=None, bytes_in=0, bytes_out=0):
+        with self._lock:
+            item = self._endpoints[(service, endpoint)]
+            item.count += 1
+            item.seconds += seconds
+            item.max_seconds = max(item.max_seconds, seconds)
+            item.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            item.bytes_in += bytes_in or 0
+            item.bytes_out += bytes_out or 0
+            item.statuses[str(status)] += 1
+
+    def wait(self, service, seconds):
+        if seconds:
+            with self._lock:
+                self._waits[service] += seconds
+
+    def retry(self, service, endpoint, reason, delay=0.0):
+        with self._lock:
+            self._retries[(service, endpoint, str(reason))] += 1
+            self._sleeps[service] += delay
+
+    def retry_callback(self, service, endpoint):
+        '''
+        Метод, возвращающий функцию on_retry для RetryPolicy.call (учёт повторных попыток запроса).
+        '''
+
+        return lambda attempt, reason, delay: self.retry(service, endpoint, reason, delay)
+
+    def error(self, service, endpoint, code):
+        with self._lock:
+            self._errors[(service, endpoint, str(code))] += 1
+
+    def snapshot(self):
+        '''
+        Метод, возвращающий метрики в виде словаря (для сохранения в JSON).
+        '''
+
+        with self._lock:
+            endpoints = {}
+
+            for (service, endpoint), item in sorted(self._endpoints.items()):
+                endpoints.setdefault(service, {})[endpoint] = {
+                    'count': item.count,
+                    'seconds': round(item.seconds, 6),
+                    'mean_ms': round(item.seconds / item.count * 1000, 3) if item.count else 0.0,
+                    'p50_ms': round(item.quantile(0.5) * 1000, 3),
+                    'p99_ms': round(item.quantile(0.99) * 1000, 3),
+                    'max_ms': round(item.max_seconds * 1000, 3),
+                    'bytes_in': item.bytes_in,
+                    'bytes_out': item.bytes_out,
+                    'statuses': dict(item.statuses)
+                }
+
+            return {
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'endpoints': endpoints,
+                'retries': [{'service': key[0], 'endpoint': key[1], 'reason': key[2], 'count': count}
+                            for key, count in sorted(self._retries.items())],
+                'errors': [{'service': key[0], 'endpoint': key[1], 'code': key[2], 'count': count}
+                           for key, count in sorted(self._errors.items())],
+                'rate_limit_wait_seconds': {key: round(value, 6) for key, value in sorted(self._waits.items())},
+                'retry_sleep_seconds': {key: round(value, 6) for key, value in sorted(self._sleeps.items())}
+            }
+
+    def to_prometheus(self):
+        '''
+        Метод, возвращающий метрики в текстовом формате Prometheus (для node_exporter textfile collector).
+        '''
+
+        def labels(**values):
+            return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in values.items()) + '}'
+
+        lines = []
+
+        with self._lock:
+
+            lines += ['# HELP transfer_requests_total Количество запросов.', '# TYPE transfer_requests_total counter']
+
+            for (service, endpoint), item in sorted(self._endpoints.items()):
+
+                for status, count in sorted(item.statuses.items()):
+                    lines.append(f"transfer_requests_total{labels(service=service, endpoint=endpoint, status=status)} {count}")
+
+            lines += ['# HELP transfer_request_duration_seconds Задержка запросов.',
+                      '# TYPE transfer_request_duration_seconds histogram']
+
+            for (service, endpoint), item in sorted(self._endpoints.items()):
+
+                total = 0
+
+                for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), item.buckets):
+                    total += count
+                    lines.append(f"transfer_request_duration_seconds_bucket"
+                                 f"{labels(service=service, endpoint=endpoint, le=bound)} {total}")
+
+                lines.append(f"transfer_request_duration_seconds_sum{labels(service=service, endpoint=endpoint)} {item.seconds}")
+                lines.append(f"transfer_request_duration_seconds_count{labels(service=service, endpoint=endpoint)} {item.count}")
+
+            for name, attribute, help_text in (('transfer_received_bytes_total', 'bytes_in', 'Полученные байты.'),
+                                               ('transfer_sent_bytes_total', 'bytes_out', 'Отправленные байты.')):
+
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+
+                for (service, endpoint), item in sorted(self._endpoints.items()):
+                    lines.append(f"{name}{labels(service=service, endpoint=endpoint)} {getattr(item, attribute)}")
+
+            lines += ['# HELP transfer_retries_total Повторные попытки запросов.', '# TYPE transfer_retries_total counter']
+
+            for (service, endpoint, reason), count in sorted(self._retries.items()):
+                lines.append(f"transfer_retries_total{labels(service=service, endpoint=endpoint, reason=reason)} {count}")
+
+            lines += ['# HELP transfer_errors_total Ошибки запросов.', '# TYPE transfer_errors_total counter']
+
+            for (service, endpoint, code), count in sorted(self._errors.items()):
+                lines.append(f"transfer_errors_total{labels(service=service, endpoint=endpoint, code=code)} {count}")
+
+            for name, values, help_text in (
+                    ('transfer_rate_limit_wait_seconds_total', self._waits, 'Время ожидания ограничителя частоты запросов.'),
+                    ('transfer_retry_sleep_seconds_total', self._sleeps, 'Паузы перед повторными попытками.')):
+
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+
+                for service, value in sorted(values.items()):
+                    lines.append(f"{name}{labels(service=service)} {value}")
+
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path):
+        '''
+        Метод для сохранения метрик в файл: .json - снимок в формате JSON, иначе - текстовый формат Prometheus.
+        Запись выполняется через временный файл, поэтому сборщик метрик не прочитает файл частично.
+        '''
+
+        if path.endswith('.json'):
+            data = json.dumps(self.snapshot(), ensure_ascii=False, indent=4)
+
+        else:
+            data = self.to_prometheus()
+
+        temp_path = path + '.tmp'
+
+        with open(temp_path, 'w', encoding='utf-8') as file_obj:
+            file_obj.write(data)
+
+        os.replace(temp_path, path)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def endpoint_from_url(url, base_url=None):
+    '''
+    Функция, возвращающая название endpoint по адресу запроса: путь относительно base_url
+    (либо путь адреса) без параметров, идентификаторы в конце пути заменяются на {id}.
+    '''
+
+    if base_url and url.startswith(base_url):
+        path = url[len(base_url):].split('?', 1)[0]
+
+    else:
+        path = urlsplit(url).path.lstrip('/')
+
+    return re.sub(r'/[^/]*\d[^/]*$', '/{id}', path) or '/'
+
+
+# Общий реестр метрик процесса.
+registry = Metrics()
@@ -0,0 +1,308 @@
+import os
+
+import mmap
+
+import threading
+
+from collections import OrderedDict
+
+
+class PhotoCache:
+    '''
+    Класс PhotoCache - кэш содержимого фотографий на локальном диске с ограничением по объёму.
+
+    Основное применение - повторные попытки, повторные запуски после частичного сбоя
+    и загрузка в несколько мест назначения: фотография скачивается с сервера Вконтакте один раз,
+    а затем читается с локального диска.
+
+    Ключом является владелец, идентификатор фотографии и тип размера копии (photo.owner_id, photo.id, photo.size):
+    идентификаторы фотографий Вконтакте уникальны только в пределах владельца.
+    Файл хранится как {directory}/{owner_id}_{id}_{size}.jpg. Когда общий объём превышает max_bytes,
+    удаляются давно не использованные файлы (LRU). Время последнего использования хранится
+    во времени изменения файла (обновляется через os.utime), поэтому порядок вытеснения
+    сохраняется между запусками. Метод get читает файл через mmap без копирования в память процесса;
+    если фотографию нужно только отправить, используется get_or_fetch_path: файл скачивается
+    в кэш частями и загружается с диска (например, через MediaFileUpload), не попадая в память целиком.
+
+    Attributes
+    ----------
+    directory: str
+        папка кэша (по умолчанию photo_cache).
+
+    max_bytes: int
+        максимальный объём кэша в байтах (по умолчанию 1 ГБ).
+
+
+    Methods
+    -------
+    get(photo: Photo)
+        возвращает содержимое фотографии из кэша (mmap) либо None.
+
+    put(photo: Photo, data: bytes)
+        сохраняет фотографию в кэш.
+
+    get_or_fetch(photo: Photo, fetch: callable)
+        возвращает содержимое фотографии из кэша, скачивая её при отсутствии.
+
+    path(photo: Photo)
+        возвращает путь к файлу фотографии в кэше либо None.
+
+    put_stream(photo: Photo, chunks)
+        сохраняет фотографию в кэш по частям.
+
+    get_or_fetch_path(photo: Photo, fetch: callable)
+        возвращает путь к файлу фотографии в кэше, скачивая её по частям при отсутствии.
+
+    '''
+
+    def __init__(self, directory='photo_cache', max_bytes=1024 ** 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.size = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+        files = []
+
+        for entry in os.scandir(directory):
+
+            # Временные файлы прерванных записей удаляются: они не входят в кэш и не учитываются в max_bytes.
+            if entry.is_file() and entry.name.endswith('.tmp'):
+
+                try:
+                    os.remove(entry.path)
+
+                except OSError:
+                    pass
+
+            elif entry.is_file() and entry.name.endswith('.jpg'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+
+        for mtime, name, size in sorted(files):
+            self._entries[name] = size
+            self.size += size
+
+    def _name(self, photo):
+        return f"{photo.owner_id}_{photo.id}_{photo.size}.jpg"
+
+    def __contains__(self, photo):
+        with self._lock:
+            return self._name(photo) in self._entries
+
+    def get(self, photo):
+        '''
+        Метод для получения содержимого фотографии из кэша.
+
+        Parameters
+        ----------
+        photo: Photo
+            запись Photo с информацией о фотографии.
+
+        В качестве возврата (return) метод использует объект mmap (только для чтения) либо None,
+        если фотографии нет в кэше. Отображение остаётся доступным, даже если файл будет вытеснен.
+
+        '''
+
+        name = self._name(photo)
+
+        path = os.path.join(self.directory, name)
+
+        with self._lock:
+
+            if name not in self._entries:
+                return None
+
+            self._entries.move_to_end(name)
+
+            try:
+                os.utime(path)
+
+                with open(path, 'rb') as file_obj:
+
+                    if self._entries[name] == 0:
+                        return b''
+
+                    return mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+
+            except OSError:
+                self.size -= self._entries.pop(name)
+                return None
+
+    def path(self, photo):
+        '''
+        Метод, возвращающий путь к файлу фотографии в кэше (время использования обновляется).
+
+        В качестве возврата (return) метод использует путь к файлу либо None, если фотографии нет в кэше.
+
+        '''
+
+        name = self._name(photo)
+
+        path = os.path.join(self.directory, name)
+
+        with self._lock:
+
+            if name not in self._entries:
+                return None
+
+            self._entries.move_to_end(name)
+
+            try:
+                os.utime(path)
+
+            except OSError:
+                self.size -= self._entries.pop(name)
+                return None
+
+            return path
+
+    def put(self, photo, data):
+        '''
+        Метод для сохранения фотографии в кэш.
+        Запись выполняется через временный файл, поэтому прерванная запись не оставляет повреждённых файлов.
+
+        Parameters
+        ----------
+        photo: Photo
+            запись Photo с информацией о фотографии.
+
+        data: bytes
+            содержимое фотографии.
+
+        '''
+
+        if len(data) > self.max_bytes:
+            return
+
+        name = self._name(photo)
+
+        path = os.path.join(self.directory, name)
+
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+
+        with open(temp_path, 'wb') as file_obj:
+            file_obj.write(data)
+
+        with self._lock:
+
+            os.replace(temp_path, path)
+
+            self.size += len(data) - self._entries.pop(name, 0)
+            self._entries[name] = len(data)
+
+            self._evict()
+
+    def put_stream(self, photo, chunks):
+        '''
+        Метод для сохранения фотографии в кэш по частям (без загрузки файла в память целиком).
+
+        Parameters
+        ----------
+        photo: Photo
+            запись Photo с информацией о фотографии.
+
+        chunks
+            итерируемый объект с частями содержимого (bytes), например fan_out.stream_photo.
+
+        В качестве возврата (return) метод использует путь к файлу в кэше либо None,
+        если файл больше max_bytes (тогда он не сохраняется).
+
+        '''
+
+        name = self._name(photo)
+
+        path = os.path.join(self.directory, name)
+
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+
+        size = 0
+
+        try:
+            with open(temp_path, 'wb') as file_obj:
+
+                for chunk in chunks:
+                    file_obj.write(chunk)
+                    size += len(chunk)
+
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+        if size > self.max_bytes:
+            os.remove(temp_path)
+            return None
+
+        with self._lock:
+
+            os.replace(temp_path, path)
+
+            self.size += size - self._entries.pop(name, 0)
+            self._entries[name] = size
+
+            self._evict()
+
+        return path
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._entries:
+
+            name, size = self._entries.popitem(last=False)
+
+            self.size -= size
+
+            try:
+                os.remove(os.path.join(self.directory, name))
+
+            except FileNotFoundError:
+                pass
+
+    def get_or_fetch(self, photo, fetch):
+        '''
+        Метод, возвращающий содержимое фотографии из кэша, а при отсутствии - скачивающий её.
+
+        Parameters
+        ----------
+        photo: Photo
+            запись Photo с информацией о фотографии.
+
+        fetch: callable
+            функция, которая по url возвращает содержимое фотографии (например, fan_out.fetch_photo).
+
+        В качестве возврата (return) метод использует содержимое фотографии (mmap либо bytes).
+
+        '''
+
+        data = self.get(photo)
+
+        if data is None:
+            data = fetch(photo.url)
+            self.put(photo, data)
+
+        return data
+
+    def get_or_fetch_path(self, photo, fetch):
+        '''
+        Метод, возвращающий путь к файлу фотографии в кэше, а при отсутствии - скачивающий её по частям.
+
+        Parameters
+        ----------
+        photo: Photo
+            запись Photo с информацией о фотографии.
+
+        fetch: callable
+            функция, которая по url возвращает части содержимого фотографии (например, fan_out.stream_photo).
+
+        В качестве возврата (return) метод использует путь к файлу в кэше
+        либо None, если фотография больше max_bytes и не может быть сохранена.
+
+        '''
+
+        path = self.path(photo)
+
+        if path is None:
+            path = self.put_stream(photo, fetch(photo.url))
+
+        return path
@@ -0,0 +1,258 @@
+import queue
+
+import threading
+
+import requests
+
+import sync
+
+from tqdm import tqdm
+
+
+# Признак окончания очереди для потоков загрузки.
+_DONE = object()
+
+
+class TransferPipeline:
+    '''
+    Класс TransferPipeline - конвейер переноса фотографий "производитель - потребители".
+
+    Основное применение - перенос фотографий без деления на этапы: фотографии, получаемые
+    постранично (например, генератором VkUser.iter_photos), сразу помещаются в ограниченную очередь,
+    из которой их забирают потоки загрузки. Получение списка фотографий, скачивание и загрузка
+    выполняются одновременно, поэтому общее время близко ко времени самого медленного этапа,
+    а не к сумме времени всех этапов. Ограниченный размер очереди не даёт получению списка
+    уйти далеко вперёд загрузки: когда очередь заполнена, следующая страница не запрашивается.
+
+    Attributes
+    ----------
+    upload: callable
+        функция загрузки одной фотографии (например, созданная yandex_uploader или google_uploader).
+        Принимает запись Photo и возвращает словарь с результатом (file_name, path, status).
+
+    workers: int
+        количество потоков загрузки (по умолчанию 8).
+
+    queue_size: int
+        максимальное количество фотографий в очереди (по умолчанию workers * 2).
+
+    manifest: SyncManifest
+        манифест синхронизации. Если задан, статус каждой фотографии записывается в манифест,
+        который сохраняется после переноса.
+
+
+    Methods
+    -------
+    run(photos: iterable)
+        переносит фотографии и возвращает результаты загрузки.
+
+    stop()
+        прерывает перенос: фотографии, оставшиеся в очереди, не загружаются.
+
+    '''
+
+    def __init__(self, upload, workers=8, queue_size=None, manifest=None):
+        self.upload = upload
+        self.workers = max(1, workers)
+        self.queue_size = queue_size or self.workers * 2
+        self.manifest = manifest
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def _consume(self, tasks, results, lock, progress):
+        while True:
+
+            photo = tasks.get()
+
+            if photo is _DONE:
+                return
+
+            if self._stop.is_set():
+                continue
+
+            try:
+                result = self.upload(photo)
+
+            except Exception as error:
+                result = {'file_name': photo.file_name, 'path': None, 'status': 'error', 'error': repr(error)}
+
+            if self.manifest is not None:
+                self.manifest.mark(photo.id, 'failed' if result['status'] == 'error' else 'done', result.get('path'), photo.owner_id)
+
+            with lock:
+                results.append(result)
+                progress.update()
+
+    def run(self, photos):
+        '''
+        Метод для переноса фотографий.
+
+        Parameters
+        ----------
+        photos: iterable
+            записи Photo (список либо генератор, например VkUser.iter_photos).
+            Генератор выполняется в текущем потоке одновременно с загрузкой.
+
+        В качестве возврата (return) метод использует список результатов загрузки каждого файла
+        в порядке завершения: file_name, path, status ('success', 'skipped' либо 'error')
+        и response, id либо error. Ошибка загрузки одного файла не прерывает загрузку остальных.
+
+        '''
+
+        self._stop.clear()
+
+        tasks = queue.Queue(maxsize=self.queue_size)
+
+        results = []
+
+        lock = threading.Lock()
+
+        print()
+
+        progress = tqdm(desc='Идёт перенос файлов, пожалуйста, подождите ...', unit='S')
+
+        threads = [threading.Thread(target=self._consume, args=(tasks, results, lock, progress), daemon=True)
+                   for _ in range(self.workers)]
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            for photo in photos:
+
+                if self._stop.is_set():
+                    break
+
+                tasks.put(photo)
+
+        except KeyboardInterrupt:
+            self.stop()
+            print('\nПеренос прерван, ожидание завершения начатых загрузок...')
+
+        finally:
+            for _ in threads:
+                tasks.put(_DONE)
+
+            for thread in threads:
+                thread.join()
+
+            progress.close()
+
+            if self.manifest is not None:
+                self.manifest.save()
+
+        errors = [result for result in results if result['status'] == 'error']
+
+        skipped = sum(1 for result in results if result['status'] == 'skipped')
+
+        print(f"\nЗагружено файлов: {len(results) - len(errors) - skipped}, "
+              f"без изменений: {skipped}, с ошибкой: {len(errors)}.")
+
+        for result in errors:
+            print(f"{result['file_name']}: {result['error']}")
+
+        return results
+
+
+def _unchanged(photo, remote):
+    try:
+        return sync.compare(photo, remote)
+
+    except requests.RequestException:
+        return False
+
+
+def yandex_uploader(disk, path, tracker=None, remote_files=None):
+    '''
+    Функция, создающая функцию загрузки одной фотографии на Яндекс.Диск для TransferPipeline.
+
+    Parameters
+    ----------
+    disk: YandexDisk
+        клиент Яндекс.Диска.
+
+    path: str
+        путь к папке на Яндекс.Диске.
+
+    tracker: OperationTracker
+        отслеживание операций загрузки. Если задан, в него передаются ссылки на операции.
+
+    remote_files: dict
+        файлы папки назначения (имя -> md5 и size, например DiskIndex.files(path)).
+        Файлы, совпадающие по размеру и md5, пропускаются, изменившиеся - удаляются и загружаются заново.
+
+    В качестве возврата (return) функция использует функцию загрузки.
+
+    '''
+
+    remote_files = remote_files or {}
+
+    def upload(photo):
+
+        remote = remote_files.get(photo.file_name)
+
+        if remote is not None:
+
+            if _unchanged(photo, remote):
+                return {'file_name': photo.file_name, 'path': f"{path}/{photo.file_name}", 'status': 'skipped'}
+
+            disk.delete_files_yandex_disk(f"{path}/{photo.file_name}")
+
+        result = disk.upload_photo(path, photo)
+
+        if tracker is not None and result['status'] == 'success' and 'href' in result['response']:
+            tracker.add(result['response']['href'], result['path'])
+
+        return result
+
+    return upload
+
+
+def google_uploader(service, folder_id, remote_files=None):
+    '''
+    Функция, создающая функцию загрузки одной фотографии на Google.Drive для TransferPipeline.
+
+    Parameters
+    ----------
+    service
+        сервис, который будет использовать 3ю версию REST API Google.Drive,
+        отправляя запросы из-под учетных данных credentials.
+
+    folder_id: str
+        идентификатор папки на Google.Drive.
+
+    remote_files: dict
+        файлы папки назначения (имя -> id, md5 и size).
+        Файлы, совпадающие по размеру и md5, пропускаются, изменившиеся - удаляются и загружаются заново.
+
+    В качестве возврата (return) функция использует функцию загрузки.
+
+    '''
+
+    import google_drive
+
+    remote_files = remote_files or {}
+
+    def upload(photo):
+
+        result = {'file_name': photo.file_name, 'path': f"{folder_id}/{photo.file_name}"}
+
+        remote = remote_files.get(photo.file_name)
+
+        if remote is not None:
+
+            if _unchanged(photo, remote):
+                result.update({'status': 'skipped', 'id': remote['id']})
+                return result
+
+            google_drive.delete_files_google_drive(service, remote['id'])
+
+        file = google_drive.upload_photo_google_drive(service, photo, folder_id)
+
+        result.update({'status': 'success', 'id': file.get('id')})
+
+        return result
+
+    return upload
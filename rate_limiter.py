@@ -0,0 +1,144 @@
+import time
+
+import threading
+
+
+class RateLimiter:
+    '''
+    Класс RateLimiter - ограничитель частоты запросов по алгоритму "token bucket".
+
+    Основное применение - соблюдение допустимой частоты запросов к API (VK, Яндекс.Диск, Google.Drive).
+    Один экземпляр разделяется всеми клиентами, работающими с одним и тем же API,
+    поэтому ограничение действует на все запросы процесса, в том числе из разных потоков.
+
+    Attributes
+    ----------
+    rate: float
+        количество запросов в секунду, пополняемое в "корзину".
+
+    capacity: int
+        максимальное количество запросов, которые можно выполнить подряд без ожидания.
+
+
+    Methods
+    -------
+    acquire(tokens: int)
+        блокирует выполнение до тех пор, пока не будет разрешено выполнить запрос.
+
+    reserve(tokens: int)
+        резервирует запрос без блокировки и возвращает время, которое нужно подождать.
+
+    configure(rate: float, capacity: int)
+        изменяет параметры ограничителя.
+
+    '''
+
+    def __init__(self, rate, capacity=1):
+        self._lock = threading.Lock()
+        self.configure(rate, capacity)
+
+    def configure(self, rate, capacity=None):
+        '''
+        Метод для изменения частоты запросов.
+
+        Parameters
+        ----------
+        rate: float
+            количество запросов в секунду. Значение 0 или None отключает ограничение.
+
+        capacity: int
+            максимальное количество запросов подряд без ожидания. По умолчанию не изменяется.
+
+        '''
+
+        with self._lock:
+            self.rate = rate
+            if capacity is not None:
+                self.capacity = capacity
+            self._tokens = self.capacity
+            self._updated = time.monotonic()
+
+    def acquire(self, tokens=1):
+        '''
+        Метод, ожидающий разрешения на выполнение запроса.
+
+        Parameters
+        ----------
+        tokens: int
+            количество запросов, которое будет выполнено (по умолчанию 1).
+
+
+        Exceptions
+        ----------
+        ValueError - возникает, если tokens больше capacity (такой запрос никогда не будет разрешён).
+
+
+        В качестве возврата (return) метод использует время ожидания в секундах.
+
+        '''
+
+        if not self.rate:
+            return 0.0
+
+        if tokens > self.capacity:
+            raise ValueError(f"Запрошено {tokens} запросов при ёмкости ограничителя {self.capacity}")
+
+        waited = 0.0
+
+        while True:
+
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+
+                delay = (tokens - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+    def reserve(self, tokens=1):
+        '''
+        Метод, резервирующий запрос без блокировки (для асинхронных клиентов).
+
+        Запрос сразу учитывается в "корзине", поэтому синхронные и асинхронные клиенты,
+        использующие один ограничитель, вместе не превышают допустимую частоту.
+
+        Parameters
+        ----------
+        tokens: int
+            количество запросов, которое будет выполнено (по умолчанию 1).
+
+
+        В качестве возврата (return) метод использует время в секундах,
+        которое нужно подождать перед выполнением запроса (например, через asyncio.sleep).
+
+        '''
+
+        if not self.rate:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+
+            return max(0.0, -self._tokens / self.rate)
+
+
+# Общие ограничители для каждого API.
+# VK допускает не более 3 запросов в секунду для пользовательского токена. Ёмкость 1 равномерно
+# распределяет запросы (не чаще одного в 1/3 секунды): при большей ёмкости серия запросов из полной
+# "корзины" вместе с пополнением превышает лимит в первую секунду.
+# Для Яндекс.Диска и Google.Drive заданы консервативные значения.
+
+vk_limiter = RateLimiter(3, 1)
+
+yandex_limiter = RateLimiter(10, 10)
+
+google_limiter = RateLimiter(10, 10)
@@ -0,0 +1,156 @@
+class Record:
+    '''
+    Класс Record - базовый класс компактных записей с фиксированным набором полей (__slots__).
+
+    В отличие от словаря запись не хранит собственный __dict__, поэтому занимает
+    заметно меньше памяти при большом количестве объектов.
+
+    Methods
+    -------
+    to_dict()
+        возвращает запись в виде словаря (для сохранения в JSON).
+
+    from_dict(data: dict)
+        создаёт запись из словаря (лишние ключи игнорируются).
+
+    '''
+
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        for name, value in zip(self.__slots__, args):
+            setattr(self, name, value)
+
+        for name in self.__slots__[len(args):]:
+            setattr(self, name, kwargs.get(name))
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Photo(Record):
+    '''
+    Класс Photo - информация о фотографии пользователя Вконтакте.
+
+    Attributes
+    ----------
+    id: int
+        идентификатор фотографии.
+
+    date: int
+        дата загрузки фотографии (unixtime).
+
+    file_name: str
+        имя файла (количество лайков и дата загрузки).
+
+    size: str
+        тип копии фотографии наибольшего размера.
+
+    url: str
+        ссылка на копию фотографии.
+
+    owner_id: int
+        идентификатор владельца фотографии (идентификаторы фотографий уникальны только в пределах владельца).
+
+    '''
+
+    __slots__ = ('id', 'date', 'file_name', 'size', 'url', 'owner_id')
+
+    @classmethod
+    def from_vk(cls, value, owner_id=None):
+        '''
+        Создаёт запись из элемента ответа photos.get (с параметром extended=1).
+        owner_id - владелец альбома, если в элементе ответа его нет.
+        '''
+
+        return cls(
+            value['id'],
+            value['date'],
+            f"{value['likes']['count']}_{value['date']}.jpg",
+            value['sizes'][-1]['type'],
+            value['sizes'][-1]['url'],
+            value.get('owner_id', owner_id)
+        )
+
+
+class Album(Record):
+    '''
+    Класс Album - информация о фотоальбоме пользователя Вконтакте.
+
+    Attributes
+    ----------
+    title: str
+        название альбома.
+
+    user_id: int
+        идентификатор владельца альбома.
+
+    id: int
+        идентификатор альбома.
+
+    size: int
+        количество фотографий в альбоме.
+
+    description: str
+        описание альбома.
+
+    '''
+
+    __slots__ = ('title', 'user_id', 'id', 'size', 'description')
+
+    @classmethod
+    def from_vk(cls, value):
+        '''
+        Создаёт запись из элемента ответа photos.getAlbums.
+        '''
+
+        return cls(value['title'], value['owner_id'], value['id'], value['size'], value['description'])
+
+
+class User(Record):
+    '''
+    Класс User - информация о пользователе Вконтакте.
+
+    Attributes
+    ----------
+    id: int
+        идентификатор пользователя.
+
+    last_name: str
+        фамилия.
+
+    first_name: str
+        имя.
+
+    is_closed: bool
+        скрыт ли профиль настройками приватности.
+
+    can_access_closed: bool
+        может ли текущий пользователь видеть профиль при is_closed = True.
+
+    '''
+
+    __slots__ = ('id', 'last_name', 'first_name', 'is_closed', 'can_access_closed')
+
+    @classmethod
+    def from_vk(cls, value):
+        '''
+        Создаёт запись из элемента ответа users.get.
+        '''
+
+        return cls(value['id'], value['last_name'], value['first_name'],
+                   value['is_closed'], value['can_access_closed'])
@@ -0,0 +1,299 @@
+import time
+
+import asyncio
+
+import random
+
+import requests
+
+from email.utils import parsedate_to_datetime
+
+
+# HTTP-статусы временных ошибок: превышение частоты запросов и ошибки сервера.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Коды ошибок VK, после которых запрос можно повторить:
+# 6 - слишком много запросов в секунду, 9 - слишком много однотипных действий (flood control),
+# 10 - внутренняя ошибка сервера; 1 - неизвестная ошибка (документация VK советует повторить запрос позже).
+VK_RETRY_CODES = frozenset({1, 6, 9, 10})
+
+# Пауза перед повтором после ошибки VK 9 (в секундах). Flood control снимается не раньше чем через
+# несколько десятков секунд, поэтому пауза передаётся как Retry-After: она не уменьшается jitter
+# и ограничивается max_retry_after политики (при меньшем max_retry_after запрос не повторяется).
+VK_FLOOD_DELAY = 60.0
+
+
+class RetryPolicy:
+    '''
+    Класс RetryPolicy - политика повторных попыток запросов.
+
+    Основное применение - повтор запросов к API (VK, Яндекс.Диск, Google.Drive) после временных ошибок,
+    чтобы одна ошибка превышения частоты запросов не прерывала перенос тысячи файлов.
+    Пауза между попытками растёт экспоненциально (base_delay * 2 ** (попытка - 1), но не более max_delay)
+    и выбирается случайно от нуля до этого значения (jitter), чтобы параллельные потоки не повторяли
+    запросы одновременно. Если сервер указал время ожидания (Retry-After), используется оно.
+    Неустранимые ошибки (например, 400, 401, 404) не повторяются.
+
+    Attributes
+    ----------
+    max_attempts: int
+        максимальное количество попыток (включая первую).
+
+    base_delay: float
+        начальная пауза между попытками (в секундах).
+
+    max_delay: float
+        максимальная пауза между попытками (в секундах).
+
+    max_retry_after: float
+        максимальное время ожидания по Retry-After (в секундах). Если сервер просит ждать дольше,
+        запрос не повторяется.
+
+
+    Methods
+    -------
+    delay(attempt: int, retry_after: float)
+        возвращает паузу перед следующей попыткой.
+
+    call(send: callable, check: callable, check_error: callable, on_retry: callable)
+        выполняет запрос с повторными попытками.
+
+    acall(send: callable, check: callable, check_error: callable, on_retry: callable)
+        выполняет асинхронный запрос с повторными попытками (паузы - через asyncio.sleep).
+
+    '''
+
+    def __init__(self, max_attempts=5, base_delay=0.5, max_delay=30.0, max_retry_after=120.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.sleep = time.sleep
+
+    def delay(self, attempt, retry_after=None):
+        '''
+        Метод для вычисления паузы перед следующей попыткой.
+
+        Parameters
+        ----------
+        attempt: int
+            номер неудачной попытки (начиная с 1).
+
+        retry_after: float
+            время ожидания, указанное сервером (Retry-After), либо None.
+
+        В качестве возврата (return) метод использует паузу в секундах.
+
+        '''
+
+        if retry_after is not None:
+            return retry_after
+
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def call(self, send, check=None, check_error=None, on_retry=None):
+        '''
+        Метод для выполнения запроса с повторными попытками.
+
+        Parameters
+        ----------
+        send: callable
+            функция без аргументов, выполняющая одну попытку запроса.
+
+        check: callable
+            функция, которая по результату попытки возвращает пару (повторять ли запрос, Retry-After).
+            По умолчанию результат считается окончательным.
+
+        check_error: callable
+            функция, которая по исключению возвращает пару (повторять ли запрос, Retry-After).
+            По умолчанию исключение передаётся вызывающему коду без повторов.
+
+        on_retry: callable
+            функция, вызываемая перед каждой повторной попыткой с аргументами
+            (номер неудачной попытки, причина - HTTP-статус или имя исключения, пауза в секундах).
+            Используется, например, для учёта повторов в метриках (Metrics.retry_callback).
+
+        В качестве возврата (return) метод использует результат последней попытки.
+        Если попытки исчерпаны из-за исключения, оно передаётся вызывающему коду.
+
+        '''
+
+        attempt = 0
+
+        while True:
+
+            attempt += 1
+
+            try:
+                result = send()
+
+            except Exception as error:
+
+                retryable, retry_after = check_error(error) if check_error else (False, None)
+
+                if not self._should_retry(attempt, retryable, retry_after):
+                    raise
+
+                reason = type(error).__name__
+
+            else:
+
+                retryable, retry_after = check(result) if check else (False, None)
+
+                if not self._should_retry(attempt, retryable, retry_after):
+                    return result
+
+                reason = _reason(result)
+
+            self.sleep(self._before_retry(attempt, retry_after, reason, on_retry))
+
+    async def acall(self, send, check=None, check_error=None, on_retry=None):
+        '''
+        Метод для выполнения асинхронного запроса с повторными попытками.
+        Параметры и результат такие же, как у метода call, но send - функция, возвращающая корутину.
+        Отмена задачи (asyncio.CancelledError) прерывает ожидание и не повторяется.
+        '''
+
+        attempt = 0
+
+        while True:
+
+            attempt += 1
+
+            try:
+                result = await send()
+
+            except Exception as error:
+
+                retryable, retry_after = check_error(error) if check_error else (False, None)
+
+                if not self._should_retry(attempt, retryable, retry_after):
+                    raise
+
+                reason = type(error).__name__
+
+            else:
+
+                retryable, retry_after = check(result) if check else (False, None)
+
+                if not self._should_retry(attempt, retryable, retry_after):
+                    return result
+
+                reason = _reason(result)
+
+            await asyncio.sleep(self._before_retry(attempt, retry_after, reason, on_retry))
+
+    def _before_retry(self, attempt, retry_after, reason, on_retry):
+        delay = self.delay(attempt, retry_after)
+
+        if on_retry is not None:
+            on_retry(attempt, reason, delay)
+
+        return delay
+
+    def _should_retry(self, attempt, retryable, retry_after):
+        if not retryable or attempt >= self.max_attempts:
+            return False
+
+        return retry_after is None or retry_after <= self.max_retry_after
+
+
+def _reason(result):
+    # Ошибка API со статусом 200 (например, ошибка VK 6) отличается от ошибок HTTP.
+    status = getattr(result, 'status_code', None)
+
+    return 'api_error' if status == 200 else str(status)
+
+
+def parse_retry_after(value):
+    '''
+    Функция для разбора заголовка Retry-After (количество секунд либо дата в формате HTTP).
+
+    Parameters
+    ----------
+    value: str
+        значение заголовка либо None.
+
+    В качестве возврата (return) функция использует время ожидания в секундах либо None.
+
+    '''
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+
+    except (TypeError, ValueError):
+        return None
+
+
+def check_http_response(response):
+    '''
+    Функция для проверки ответа requests: временной ошибкой считаются статусы из RETRY_STATUSES.
+
+    В качестве возврата (return) функция использует пару (повторять ли запрос, Retry-After).
+
+    '''
+
+    if response.status_code in RETRY_STATUSES:
+        return True, parse_retry_after(response.headers.get('Retry-After'))
+
+    return False, None
+
+
+def check_vk_response(response):
+    '''
+    Функция для проверки ответа API VK: кроме HTTP-статусов временной ошибкой
+    считаются коды ошибок VK из VK_RETRY_CODES (VK возвращает их со статусом 200).
+    После ошибки 9 (flood control) повтор выполняется не раньше чем через VK_FLOOD_DELAY секунд.
+
+    В качестве возврата (return) функция использует пару (повторять ли запрос, Retry-After).
+
+    '''
+
+    retryable, retry_after = check_http_response(response)
+
+    if retryable:
+        return retryable, retry_after
+
+    # Тело разбирается только у ответов с ошибкой, чтобы не разбирать большие списки фотографий дважды.
+    if response.status_code == 200 and response.content.startswith(b'{"error"'):
+
+        try:
+            code = response.json()['error'].get('error_code')
+
+        except (ValueError, KeyError, AttributeError):
+            return False, None
+
+        if code == 9:
+            return True, VK_FLOOD_DELAY
+
+        return code in VK_RETRY_CODES, None
+
+    return False, None
+
+
+def check_requests_error(error):
+    '''
+    Функция для проверки исключения requests: временными считаются ошибки соединения, таймауты
+    и ошибки raise_for_status() со статусами из RETRY_STATUSES.
+
+    В качестве возврата (return) функция использует пару (повторять ли запрос, Retry-After).
+
+    '''
+
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return check_http_response(error.response)
+
+    return isinstance(error, (requests.ConnectionError, requests.Timeout)), None
+
+
+# Общая политика повторных попыток для всех клиентов.
+default_policy = RetryPolicy()
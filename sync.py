@@ -0,0 +1,154 @@
+import hashlib
+
+import requests
+
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import registry
+
+from http_session import DEFAULT_TIMEOUT
+
+
+# Размер части файла, читаемой при подсчёте контрольной суммы.
+CHECKSUM_CHUNK_SIZE = 64 * 1024
+
+
+def source_checksum(url, expected_size=None, session=None, timeout=None):
+    '''
+    Функция для подсчёта md5 и размера файла-источника без загрузки его целиком в память.
+
+    Parameters
+    ----------
+    url: str
+        адрес файла (например, URL фотографии Вконтакте).
+
+    expected_size: int
+        размер файла на стороне назначения. Если размер источника из заголовка Content-Length
+        отличается от него, загрузка прекращается, а md5 не вычисляется.
+
+    session: requests.Session
+        HTTP-сессия, через которую выполняется запрос. По умолчанию - модуль requests.
+
+    timeout: tuple
+        ограничение времени запроса (установка соединения, ожидание данных) в секундах.
+        По умолчанию - ограничение сессии, а без сессии - DEFAULT_TIMEOUT.
+
+    В качестве возврата (return) функция использует словарь с ключами md5 (или None) и size.
+
+    '''
+
+    if session is None and timeout is None:
+        timeout = DEFAULT_TIMEOUT
+
+    with registry.track('vk_cdn', 'checksum') as record, (session or requests).get(url, stream=True, timeout=timeout) as response:
+
+        record.response(response.status_code)
+
+        response.raise_for_status()
+
+        content_length = response.headers.get('Content-Length')
+
+        if (expected_size is not None and content_length is not None
+                and 'Content-Encoding' not in response.headers and int(content_length) != expected_size):
+            return {'md5': None, 'size': int(content_length)}
+
+        md5 = hashlib.md5()
+
+        size = 0
+
+        for chunk in response.iter_content(CHECKSUM_CHUNK_SIZE):
+            md5.update(chunk)
+            size += len(chunk)
+
+        record.bytes_in = size
+
+    return {'md5': md5.hexdigest(), 'size': size}
+
+
+def compare(photo, remote, checksum=source_checksum):
+    '''
+    Функция для сравнения фотографии-источника с файлом на стороне назначения.
+
+    Parameters
+    ----------
+    photo: Photo
+        запись Photo с информацией о фотографии.
+
+    remote: dict
+        словарь с информацией о файле назначения (md5, size).
+
+    checksum: callable
+        функция подсчёта контрольной суммы источника (по умолчанию source_checksum).
+
+    В качестве возврата (return) функция использует True, если файлы совпадают по размеру и md5.
+    Если у файла назначения нет md5 или размера, файлы считаются различными.
+
+    '''
+
+    if not remote.get('md5') or remote.get('size') is None:
+        return False
+
+    source = checksum(photo.url, int(remote['size']))
+
+    return source['size'] == int(remote['size']) and source['md5'] == remote['md5']
+
+
+def plan_sync(photos, remote_files, checksum=source_checksum, workers=1):
+    '''
+    Функция для формирования плана синхронизации фотографий с папкой назначения.
+
+    Контрольная сумма источника вычисляется только для фотографий, имя которых
+    уже есть в папке назначения; остальные фотографии сразу попадают в загрузку.
+
+    Parameters
+    ----------
+    photos: list
+        список записей Photo.
+
+    remote_files: dict
+        словарь, где ключом является имя файла в папке назначения,
+        а значением - словарь с его md5 и size.
+
+    checksum: callable
+        функция подсчёта контрольной суммы источника (по умолчанию source_checksum).
+
+    workers: int
+        количество одновременно проверяемых файлов (по умолчанию 1).
+
+    В качестве возврата (return) функция использует словарь со списками:
+    upload - новые фотографии,
+    replace - пары (фотография, файл назначения), содержимое которых изменилось,
+    skip - фотографии, совпадающие с файлами назначения.
+
+    '''
+
+    plan = {'upload': [], 'replace': [], 'skip': []}
+
+    existing = []
+
+    for photo in photos:
+
+        if photo.file_name in remote_files:
+            existing.append((photo, remote_files[photo.file_name]))
+
+        else:
+            plan['upload'].append(photo)
+
+    def check(pair):
+        try:
+            return compare(pair[0], pair[1], checksum)
+
+        except requests.RequestException:
+            return False
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+
+        for pair, same in zip(existing, executor.map(check, existing)):
+
+            if same:
+                plan['skip'].append(pair[0])
+
+            else:
+                plan['replace'].append(pair)
+
+    return plan
@@ -0,0 +1,239 @@
+import os
+
+import json
+
+import time
+
+import atexit
+
+import threading
+
+from collections import deque, Counter
+
+
+class JsonLinesLog:
+    '''
+    Класс JsonLinesLog - журнал в формате JSON Lines (одна запись JSON на строку) с буферизацией.
+
+    Основное применение - запись информации о фото и альбомах по мере их получения.
+    Записи дописываются в конец файла, поэтому при аварийном завершении программы
+    теряются только записи из буфера, а память не растёт с количеством записей.
+    Буфер сбрасывается на диск, когда в нём накапливается flush_every записей
+    или с прошлого сброса прошло flush_interval секунд, а также при закрытии журнала
+    и завершении программы. Сброс по времени выполняется таймером в фоновом потоке,
+    поэтому записи попадают на диск не позднее чем через flush_interval секунд,
+    даже если перенос остановился и новых записей нет.
+
+    Attributes
+    ----------
+    path: str
+        путь к файлу журнала.
+
+    flush_every: int
+        количество записей, после которого буфер сбрасывается на диск.
+
+    flush_interval: float
+        максимальное время (в секундах) между сбросами буфера.
+
+
+    Methods
+    -------
+    write(record: dict)
+        добавляет запись в журнал.
+
+    flush()
+        записывает буфер на диск.
+
+    discard()
+        отбрасывает записи, ещё не записанные на диск.
+
+    close()
+        записывает буфер на диск и закрывает журнал.
+
+    '''
+
+    def __init__(self, path, flush_every=100, flush_interval=5.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._timer = None
+        self._closed = False
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _serialize(self, record):
+        return json.dumps(record, ensure_ascii=False)
+
+    def write(self, record):
+        '''
+        Метод для добавления записи в журнал.
+
+        Parameters
+        ----------
+        record: dict
+            запись (должна сериализоваться в JSON).
+
+        '''
+
+        line = self._serialize(record)
+
+        with self._lock:
+            self._buffer.append(line)
+
+            if len(self._buffer) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+            elif self._timer is None and not self._closed:
+                self._start_timer()
+
+    def _start_timer(self):
+        # Таймер сбрасывает буфер, если за flush_interval секунд он не был записан при добавлении записей.
+        self._timer = threading.Timer(self.flush_interval, self._timed_flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _timed_flush(self):
+        with self._lock:
+            self._timer = None
+
+            if self._closed or not self._buffer:
+                return
+
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+            else:
+                self._start_timer()
+
+    def _write_lines(self, lines):
+        with open(self.path, 'a', encoding='utf-8') as file_obj:
+            file_obj.write('\n'.join(lines) + '\n')
+
+    def _flush_locked(self):
+        if self._buffer:
+            self._write_lines(self._buffer)
+            self._buffer = []
+
+        self._last_flush = time.monotonic()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def flush(self):
+        '''
+        Метод для записи буфера на диск.
+        '''
+
+        with self._lock:
+            self._flush_locked()
+
+    def discard(self):
+        '''
+        Метод, отбрасывающий записи, ещё не записанные на диск.
+
+        В качестве возврата (return) метод использует количество отброшенных записей.
+
+        '''
+
+        with self._lock:
+            count = len(self._buffer)
+            self._buffer = []
+            self._cancel_timer()
+
+        return count
+
+    def close(self):
+        '''
+        Метод для записи буфера на диск и закрытия журнала.
+        '''
+
+        with self._lock:
+            if self._closed:
+                return
+
+            self._flush_locked()
+            self._cancel_timer()
+            self._closed = True
+
+        atexit.unregister(self.close)
+
+
+def read_log(path):
+    '''
+    Генератор, построчно читающий журнал JSON Lines без загрузки его целиком в память.
+
+    Parameters
+    ----------
+    path: str
+        путь к файлу журнала.
+
+    В качестве результата (yield) генератор возвращает записи журнала (словари).
+    Повреждённая последняя строка (например, после аварийного завершения) пропускается.
+
+    '''
+
+    if not os.path.exists(path):
+        return
+
+    with open(path, 'r', encoding='utf-8') as file_obj:
+
+        for line in file_obj:
+
+            line = line.strip()
+
+            if not line:
+                continue
+
+            try:
+                yield json.loads(line)
+
+            except json.JSONDecodeError:
+                continue
+
+
+def tail(path, count=10):
+    '''
+    Функция для получения последних записей журнала.
+
+    Parameters
+    ----------
+    path: str
+        путь к файлу журнала.
+
+    count: int
+        количество записей (по умолчанию 10).
+
+    В качестве возврата (return) функция использует список последних записей.
+
+    '''
+
+    return list(deque(read_log(path), maxlen=count))
+
+
+def aggregate(path, key):
+    '''
+    Функция для подсчёта записей журнала по значению поля.
+
+    Parameters
+    ----------
+    path: str
+        путь к файлу журнала.
+
+    key: str
+        поле, по значению которого группируются записи (например, size).
+
+    В качестве возврата (return) функция использует словарь: значение поля -> количество записей.
+
+    '''
+
+    return dict(Counter(record.get(key) for record in read_log(path)))
@@ -1,14 +1,35 @@
-import time
-
 import json
 
-import requests
+import threading
+
+from http_session import create_session
+
+from rate_limiter import vk_limiter
+
+from error_log import vk_errors
+
+from metrics import registry
+
+from retry import default_policy, check_vk_response, check_requests_error
+
+from records import Photo, Album, User
 
 from  tqdm  import  tqdm
 
 from pprint import pprint
 
 
+class VkApiError(Exception):
+    '''
+    Исключение VkApiError - ошибка API Вконтакте (код и сообщение ошибки из ответа сервера).
+    '''
+
+    def __init__(self, code, message):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+
+
 class VkUser:
     '''
     Класс VkUser - используется для работы с аккаунтом ВКонтакте.
@@ -23,21 +44,58 @@ class VkUser:
     version: str
         используемая версия API Вконтакте
 
+    rate_limiter: RateLimiter
+        ограничитель частоты запросов. По умолчанию используется общий для всех клиентов vk_limiter.
+
+    pool_size: int
+        размер пула соединений HTTP-сессии (по умолчанию 10).
+
+    session: requests.Session
+        HTTP-сессия с пулом keep-alive соединений. По умолчанию создаётся для каждого клиента.
+
+    error_log: ErrorLog
+        журнал ошибок. По умолчанию используется общий для всех клиентов vk_errors (log_vk.jsonl).
+
+    retry_policy: RetryPolicy
+        политика повторных попыток. По умолчанию используется общая default_policy.
+
+    timeout: tuple
+        ограничение времени запросов (установка соединения, ожидание данных) в секундах
+        для создаваемой сессии. По умолчанию - DEFAULT_TIMEOUT (см. http_session).
+
 
     Methods
     -------
     _error_validator(response: dict)
         обрабатывает возникающие ошибки. Является приватным методом.
 
+    _call(method: str, params: dict)
+        выполняет запрос к методу API с учётом ограничения частоты. Является приватным методом.
+
+    close()
+        закрывает HTTP-сессию клиента.
+
     users_get(user_ids: str)
         возвращает расширенную информацию о пользователях.
 
     get_albums(owner_id: int, count: int)
         возвращает список фотоальбомов пользователя (или нескольких пользователей).
 
-    get_photos(album_id: str, rev: int, owner_id: int, extended: int, count: int)
+    get_photos(album_id: str, rev: int, owner_id: int, extended: int, count: int, manifest: SyncManifest)
         возвращает список фотографий в альбоме.
 
+    iter_photos(album_id: str, rev: int, owner_id: int, extended: int, page_size: int, limit: int, manifest: SyncManifest)
+        постранично возвращает фотографии альбома (генератор), без ограничения в 1000 записей.
+
+    execute(code: str)
+        выполняет код VKScript через метод execute.
+
+    get_albums_batch(owner_ids: list, count: int)
+        возвращает списки фотоальбомов нескольких пользователей, объединяя до 25 запросов в один.
+
+    get_photos_batch(album_id: str, rev: int, owner_ids: list, count: int, extended: int)
+        возвращает списки фотографий нескольких пользователей, объединяя до 25 запросов в один.
+
 
     Exceptions
     ----------
@@ -51,16 +109,42 @@ class VkUser:
 
     url = 'https://api.vk.com/method/'
 
-    def __init__(self, token, version):
+    # Максимальное количество фотографий, которое photos.get возвращает за один запрос.
+    photos_page_size = 1000
+
+    # Максимальное количество обращений к API внутри одного запроса execute.
+    execute_batch_size = 25
+
+    def __init__(self, token, version, rate_limiter=None, pool_size=10, session=None, error_log=None, retry_policy=None,
+                 timeout=None):
         self.params = {
             'access_token': token,
             'v': version
         }
+        self.rate_limiter = rate_limiter or vk_limiter
+        self.session = session or create_session(pool_size, timeout=timeout)
+        self.error_log = error_log or vk_errors
+        self.retry_policy = retry_policy or default_policy
+        self._context = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        '''
+        Метод для закрытия HTTP-сессии и всех открытых соединений клиента.
+        '''
+
+        self.session.close()
 
     def _error_validator(self, response):
         '''
         Метод для обработки ошибок.
-        Возвращает сообщение об ошибке и записывает возникающие ошибки в файл.
+        Возвращает сообщение об ошибке и записывает возникающие ошибки в общий журнал ошибок
+        (вместе с контекстом последнего запроса текущего потока).
         Является приватным методом.
 
         Parameters
@@ -77,21 +161,59 @@ class VkUser:
 
             if 'error_code' in value:
 
+                registry.error('vk', getattr(self._context, 'request', {}).get('method'), value['error_code'])
+
                 print(f"\nРабота метода была прервана ошибкой.\n"
                       f"Происходит обработка данных об ошибке, пожалуйста, подождите...\n"
                       f"\nКод ошибки: {value['error_code']}\n"
                       f"Сообщение об ошибке: \n{value['error_msg']}."
                       f"\n")
 
-                with open('log_vk.json', 'a', encoding='utf-8') as file_obj:
-                    print('Данные об ошибке сохранены в лог log_vk.json.')
-                    json.dump(response, file_obj, ensure_ascii=False, indent=4)
+                self.error_log.record('vk', response, getattr(self._context, 'request', None))
+
+                print(f'Данные об ошибке сохранены в лог {self.error_log.path}.')
 
                 return True
 
             else:
                 return False
 
+    def _call(self, method, params):
+        '''
+        Метод для выполнения запроса к API Вконтакте.
+        Перед каждой попыткой ожидает разрешения ограничителя частоты запросов.
+        Временные ошибки (HTTP 429 и 5xx, ошибки VK 1, 6, 9, 10, ошибки соединения)
+        повторяются согласно политике retry_policy. Время запросов, ожидания и повторы
+        учитываются в общем реестре метрик (metrics.registry).
+        Является приватным методом.
+
+        Parameters
+        ----------
+        method: str
+            название метода API (например, photos.get).
+
+        params: dict
+            параметры метода.
+
+
+        В качестве возврата (return) метод использует ответ сервера (requests.Response).
+
+        '''
+
+        self._context.request = {'method': method, 'params': params}
+
+        def send():
+            registry.wait('vk', self.rate_limiter.acquire())
+
+            with registry.track('vk', method) as record:
+                response = self.session.get(self.url + method, params={**self.params, **params})
+                record.response(response.status_code, len(response.content))
+
+            return response
+
+        return self.retry_policy.call(send, check_vk_response, check_requests_error,
+                                      registry.retry_callback('vk', method))
+
     def users_get(self, user_ids):
         '''
         Метод, который возвращает расширенную информацию о пользователях.
@@ -110,13 +232,11 @@ class VkUser:
 
         res_user_list = []
 
-        users_get_url = self.url + 'users.get'
-
         users_get_params = {
             'user_ids': user_ids
         }
 
-        response = requests.get(users_get_url, params={**self.params, **users_get_params})
+        response = self._call('users.get', users_get_params)
 
         if response.status_code >= 200 and response.status_code < 300:
 
@@ -128,15 +248,7 @@ class VkUser:
 
                     for info in value:
 
-                        user_dict = {
-                            'id': info['id'],
-                            'last_name': info['last_name'],
-                            'first_name': info['first_name'],
-                            'is_closed': info['is_closed'],
-                            'can_access_closed': info['can_access_closed']
-                        }
-
-                        res_user_list.append(user_dict)
+                        res_user_list.append(User.from_vk(info))
 
                 pprint(res_user_list)
 
@@ -172,14 +284,12 @@ class VkUser:
 
         res_albums_list = []
 
-        get_albums_url = self.url + 'photos.getAlbums'
-
         get_albums_params = {
             'owner_id': owner_id,
             'count': count
         }
 
-        response = requests.get(get_albums_url, params={**self.params, **get_albums_params})
+        response = self._call('photos.getAlbums', get_albums_params)
 
         if (response.status_code >= 200 and response.status_code < 300):
 
@@ -189,17 +299,7 @@ class VkUser:
 
                     for value in tqdm(req['response']['items'], desc='Происходит формирование списка с информацией об альбомах, пожалуйста, подождите...', unit='S'):
 
-                        time.sleep(1)
-
-                        album_dict = {
-                            'title': value['title'],
-                            'user_id': value['owner_id'],
-                            'id': value['id'],
-                            'size': value['size'],
-                            'description': value['description']
-                        }
-
-                        res_albums_list.append(album_dict)
+                        res_albums_list.append(Album.from_vk(value))
 
                     print()
                     print('Данные успешно сформированы.')
@@ -212,7 +312,7 @@ class VkUser:
 
 
 
-    def get_photos(self, album_id, rev, owner_id, count, extended=1):
+    def get_photos(self, album_id, rev, owner_id, count, extended=1, manifest=None):
         '''
         Метод для формирования списка с информацией о фотографиях.
 
@@ -259,7 +359,13 @@ class VkUser:
 
         count: int
             количество записей, которое будет получено.
-        Максимальное значение 1000.
+        За один запрос API возвращает не более 1000 записей,
+        при большем значении фотографии запрашиваются постранично (см. iter_photos).
+
+
+        manifest: SyncManifest
+            манифест синхронизации. Если задан, возвращаются только фотографии,
+            которые ещё не перенесены в место назначения манифеста (см. iter_photos).
 
 
         Exceptions
@@ -269,13 +375,34 @@ class VkUser:
         Данное исключение является специальным для данного метода.
 
 
-        В качестве возврата (return) метод использует результирующий список с информацией о фотографиях (res_photos_list).
+        В качестве возврата (return) метод использует результирующий список с информацией о фотографиях (res_photos_list)
+        либо None, если получить фотографии не удалось (в том числе при ошибке на любой из страниц).
 
         '''
 
-        res_photos_list = []
+        if count > self.photos_page_size:
+
+            print()
+
+            # Ошибка на любой странице прерывает получение целиком: усечённый список выглядел бы полным.
+            try:
+                res_photos_list = list(tqdm(self.iter_photos(album_id, rev, owner_id, extended, limit=count,
+                                                             manifest=manifest, raise_errors=True),
+                                            total=count,
+                                            desc='Происходит формирование списка с информацией о фото, пожалуйста, подождите...',
+                                            unit='S'))
+
+            except VkApiError:
+                print('Программа продолжает работу в штатном режиме.\n')
+                return None
+
+            print()
+            print('Данные успешно сформированы.')
+            print()
+
+            return res_photos_list
 
-        get_photos_url = self.url + 'photos.get'
+        res_photos_list = []
 
         get_photos_params = {
             'owner_id': owner_id,
@@ -285,7 +412,7 @@ class VkUser:
             'count': count
         }
 
-        response = requests.get(get_photos_url, params={**self.params, **get_photos_params})
+        response = self._call('photos.get', get_photos_params)
 
         if response.status_code >= 200 and response.status_code < 300:
 
@@ -297,15 +424,10 @@ class VkUser:
 
                 for value in tqdm(req['response']['items'], desc='Происходит формирование списка с информацией о фото, пожалуйста, подождите...', unit='S'):
 
-                    time.sleep(1)
-
-                    photo_dict = {
-                        'file_name': f"{value['likes']['count']}_{value['date']}.jpg",
-                        'size': value['sizes'][-1]['type'],
-                        'url': value['sizes'][-1]['url']
-                    }
+                    res_photos_list.append(Photo.from_vk(value, owner_id))
 
-                    res_photos_list.append(photo_dict)
+                if manifest is not None:
+                    res_photos_list = manifest.select(res_photos_list)
 
                 print()
                 print('Данные успешно сформированы.')
@@ -315,3 +437,305 @@ class VkUser:
 
             else:
                 print('Программа продолжает работу в штатном режиме.\n')
+
+
+    def iter_photos(self, album_id, rev, owner_id, extended=1, page_size=None, limit=None, manifest=None,
+                    raise_errors=False):
+        '''
+        Генератор, постранично возвращающий информацию о фотографиях альбома.
+
+        В отличие от get_photos не ограничен 1000 записями: страницы запрашиваются
+        с помощью параметра offset, а каждая фотография отдаётся сразу после получения
+        своей страницы. Это позволяет начинать загрузку файлов с первой страницы
+        и не хранить в памяти весь альбом.
+
+        Parameters
+        ----------
+        album_id: str
+            индентификатор альбома (wall, profile, saved или числовой идентификатор).
+
+        rev: int
+            порядок сортировки фотографий (1 — антихронологический, 0 — хронологический).
+
+        owner_id: int
+            идентификатор владельца альбома.
+
+        extended: int
+            возвращать ли дополнительные поля (по умолчанию 1, необходимо для формирования имени файла).
+
+        page_size: int
+            количество фотографий, запрашиваемых за один запрос (не более 1000).
+
+        limit: int
+            максимальное количество возвращаемых фотографий. По умолчанию - все фотографии альбома.
+
+        manifest: SyncManifest
+            манифест синхронизации. Если задан, новые фотографии регистрируются в манифесте,
+            а уже перенесённые - пропускаются. При антихронологическом порядке (rev=1) и манифесте,
+            для которого уже был выполнен полный обход альбома, запрос страниц прекращается
+            на первой перенесённой фотографии, после чего возвращаются фотографии,
+            оставшиеся не перенесёнными с прошлых запусков.
+
+        raise_errors: bool
+            выбрасывать ли исключение при ошибке (по умолчанию False - ошибка выводится,
+            а генератор завершается). Используется при неинтерактивном запуске, чтобы ошибка
+            (например, закрытый профиль или ошибка посреди постраничного обхода)
+            не выглядела как пустой или полный альбом.
+
+
+        Exceptions
+        ----------
+        30 - This profile is private
+
+        Данное исключение является специальным для данного метода.
+
+        VkApiError - ошибка API Вконтакте либо HTTP-статус ошибки (только при raise_errors=True).
+
+
+        В качестве результата (yield) генератор возвращает записи Photo с информацией о фотографиях.
+
+        '''
+
+        page_size = min(page_size or self.photos_page_size, self.photos_page_size)
+
+        offset = 0
+
+        returned = 0
+
+        yielded = set()
+
+        while limit is None or returned < limit:
+
+            get_photos_params = {
+                'owner_id': owner_id,
+                'rev': rev,
+                'album_id': album_id,
+                'extended': extended,
+                'offset': offset,
+                'count': page_size if limit is None else min(page_size, limit - returned)
+            }
+
+            response = self._call('photos.get', get_photos_params)
+
+            if not (response.status_code >= 200 and response.status_code < 300):
+
+                if raise_errors:
+                    raise VkApiError(response.status_code, response.reason)
+
+                return
+
+            req = response.json()
+
+            if self._error_validator(req) == True:
+
+                if raise_errors:
+                    raise VkApiError(req['error']['error_code'], req['error'].get('error_msg'))
+
+                print('Программа продолжает работу в штатном режиме.\n')
+                return
+
+            items = req['response']['items']
+
+            photos = [Photo.from_vk(value, owner_id) for value in items]
+
+            if manifest is None:
+                yield from photos
+
+            else:
+                known = [photo for photo in photos if manifest.is_done(photo.id)]
+
+                selected = manifest.select(photos)
+
+                yielded.update(photo.id for photo in selected)
+
+                yield from selected
+
+                # Все более старые фотографии уже были получены при прошлых запусках.
+                if rev == 1 and manifest.complete and known:
+                    yield from (photo for photo in manifest.pending() if photo.id not in yielded)
+                    return
+
+            returned += len(items)
+
+            offset += len(items)
+
+            if not items or offset >= req['response']['count']:
+
+                if manifest is not None and limit is None:
+                    manifest.complete = True
+
+                return
+
+    def execute(self, code):
+        '''
+        Метод для выполнения кода VKScript (метод API execute).
+
+        Parameters
+        ----------
+        code: str
+            код алгоритма на VKScript. Внутри одного вызова допускается не более 25 обращений к API.
+
+
+        В качестве возврата (return) метод использует ответ сервера в формате .json()
+        либо None, если запрос завершился ошибкой.
+
+        '''
+
+        response = self._call('execute', {'code': code})
+
+        if response.status_code >= 200 and response.status_code < 300:
+
+            req = response.json()
+
+            if self._error_validator(req) == False:
+
+                return req
+
+            else:
+                print('Программа продолжает работу в штатном режиме.\n')
+
+    def _execute_batch(self, method, params_list):
+        '''
+        Метод, объединяющий однотипные обращения к API в запросы execute (не более 25 обращений в каждом).
+        Является приватным методом.
+
+        Parameters
+        ----------
+        method: str
+            название метода API (например, photos.get).
+
+        params_list: list
+            список словарей с параметрами для каждого обращения.
+
+
+        В качестве возврата (return) метод использует список ответов, упорядоченный так же, как params_list.
+        Для обращений, завершившихся ошибкой, в списке находится None.
+
+        '''
+
+        results = []
+
+        for start in range(0, len(params_list), self.execute_batch_size):
+
+            chunk = params_list[start:start + self.execute_batch_size]
+
+            calls = ', '.join(f"API.{method}({json.dumps(params, ensure_ascii=False)})" for params in chunk)
+
+            req = self.execute(f"return [{calls}];")
+
+            if req is None:
+                results.extend([None] * len(chunk))
+                continue
+
+            for error in req.get('execute_errors', []):
+                print(f"Ошибка при выполнении {error['method']}: {error['error_code']} - {error['error_msg']}.")
+
+            # При ошибке отдельного обращения VKScript возвращает на его месте false.
+            results.extend(value or None for value in req['response'])
+
+        return results
+
+    def get_albums_batch(self, owner_ids, count):
+        '''
+        Метод для получения фотоальбомов нескольких пользователей.
+        Обращения к photos.getAlbums объединяются в запросы execute по 25 штук,
+        что сокращает количество запросов к API до 25 раз.
+
+        Parameters
+        ----------
+        owner_ids: list
+            идентификаторы пользователей или сообществ, которым принадлежат альбомы.
+
+        count: int
+            количество альбомов, которое нужно вернуть для каждого пользователя.
+
+
+        Exceptions
+        ----------
+        30 - This profile is private
+
+        Данное исключение является специальным для данного метода.
+
+
+        В качестве возврата (return) метод использует словарь, где ключом является идентификатор пользователя,
+        а значением - список записей Album (или None, если альбомы получить не удалось).
+
+        '''
+
+        params_list = [{'owner_id': owner_id, 'count': count} for owner_id in owner_ids]
+
+        responses = self._execute_batch('photos.getAlbums', params_list)
+
+        res_albums_dict = {}
+
+        for owner_id, value in zip(owner_ids, responses):
+
+            if value is None:
+                res_albums_dict[owner_id] = None
+
+            else:
+                res_albums_dict[owner_id] = [Album.from_vk(item) for item in value['items']]
+
+        return res_albums_dict
+
+    def get_photos_batch(self, album_id, rev, owner_ids, count, extended=1):
+        '''
+        Метод для получения фотографий из одноимённых альбомов нескольких пользователей.
+        Обращения к photos.get объединяются в запросы execute по 25 штук,
+        что сокращает количество запросов к API до 25 раз.
+
+        Parameters
+        ----------
+        album_id: str
+            индентификатор альбома (wall, profile, saved или числовой идентификатор).
+
+        rev: int
+            порядок сортировки фотографий (1 — антихронологический, 0 — хронологический).
+
+        owner_ids: list
+            идентификаторы владельцев альбомов.
+
+        count: int
+            количество фотографий для каждого пользователя. Максимальное значение 1000,
+            для получения большего количества используйте get_photos или iter_photos.
+
+        extended: int
+            возвращать ли дополнительные поля (по умолчанию 1, необходимо для формирования имени файла).
+
+
+        Exceptions
+        ----------
+        30 - This profile is private
+
+        Данное исключение является специальным для данного метода.
+
+
+        В качестве возврата (return) метод использует словарь, где ключом является идентификатор пользователя,
+        а значением - список записей Photo (или None, если фотографии получить не удалось).
+
+        '''
+
+        params_list = [
+            {
+                'owner_id': owner_id,
+                'rev': rev,
+                'album_id': album_id,
+                'extended': extended,
+                'count': min(count, self.photos_page_size)
+            }
+            for owner_id in owner_ids
+        ]
+
+        responses = self._execute_batch('photos.get', params_list)
+
+        res_photos_dict = {}
+
+        for owner_id, value in zip(owner_ids, responses):
+
+            if value is None:
+                res_photos_dict[owner_id] = None
+
+            else:
+                res_photos_dict[owner_id] = [Photo.from_vk(item, owner_id) for item in value['items']]
+
+        return res_photos_dict
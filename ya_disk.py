@@ -1,8 +1,16 @@
-import time
+import threading
 
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import requests
+from http_session import create_session
+
+from rate_limiter import yandex_limiter
+
+from error_log import yandex_errors
+
+from metrics import registry, endpoint_from_url
+
+from retry import default_policy, check_http_response, check_requests_error
 
 from  tqdm  import  tqdm
 
@@ -18,6 +26,26 @@ class YandexDisk:
     token: str
         OAuth - токен
 
+    rate_limiter: RateLimiter
+        ограничитель частоты запросов. По умолчанию используется общий для всех клиентов yandex_limiter.
+
+    pool_size: int
+        размер пула соединений HTTP-сессии (по умолчанию 10).
+
+    session: requests.Session
+        HTTP-сессия с пулом keep-alive соединений и заголовками get_headers().
+        По умолчанию создаётся для каждого клиента.
+
+    error_log: ErrorLog
+        журнал ошибок. По умолчанию используется общий для всех клиентов yandex_errors (log_yandex.jsonl).
+
+    retry_policy: RetryPolicy
+        политика повторных попыток. По умолчанию используется общая default_policy.
+
+    timeout: tuple
+        ограничение времени запросов (установка соединения, ожидание данных) в секундах
+        для создаваемой сессии. По умолчанию - DEFAULT_TIMEOUT (см. http_session).
+
 
     Methods
     -------
@@ -27,8 +55,20 @@ class YandexDisk:
     _error_validator(response: dict)
         обрабатывает возникающие ошибки. Является приватным методом.
 
-    get_files_list()
-        возвращает список файлов на Яндекс.Диске.
+    _request(method: str, url: str)
+        выполняет запрос к API с учётом ограничения частоты. Является приватным методом.
+
+    close()
+        закрывает HTTP-сессию клиента.
+
+    get_files_list(path: str, page_size: int, fields: tuple)
+        возвращает список файлов на Яндекс.Диске (или в определённой папке).
+
+    iter_files(path: str, page_size: int, fields: tuple)
+        постранично возвращает файлы на Яндекс.Диске (генератор).
+
+    get_last_uploaded(limit: int, fields: tuple)
+        возвращает список последних загруженных файлов.
 
     create_directory_yandex_disk(path: str)
         создаёт папку на Яндекс.Диске.
@@ -36,8 +76,14 @@ class YandexDisk:
     _download_files(path: str, url: str)
         загружает файл по url на Яндекс.Диск. Является приватным методом.
 
-    download_files_yandex_disk(owner_id: int, list_name: str)
-        загружает файл на Яндекс.Диск по определённому пути.
+    upload_photo(path: str, info: dict)
+        загружает одну фотографию на Яндекс.Диск и возвращает результат загрузки.
+
+    upload_bytes(path: str, data: bytes, overwrite: bool)
+        загружает уже скачанный файл на Яндекс.Диск и возвращает результат загрузки.
+
+    download_files_yandex_disk(path: str, list_name: list, workers: int, tracker: OperationTracker, manifest: SyncManifest)
+        загружает файлы на Яндекс.Диск по определённому пути (в том числе параллельно).
 
     delete_files_yandex_disk(path: str)
         удаляет файл на Яндекс.Диске.
@@ -67,8 +113,33 @@ class YandexDisk:
 
     '''
 
-    def __init__(self, token):
+    url = 'https://cloud-api.yandex.net/v1/disk/'
+
+    # Количество элементов, запрашиваемых за одну страницу списка файлов.
+    files_page_size = 1000
+
+    def __init__(self, token, rate_limiter=None, pool_size=10, session=None, error_log=None, retry_policy=None,
+                 timeout=None):
         self.token = token
+        self.rate_limiter = rate_limiter or yandex_limiter
+        self.session = session or create_session(pool_size, timeout=timeout)
+        self.session.headers.update(self.get_headers())
+        self.error_log = error_log or yandex_errors
+        self.retry_policy = retry_policy or default_policy
+        self._context = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        '''
+        Метод для закрытия HTTP-сессии и всех открытых соединений клиента.
+        '''
+
+        self.session.close()
 
     def get_headers(self):
         return {
@@ -79,7 +150,8 @@ class YandexDisk:
     def _error_validator(self, response):
         '''
         Метод для обработки ошибок.
-        Возвращает сообщение об ошибке и записывает возникающие ошибки в файл.
+        Возвращает сообщение об ошибке и записывает возникающие ошибки в общий журнал ошибок
+        (вместе с контекстом последнего запроса текущего потока).
 
         Parameters
         ----------
@@ -93,24 +165,86 @@ class YandexDisk:
 
         if 'error' in response:
 
+            request = getattr(self._context, 'request', None) or {}
+
+            registry.error('yandex', endpoint_from_url(request.get('url', ''), self.url), response['error'])
+
             print(f"\nРабота метода была прервана ошибкой. Происходит обработка ошибки, пожалуйста, подождите...\n"
                   f"Название ошибки: \n{response['error']}\n"
                   f"Сообщение об ошибке: \n{response['message']}\n"
                   f"Описание ошибки: \n{response['description']}\n")
 
-            with open('log_yandex.json', 'a', encoding='utf-8') as file_obj:
-                print('Данные об ошибке сохранены в лог log_yandex.json')
-                json.dump(response, file_obj, ensure_ascii=False, indent=4)
+            self.error_log.record('yandex', response, getattr(self._context, 'request', None))
+
+            print(f'Данные об ошибке сохранены в лог {self.error_log.path}')
 
             return True
 
         else:
             return False
 
-    def get_files_list(self):
+    def _request(self, method, url, **kwargs):
+        '''
+        Метод для выполнения запроса к API Яндекс.Диска.
+        Перед каждой попыткой ожидает разрешения ограничителя частоты запросов.
+        Временные ошибки (HTTP 429 и 5xx, ошибки соединения) повторяются согласно политике retry_policy.
+        Время запросов, ожидания и повторы учитываются в общем реестре метрик (metrics.registry).
+        Является приватным методом.
+
+        Parameters
+        ----------
+        method: str
+            HTTP-метод (GET, PUT, POST, DELETE).
+
+        url: str
+            адрес запроса.
+
+        kwargs
+            дополнительные аргументы requests.Session.request (params, data и т.д.).
+            Заголовки get_headers() уже заданы в сессии.
+
+
+        В качестве возврата (return) метод использует ответ сервера (requests.Response).
+
+        '''
+
+        self._context.request = {'method': method, 'url': url, 'params': kwargs.get('params')}
+
+        endpoint = endpoint_from_url(url, self.url)
+
+        data = kwargs.get('data')
+
+        bytes_out = len(data) if isinstance(data, (bytes, str)) else 0
+
+        def send():
+            registry.wait('yandex', self.rate_limiter.acquire())
+
+            with registry.track('yandex', endpoint) as record:
+                response = self.session.request(method, url, **kwargs)
+                record.response(response.status_code, len(response.content), bytes_out)
+
+            return response
+
+        return self.retry_policy.call(send, check_http_response, check_requests_error,
+                                      registry.retry_callback('yandex', endpoint))
+
+    def get_files_list(self, path=None, page_size=None, fields=('name', 'path')):
         '''
         Метод для получения списка файлов, упорядоченных по имени.
 
+        Parameters
+        ----------
+        path: str
+            путь к папке на Яндекс.Диске. Если задан, возвращаются только файлы из этой папки,
+            иначе - все файлы Яндекс.Диска.
+
+        page_size: int
+            количество файлов, запрашиваемых за одну страницу (по умолчанию 1000).
+
+        fields: tuple
+            поля файлов, которые следует запросить (по умолчанию name и path).
+
+
         Exceptions
         ----------
         403	- Недостаточно прав для изменения данных в общей папке.
@@ -124,16 +258,126 @@ class YandexDisk:
 
         '''
 
-        disk_file_list = []
+        return list(self.iter_files(path, page_size, fields))
+
+    def iter_files(self, path=None, page_size=None, fields=('name', 'path')):
+        '''
+        Генератор, постранично возвращающий файлы на Яндекс.Диске.
+
+        Без параметра path используется плоский список всех файлов (GET /resources/files),
+        с параметром path - содержимое одной папки (GET /resources?path=), из которого
+        возвращаются только файлы. Страницы запрашиваются с помощью limit и offset,
+        а в ответе остаются только поля, перечисленные в fields.
+
+        Parameters
+        ----------
+        path: str
+            путь к папке на Яндекс.Диске. По умолчанию - весь Яндекс.Диск.
+
+        page_size: int
+            количество файлов, запрашиваемых за одну страницу (по умолчанию 1000).
+
+        fields: tuple
+            поля файлов, которые следует запросить (например, name, path, md5, size, modified).
+            Поле name возвращается под ключом file_name.
+
+
+        Exceptions
+        ----------
+        403	- Недостаточно прав для изменения данных в общей папке.
+
+        404 - Не удалось найти запрошенный ресурс.
+
+        Данные исключения являются специальными для данного метода.
+
+
+        В качестве результата (yield) генератор возвращает словари с информацией о файлах.
+
+        '''
+
+        page_size = page_size or self.files_page_size
+
+        fields = tuple(dict.fromkeys(('name', 'path') + tuple(fields)))
+
+        if path is None:
+            files_url = self.url + 'resources/files'
+            params = {'fields': ','.join(f"items.{field}" for field in fields)}
+
+        else:
+            files_url = self.url + 'resources'
+            params = {
+                'path': path,
+                'fields': ','.join(f"_embedded.items.{field}" for field in fields + ('type',))
+            }
+
+        offset = 0
+
+        while True:
+
+            response = self._request('GET', url=files_url, params={**params, 'limit': page_size, 'offset': offset})
+            req = response.json()
+
+            if self._error_validator(req) == True:
+                return
+
+            items = req['items'] if path is None else req['_embedded']['items']
+
+            for item in items:
+
+                if item.get('type', 'file') != 'file':
+                    continue
+
+                file_dict = {'file_name': item['name']}
 
-        files_url = 'https://cloud-api.yandex.net/v1/disk/resources/files'
-        headers = self.get_headers()
-        response = requests.get(url=files_url, headers=headers)
+                for field in fields[1:]:
+                    file_dict[field] = item.get(field)
+
+                yield file_dict
+
+            if len(items) < page_size:
+                return
+
+            offset += len(items)
+
+    def get_last_uploaded(self, limit=1000, fields=('name', 'path')):
+        '''
+        Метод для получения списка последних загруженных файлов, упорядоченных по дате загрузки
+        (от новых к старым).
+
+        Parameters
+        ----------
+        limit: int
+            количество файлов, которое нужно вернуть (по умолчанию 1000).
+
+        fields: tuple
+            поля файлов, которые следует запросить. Поле name возвращается под ключом file_name.
+
+
+        В качестве возврата (return) метод использует список файлов
+        либо None, если запрос завершился ошибкой.
+
+        '''
+
+        fields = tuple(dict.fromkeys(('name', 'path') + tuple(fields)))
+
+        last_uploaded_url = self.url + 'resources/last-uploaded'
+        params = {'limit': limit, 'fields': ','.join(f"items.{field}" for field in fields)}
+        response = self._request('GET', url=last_uploaded_url, params=params)
         req = response.json()
 
+        if self._error_validator(req) == True:
+            return None
+
+        disk_file_list = []
+
         for item in req['items']:
 
-            disk_file_list.append({'file_name': item['name'], 'path': item['path']})
+            file_dict = {'file_name': item['name']}
+
+            for field in fields[1:]:
+                file_dict[field] = item.get(field)
+
+            disk_file_list.append(file_dict)
 
         return disk_file_list
 
@@ -162,10 +406,9 @@ class YandexDisk:
 
         '''
 
-        create_url = 'https://cloud-api.yandex.net/v1/disk/resources'
-        headers = self.get_headers()
+        create_url = self.url + 'resources'
         params = {'path': path}
-        response = requests.put(url=create_url, headers=headers, params=params)
+        response = self._request('PUT', url=create_url, params=params)
         req = response.json()
 
         if self._error_validator(req) == False:
@@ -178,6 +421,34 @@ class YandexDisk:
         else:
             print('Программа продолжает работу в штатном режиме.\n')
 
+    def ensure_directory_yandex_disk(self, path):
+        '''
+        Метод, создающий папку на Яндекс.Диске вместе с родительскими папками, если их ещё нет.
+
+        В отличие от create_directory_yandex_disk ответ 409 (папка уже существует) не считается ошибкой
+        и не записывается в журнал ошибок.
+
+        Parameters
+        ----------
+        path: str
+            путь к папке на Яндекс.Диске (например, photos/durov).
+
+
+        Exceptions
+        ----------
+        requests.HTTPError - возникает, если папку не удалось создать (кроме 409).
+
+        '''
+
+        parts = [part for part in path.strip('/').split('/') if part]
+
+        for index in range(1, len(parts) + 1):
+
+            response = self._request('PUT', url=self.url + 'resources', params={'path': '/'.join(parts[:index])})
+
+            if response.status_code != 409:
+                response.raise_for_status()
+
     def _download_files(self, path, url):
         '''
         Метод для загрузки файлов по url на Яндекс.Диск. Является приватным методом.
@@ -191,6 +462,7 @@ class YandexDisk:
             URL внешнего ресурса, который следует загрузить.
 
 
+
         Exceptions
         ----------
         409	- Указанного пути "{path}" не существует.
@@ -199,25 +471,120 @@ class YandexDisk:
 
 
         В качестве возврата (return) метод использует ответ сервера в формате .json().
+        При ошибке ответ с её описанием возвращается вызывающему коду, работа программы не прерывается.
 
         '''
 
-        download_url = 'https://cloud-api.yandex.net/v1/disk/resources/upload'
-        headers = self.get_headers()
+        download_url = self.url + 'resources/upload'
         params = {'path': path, 'url': url}
-        response = requests.post(url=download_url, headers=headers, params=params)
+        response = self._request('POST', url=download_url, params=params)
         req = response.json()
 
-        if self._error_validator(req) == False:
+        self._error_validator(req)
 
-            return req
+        return req
+
+    def upload_photo(self, path, info):
+        '''
+        Метод для загрузки одной фотографии на Яндекс.Диск.
+
+        Parameters
+        ----------
+        path: str
+            путь к папке, куда будет помещён ресурс.
+
+        info: dict
+            запись Photo с информацией о фотографии.
+
+
+        В качестве возврата (return) метод использует словарь с результатом загрузки:
+        file_name, path, status ('success' либо 'error') и response (ответ сервера)
+        либо error (описание ошибки).
+
+        '''
+
+        res_path = f"{path}/{info.file_name}"
+
+        result = {'file_name': info.file_name, 'path': res_path}
+
+        try:
+            req = self._download_files(res_path, info.url)
+
+        except Exception as error:
+            result.update({'status': 'error', 'error': repr(error)})
+            return result
+
+        if 'error' in req:
+            result.update({'status': 'error', 'error': req.get('description', req['error'])})
 
         else:
-            print('Возникла непредвиденная ошибка. Программа завершает свою работу...')
-            exit()
+            result.update({'status': 'success', 'response': req})
+
+        return result
+
+    def upload_bytes(self, path, data, overwrite=False):
+        '''
+        Метод для загрузки уже скачанного файла на Яндекс.Диск (без повторного скачивания по url).
+
+        Сначала запрашивается ссылка для загрузки (resources/upload), затем содержимое файла
+        отправляется по ней методом PUT. Загрузка выполняется синхронно, отслеживать операцию не нужно.
+
+        Parameters
+        ----------
+        path: str
+            путь к файлу на Яндекс.Диске.
+
+        data: bytes
+            содержимое файла (bytes либо объект с буферным протоколом, например mmap из PhotoCache).
+
+        overwrite: bool
+            перезаписать файл, если он уже существует (по умолчанию False).
+
+
+        Exceptions
+        ----------
+        409 - Указанного пути "{path}" не существует, либо ресурс "{path}" уже существует.
+
+        413 - Загрузка файла недоступна. Файл слишком большой.
+
+        Данные исключения являются специальными для данного метода.
+
+
+        В качестве возврата (return) метод использует словарь с результатом загрузки:
+        path, status ('success' либо 'error') и error (описание ошибки).
+
+        '''
+
+        result = {'path': path}
+
+        # Тело запроса должно отправляться повторно при повторных попытках, поэтому передаются bytes.
+        if not isinstance(data, bytes):
+            data = bytes(data)
+
+        try:
+            params = {'path': path, 'overwrite': str(overwrite).lower()}
+            req = self._request('GET', self.url + 'resources/upload', params=params).json()
+
+            if self._error_validator(req) == True:
+                result.update({'status': 'error', 'error': req.get('description', req['error'])})
+                return result
 
+            # Ссылка для загрузки не требует авторизации, заголовки сессии для неё не передаются.
+            response = self._request(req.get('method', 'PUT'), req['href'], data=data,
+                                     headers={'Authorization': None, 'Content-Type': 'application/octet-stream'})
 
-    def download_files_yandex_disk(self, path, list_name):
+            response.raise_for_status()
+
+        except Exception as error:
+            result.update({'status': 'error', 'error': repr(error)})
+            return result
+
+        result['status'] = 'success'
+
+        return result
+
+    def download_files_yandex_disk(self, path, list_name, workers=1, tracker=None, manifest=None,
+                                   operations_timeout=600):
         '''
         Метод для загрузки файлов на Яндекс.Диск по определённому пути.
 
@@ -227,22 +594,94 @@ class YandexDisk:
             путь, куда будет помещён ресурс.
 
         list_name: list
-            список словарей, содержащий информацию о фотографиях пользователя Вконтакте.
+            список записей Photo, содержащий информацию о фотографиях пользователя Вконтакте.
+
+        workers: int
+            количество одновременно выполняемых запросов на загрузку (по умолчанию 1).
+            Запросы отправляются из пула потоков и по-прежнему ограничиваются rate_limiter.
+
+        tracker: OperationTracker
+            трекер асинхронных операций. Если задан, ссылки на операции загрузки (href)
+            передаются ему для фонового отслеживания завершения.
+
+        manifest: SyncManifest
+            манифест синхронизации. Если задан, статус каждой фотографии записывается в манифест.
+            Яндекс.Диск скачивает файл по url асинхронно, поэтому принятая загрузка (ответ 202)
+            отмечается как pending, а done либо failed - по итогу операции. Если трекер передан,
+            статус изменяется из его потока опроса, и манифест нужно сохранить после tracker.wait();
+            иначе метод сам ожидает завершения операций (не дольше operations_timeout секунд)
+            и сохраняет манифест.
+
+        operations_timeout: float
+            максимальное время ожидания операций, если задан manifest и не задан tracker (по умолчанию 600).
 
 
         Результатом выполнения метода является загрузка файлов на Яндекс.Диск по определённому пути (res_path).
 
+        В качестве возврата (return) метод использует список результатов загрузки каждого файла (см. upload_photo)
+        в порядке следования list_name. Ошибка загрузки одного файла не прерывает загрузку остальных.
+
         '''
 
         print()
 
-        for info in tqdm(list_name, desc='Идёт загрузка файлов на Яндекс.Диск, пожалуйста, подождите ...', unit='S'):
-            time.sleep(1)
-            res_path = f"{path}/{info['file_name']}"
-            self._download_files(res_path, info['url'])
+        results = [None] * len(list_name)
+
+        own_tracker = manifest is not None and tracker is None
+
+        if own_tracker:
+            tracker = OperationTracker(self)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+
+            futures = {executor.submit(self.upload_photo, path, info): index for index, info in enumerate(list_name)}
+
+            for future in tqdm(as_completed(futures), total=len(futures), desc='Идёт загрузка файлов на Яндекс.Диск, пожалуйста, подождите ...', unit='S'):
+
+                result = future.result()
+
+                results[futures[future]] = result
+
+                photo = list_name[futures[future]]
+
+                if tracker is not None and result['status'] == 'success' and 'href' in result['response']:
+
+                    if manifest is not None:
+                        manifest.mark(photo.id, 'pending', result['path'], photo.owner_id)
+
+                    tracker.add(result['response']['href'], result['path'],
+                                None if manifest is None else self._manifest_callback(manifest, photo))
+
+                elif manifest is not None:
+                    manifest.mark(photo.id, 'done' if result['status'] == 'success' else 'failed', result['path'], photo.owner_id)
+
+        if own_tracker:
+            tracker.wait(timeout=operations_timeout)
+            tracker.stop()
+
+        if manifest is not None:
+            manifest.save()
+
+        errors = [result for result in results if result['status'] == 'error']
 
         print()
-        print('Данные успешно загружены.')
+
+        if errors:
+
+            print(f"Загружено файлов: {len(results) - len(errors)}, с ошибкой: {len(errors)}.")
+
+            for result in errors:
+                print(f"{result['path']}: {result['error']}")
+
+        else:
+            print('Данные успешно загружены.')
+
+        return results
+
+    @staticmethod
+    def _manifest_callback(manifest, photo):
+        # Обработчик завершения операции загрузки: переводит фотографию из pending в done либо failed.
+        return lambda status: manifest.mark(photo.id, 'done' if status == 'success' else 'failed', owner_id=photo.owner_id)
 
     def delete_files_yandex_disk(self, path, permanently=False):
         '''
@@ -277,8 +716,222 @@ class YandexDisk:
 
         '''
 
-        delete_url = "https://cloud-api.yandex.net/v1/disk/resources"
-        headers = self.get_headers()
+        delete_url = self.url + 'resources'
         params = {"path": path, "permanently": permanently}
-        response = requests.delete(url=delete_url, headers=headers, params=params)
+        response = self._request('DELETE', url=delete_url, params=params)
         return response.status_code
+
+
+class OperationTracker:
+    '''
+    Класс OperationTracker - используется для отслеживания асинхронных операций Яндекс.Диска.
+
+    Загрузка файла по URL (POST /resources/upload) выполняется Яндекс.Диском асинхронно:
+    в ответе возвращается ссылка (href) на операцию, статус которой нужно запрашивать отдельно.
+    Трекер собирает эти ссылки и опрашивает их в фоновом потоке, запрашивая статусы
+    нескольких операций параллельно (не более workers одновременно). Интервал опроса адаптивный:
+    он сбрасывается до минимального, когда какая-либо операция завершилась,
+    и увеличивается, пока статусы не меняются.
+
+    Attributes
+    ----------
+    disk: YandexDisk
+        клиент Яндекс.Диска, через сессию и ограничитель которого выполняются запросы.
+
+    min_interval: float
+        минимальный интервал опроса в секундах.
+
+    max_interval: float
+        максимальный интервал опроса в секундах.
+
+    backoff: float
+        множитель увеличения интервала, если за итерацию ни одна операция не завершилась.
+
+    workers: int
+        количество статусов операций, запрашиваемых одновременно (по умолчанию 4).
+
+
+    Methods
+    -------
+    add(href: str, path: str, on_finish: callable)
+        добавляет операцию для отслеживания и запускает фоновый опрос.
+
+    wait(timeout: float)
+        ожидает завершения всех операций и возвращает сводку.
+
+    summary()
+        возвращает сводку по статусам операций.
+
+    stop()
+        останавливает фоновый опрос.
+
+    '''
+
+    def __init__(self, disk, min_interval=0.5, max_interval=10.0, backoff=1.5, workers=4):
+        self.disk = disk
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.workers = workers
+        self._pending = {}
+        self._finished = {}
+        self._callbacks = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add(self, href, path, on_finish=None):
+        '''
+        Метод для добавления операции на отслеживание.
+
+        Parameters
+        ----------
+        href: str
+            ссылка на операцию из ответа сервера.
+
+        path: str
+            путь к загружаемому ресурсу (используется в сводке).
+
+        on_finish: callable
+            функция, вызываемая с итоговым статусом операции (success либо failed)
+            из потока опроса, когда операция завершится. Необязательный параметр.
+            Ошибки обработчика записываются в журнал ошибок клиента и не прерывают опрос.
+
+        '''
+
+        with self._lock:
+            self._pending[href] = path
+
+            if on_finish is not None:
+                self._callbacks[href] = on_finish
+
+            if self._thread is None:
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._poll, daemon=True)
+                self._thread.start()
+
+    def _check(self, href):
+        '''
+        Метод для получения статуса операции. Является приватным методом.
+
+        В качестве возврата (return) метод использует статус операции
+        (success, failed, in-progress) либо None, если статус получить не удалось.
+
+        '''
+
+        try:
+            response = self.disk._request('GET', href)
+            return response.json().get('status')
+
+        except Exception:
+            return None
+
+    def _poll(self):
+        '''
+        Метод фонового опроса статусов операций. Является приватным методом.
+        '''
+
+        interval = self.min_interval
+
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+
+            while not self._stopped.is_set():
+
+                with self._lock:
+                    pending = list(self._pending.items())
+
+                    # Поток завершается, когда отслеживать больше нечего;
+                    # новая операция, добавленная позже, запустит новый поток.
+                    if not pending:
+                        self._thread = None
+                        return
+
+                finished = False
+
+                statuses = executor.map(self._check, [href for href, path in pending])
+
+                for (href, path), status in zip(pending, statuses):
+
+                    if status in ('success', 'failed'):
+
+                        finished = True
+
+                        with self._lock:
+                            callback = self._callbacks.pop(href, None)
+
+                        # Обработчик вызывается до уведомления ожидающих, поэтому после wait() он уже выполнен.
+                        if callback is not None:
+
+                            try:
+                                callback(status)
+
+                            except Exception as error:
+                                self.disk.error_log.record('yandex', {
+                                    'error': type(error).__name__,
+                                    'message': repr(error),
+                                    'description': 'Ошибка обработчика завершения операции'
+                                }, {'href': href, 'path': path, 'status': status})
+
+                        with self._lock:
+                            del self._pending[href]
+                            self._finished[href] = {'path': path, 'status': status}
+                            self._changed.notify_all()
+
+                interval = self.min_interval if finished else min(interval * self.backoff, self.max_interval)
+
+                self._stopped.wait(interval)
+
+        with self._lock:
+            self._thread = None
+            self._changed.notify_all()
+
+    def summary(self):
+        '''
+        Метод для получения сводки по операциям.
+
+        В качестве возврата (return) метод использует словарь со списками путей
+        по статусам: success, failed, in-progress.
+
+        '''
+
+        with self._lock:
+            result = {'success': [], 'failed': [], 'in-progress': list(self._pending.values())}
+
+            for info in self._finished.values():
+                result[info['status']].append(info['path'])
+
+        return result
+
+    def wait(self, timeout=None):
+        '''
+        Метод, ожидающий завершения всех отслеживаемых операций.
+
+        Parameters
+        ----------
+        timeout: float
+            максимальное время ожидания в секундах. По умолчанию - без ограничения.
+
+
+        В качестве возврата (return) метод использует сводку по операциям (см. summary).
+        Операции, не завершившиеся за время ожидания, попадают в список in-progress.
+
+        '''
+
+        with self._lock:
+            self._changed.wait_for(lambda: not self._pending or self._thread is None, timeout=timeout)
+
+        return self.summary()
+
+    def stop(self):
+        '''
+        Метод для остановки фонового опроса.
+        '''
+
+        self._stopped.set()
+
+        with self._lock:
+            thread = self._thread
+
+        if thread is not None:
+            thread.join()